@@ -0,0 +1,52 @@
+"""
+Airport coordinates.
+
+airports.csv has the latitude and longitude of every airport in
+Indian-Airlines-Dataset.csv; DEMO_COORDS places the CLI scheduler's demo
+airports A-E. Both are read once into one lookup, shared by the route map,
+the graph layout and the A* search's distance bounds.
+"""
+import csv
+import os
+
+import numpy as np
+
+# Demo airports A-E of the CLI scheduler in main.py
+DEMO_COORDS = {
+    "A": (28.6139, 77.2090),   # Delhi
+    "B": (19.0760, 72.8777),   # Mumbai
+    "C": (12.9716, 77.5946),   # Bangalore
+    "D": (13.0827, 80.2707),   # Chennai
+    "E": (22.5726, 88.3639),   # Kolkata
+}
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def get_airports_path():
+    return os.path.join(os.path.dirname(__file__), "airports.csv")
+
+
+_coords = {}
+
+
+def load_airport_coords(path=None):
+    """
+    Returns:
+        {code: (lat, lon)} for every airport in airports.csv (or `path`) and
+        the DEMO_COORDS airports, read on first use
+    """
+    path = path or get_airports_path()
+    coords = _coords.get(path)
+    if coords is None:
+        with open(path, newline="", encoding="utf-8") as f:
+            coords = {row['code']: (float(row['lat']), float(row['lon'])) for row in csv.DictReader(f)}
+        coords = _coords[path] = {**DEMO_COORDS, **coords}
+    return coords
+
+
+def great_circle_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between points given in degrees; works elementwise on arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(x) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -0,0 +1,137 @@
+"""
+K alternative itineraries from one search.
+
+Yen-style K-shortest-paths would rerun a search for every deviation of
+every path found. Here one backward profile scan (csa.arrival_profiles)
+gives, for every airport and time, the earliest arrival at the destination
+still possible from there. A best-first search over flights then uses it
+as an exact A* bound: a label is one flight taken from a parent label,
+keyed by the best arrival any itinerary through it can reach, so labels
+leave the heap in the order their itineraries arrive and almost nothing
+off those itineraries is expanded.
+
+A label's flight is the earliest-arriving one in a range of catchable
+departures on an edge (Network.best answers that for suffixes). Popping a
+label splits its range around the flight taken and queues the best of
+each part, so the next alternative on that edge is one heap push. Each
+airport is expanded at most k times, since any later arrival there can only
+continue into itineraries that the k earlier ones beat. Itineraries are
+told apart by their flights (number, departure and arrival), not by slot,
+so copies of the same flight never come back as different options.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+
+import csa
+import search
+from timemodel import MINUTES_PER_HOUR
+
+WINDOW = 12 * MINUTES_PER_HOUR
+
+
+def k_earliest(network, s, d, startT, k, min_connection=0, window=WINDOW, expected=None):
+    """
+    The k earliest-arriving distinct itineraries from s to d (airport ids),
+    never visiting an airport twice.
+
+    window: Only itineraries arriving within this many minutes of the
+        earliest possible arrival are considered
+    expected: Optional Network.expected_arrivals(delays), as for
+        search.earliest_arrival; arrivals then include the predicted delays
+
+    Returns:
+        list of (arrival, slots), by arrival time
+    """
+    if s == d or k <= 0:
+        return []
+    earliest = search.earliest_arrival(network, s, startT, d, expected, min_connection)[0][d]
+    if earliest == float('inf'):
+        return []
+    neg_departs, best_arrivals, _ = csa.arrival_profiles(network, s, d, startT, earliest + window,
+                                                         expected=expected, min_connection=min_connection)
+    edge_offsets, edge_targets, flight_offsets, departT, arrivalT, best = network.views()
+    if expected is not None:
+        arrivalT, best = (memoryview(a) for a in expected)
+    names, flight_ids = network.names, network.flight_ids
+
+    def reach(v, arrival):
+        """Earliest arrival at d after landing at v at `arrival`, or None."""
+        if v == d:
+            return arrival
+        entry = bisect_right(neg_departs[v], -(arrival + min_connection)) - 1
+        return best_arrivals[v][entry] if entry >= 0 else None
+
+    # Label i reached label_at[i] over flight label_slot[i], picked from the
+    # departures label_range[i] = (edge, lo, hi) catchable from label_parent[i]
+    label_at, label_slot, label_parent, label_range = [s], [-1], [-1], [None]
+    expanded = [0] * network.num_airports
+    seen = [set() for _ in range(network.num_airports)]  # flights of the itineraries expanded per airport
+    heap = [(earliest, startT, 0)]
+    itineraries = []
+
+    def on_path(i, v):
+        while i >= 0:
+            if label_at[i] == v:
+                return True
+            i = label_parent[i]
+        return False
+
+    def push(parent, e, lo, hi):
+        """Queues the earliest-arriving flight among slots lo..hi-1 of edge e."""
+        if lo >= hi:
+            return
+        if hi == flight_offsets[e + 1]:
+            slot = best[lo]
+        else:
+            slot = min(range(lo, hi), key=arrivalT.__getitem__)
+        key = reach(edge_targets[e], arrivalT[slot])
+        if key is None:
+            return  # no later flight in the range gets to d in time either
+        label_at.append(edge_targets[e])
+        label_slot.append(slot)
+        label_parent.append(parent)
+        label_range.append((e, lo, hi))
+        heapq.heappush(heap, (key, arrivalT[slot], len(label_at) - 1))
+
+    while heap:
+        _, arrival, i = heapq.heappop(heap)
+        v = label_at[i]
+        if expanded[v] >= k:
+            continue  # k earlier arrivals here already beat anything this one leads to
+
+        if label_parent[i] >= 0:
+            # The other flights this one was picked from, on either side of it
+            e, lo, hi = label_range[i]
+            push(label_parent[i], e, lo, label_slot[i])
+            push(label_parent[i], e, label_slot[i] + 1, hi)
+
+        # Another copy of an itinerary already expanded here adds nothing new
+        path = _slots(label_slot, label_parent, i)
+        flights = tuple((names[int(flight_ids[slot])], departT[slot], arrivalT[slot]) for slot in path)
+        if flights in seen[v]:
+            continue
+        seen[v].add(flights)
+        expanded[v] += 1
+
+        if v == d:
+            itineraries.append((arrival, path))
+            if len(itineraries) == k:
+                break
+            continue
+
+        ready = arrival if v == s else arrival + min_connection
+        for e in range(edge_offsets[v], edge_offsets[v + 1]):
+            if not on_path(i, edge_targets[e]):
+                hi = flight_offsets[e + 1]
+                push(i, e, bisect_left(departT, ready, flight_offsets[e], hi), hi)
+
+    return itineraries
+
+
+def _slots(label_slot, label_parent, i):
+    path = []
+    while label_parent[i] >= 0:
+        path.append(label_slot[i])
+        i = label_parent[i]
+    path.reverse()
+    return path
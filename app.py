@@ -1,82 +1,44 @@
 import streamlit as st
-import pandas as pd
-from flight import Flight, Vertex, Graph as FlightGraph, FlightAgency
+from cache import cached_route, get_query_cache
 from graph import Graph as SimpleGraph
-from geo_visualize import plot_geo_path
-from database import get_db_path, init_db
-import sqlite3
-import joblib
+from database import add_user, find_user, get_trips, save_trip
+from snapshot import get_snapshot
+from precompute import get_arrival_matrix
+from router import get_router
+from timemodel import DAYS, MINUTES_PER_DAY, format_duration, format_time, to_minutes
 import os
 
 # --------------- Initialization -----------------
-init_db()
 st.set_page_config(page_title="SkyPath ✈️", layout="centered")
 
 # --------------- Banner Image -----------------
 st.image("code/banner.png", use_container_width=True)
 
-# --------------- Load ML Model & Encoders -----------------
-model = joblib.load("delay_model.pkl")
-le_origin, le_dest, le_day, le_weather = joblib.load("label_encoders.pkl")
-
-# --------------- Load Dataset -----------------
-csv_path = "C:/Users/anush/Desktop/airport-route-planner/flight-agenda-dijkstra-1/data/indian_routes/Indian-Airlines-Dataset.csv"
-df = pd.read_csv(csv_path).dropna()
-
-# Build Graph from Data
-airports = sorted(set(df['source']).union(set(df['dest'])))
-airport_vertices = {code: Vertex(code, []) for code in airports}
-
-for _, row in df.iterrows():
-    src = airport_vertices[row['source']]
-    dest = airport_vertices[row['dest']]
-    if dest not in src.adjacentVertices:
-        src.adjacentVertices.append(dest)
-
-flights = []
-for _, row in df.iterrows():
-    dep = 2
-    arr = dep + 1
-    flights.append(Flight(row['fltno'], airport_vertices[row['source']], airport_vertices[row['dest']], arr, dep))
-
-graph = FlightGraph(list(airport_vertices.values()))
+# --------------- Load Network & Delay Predictions -----------------
+# Built once per process and shared by every session and rerun; reloaded
+# only when the CSV or the pickles change on disk (this also runs init_db).
+# Delays for the whole timetable are predicted in one batch at load time.
+snapshot = get_snapshot()
+network, load_stats = snapshot.network, snapshot.load_stats
+airports = snapshot.airports
+router = get_router(network)
+# All-pairs arrivals from `python precompute.py`, if built for the current CSV
+arrival_matrix = get_arrival_matrix()
+# Itineraries and their delays, keyed on snapshot.version so a reload misses
+query_cache = get_query_cache()
 
 # ----------------- Auth Helpers ------------------
+# Connections come from a small pool shared by every session and rerun, in WAL
+# mode; trips are saved by a background writer that batches them into
+# transactions (a failed write is reported on stderr by the writer).
 def authenticate_user(username, password):
-    conn = sqlite3.connect(get_db_path())
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM users WHERE username = ? AND password = ?", (username, password))
-    result = cur.fetchone()
-    conn.close()
-    return result
+    return find_user(username, password)
 
 def register_user(username, password):
-    conn = sqlite3.connect(get_db_path())
-    cur = conn.cursor()
-    cur.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
-    conn.commit()
-    conn.close()
-
-def show_user_trips(user_id):
-    conn = sqlite3.connect(get_db_path())
-    cur = conn.cursor()
-    cur.execute("SELECT start, end, start_time, itinerary, arrival_time, delay_minutes FROM trips WHERE user_id = ?", (user_id,))
-    trips = cur.fetchall()
-    conn.close()
-    return trips
+    add_user(username, password)
 
 def predict_delay(flight):
-    try:
-        features = pd.DataFrame([{
-            'origin': le_origin.transform([flight.origin.name])[0],
-            'dest': le_dest.transform([flight.dest.name])[0],
-            'departT': flight.departT,
-            'day': 2,
-            'weather': 0
-        }])
-        return model.predict(features)[0]
-    except:
-        return 0
+    return snapshot.flight_delay(flight)
 
 # ---------------- Login Page ------------------
 if "logged_in" not in st.session_state:
@@ -91,10 +53,11 @@ if not st.session_state.logged_in:
         uname = st.text_input("Username")
         pwd = st.text_input("Password", type="password")
         if st.button("Login"):
-            user = authenticate_user(uname, pwd)
-            if user:
+            user_id = authenticate_user(uname, pwd)
+            if user_id is not None:
                 st.session_state.logged_in = True
-                st.session_state.user_id = user[0]
+                st.session_state.user_id = user_id
+                st.session_state.trip_cursors = [None]
                 st.session_state.username = uname
                 st.success("✅ Login successful!")
                 st.rerun()
@@ -111,6 +74,11 @@ if not st.session_state.logged_in:
 
 # ---------------- Main App ------------------
 st.sidebar.success(f"👋 Welcome, {st.session_state.username}")
+st.sidebar.caption(f"🛫 {load_stats['airports']} airports, {load_stats['edges']} routes, "
+                   f"{load_stats['departures']} weekly departures built in {load_stats['build_seconds'] * 1000:.1f} ms")
+cache_stats = query_cache.stats()
+st.sidebar.caption(f"🗃️ Route cache: {cache_stats['entries']} entries, {cache_stats['hits']} hits, "
+                   f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%})")
 if st.sidebar.button("🚪 Logout"):
     st.session_state.logged_in = False
     st.rerun()
@@ -123,23 +91,40 @@ with col1:
 with col2:
     destination = st.selectbox("To (Destination Airport):", airports)
 
-start_time = st.slider("🕒 Choose Start Time (0–23):", 0, 23, 2)
+col1, col2 = st.columns(2)
+with col1:
+    start_day = st.selectbox("📅 Day:", DAYS)
+with col2:
+    start_hour = st.slider("🕒 Choose Start Time (0–23):", 0, 23, 2)
+start_time = to_minutes(start_day, start_hour)
+delay_aware = st.checkbox("⏱️ Plan around predicted delays")
+min_connection = st.slider("🔁 Minimum Connection Time (min):", 0, 120, 30, 15, disabled=not delay_aware)
 
 if st.button("🔍 Find Best Route"):
     if source == destination:
         st.error("⚠️ Source and destination can't be the same.")
     else:
-        start_v = airport_vertices[source]
-        dest_v = airport_vertices[destination]
-        arrival_time, path = FlightAgency(flights, graph, start_v, dest_v, start_time)
+        def find_route():
+            if delay_aware:
+                # Arrivals include predicted delays, so connections they would break are skipped
+                arrival, slots = router.route_slots(source, destination, start_time, snapshot.expected, min_connection)
+            else:
+                arrival, slots = router.route_slots(source, destination, start_time)
+            return arrival, slots, [predict_delay(network.flight(slot)) for slot in slots]
+
+        options = (True, min_connection) if delay_aware else (False, 0)
+        arrival_time, path, delays = cached_route(query_cache, network, snapshot.version,
+                                                  source, destination, start_time, find_route, *options)
+        if delay_aware:
+            expected_arrival = arrival_time
+            arrival_time = path[-1].arrivalT if path else expected_arrival
 
         if path:
             st.success(f"📍 Route found from **{source}** to **{destination}**")
 
             total_delay = 0
             st.subheader("🧾 Itinerary")
-            for flight in path:
-                delay = predict_delay(flight)
+            for flight, delay in zip(path, delays):
                 total_delay += delay
                 emoji = "⚠️" if delay > 10 else "✅"
                 st.markdown(f"{emoji} **{flight}** | Delay: `{int(delay)} min`")
@@ -148,41 +133,121 @@ if st.button("🔍 Find Best Route"):
             st.subheader("🕓 Timing Summary")
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Arrival (No Delay)", f"{arrival_time}:00")
+                st.metric("Arrival (No Delay)", format_time(arrival_time))
             with col2:
-                adj_hour = arrival_time + int(total_delay // 60)
-                adj_min = int(total_delay % 60)
-                st.metric("With Delay", f"{adj_hour}:{adj_min:02d}")
-
-            # Save trip
-            try:
-                conn = sqlite3.connect(get_db_path())
-                cursor = conn.cursor()
-                itinerary_str = " → ".join([f.origin.name for f in path] + [path[-1].dest.name])
-                cursor.execute("""INSERT INTO trips (user_id, start, end, start_time, itinerary, arrival_time, delay_minutes)
-                                  VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                               (st.session_state.user_id, source, destination, start_time, itinerary_str, f"{arrival_time}:00", int(total_delay)))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                st.error(f"❌ Failed to save trip: {e}")
-
-            # Plot map
-            plot_geo_path(path)
+                with_delay = expected_arrival if delay_aware else arrival_time + total_delay
+                st.metric("With Delay", format_time(with_delay))
+
+            # Next best itineraries, from one more search on the same arrivals as the route above,
+            # which is left out wherever it ranks (ties can put another option first)
+            def flights_of(itinerary):
+                return [(f.name, f.departT, f.arrivalT) for f in itinerary]
+            options = {'min_connection': min_connection, 'expected': snapshot.expected} if delay_aware else {}
+            alternatives = [(alt_arrival, alt_path)
+                            for alt_arrival, alt_path in router.alternatives(source, destination, start_time, 4, **options)
+                            if flights_of(alt_path) != flights_of(path)][:3]
+            if alternatives:
+                with st.expander(f"🔀 {len(alternatives)} Other Options"):
+                    for alt_arrival, alt_path in alternatives:
+                        legs = " → ".join(f"{f.name} ({format_time(f.departT)})" for f in alt_path)
+                        arrives = "Arrives (with delays)" if delay_aware else "Arrives"
+                        st.markdown(f"🔸 {arrives} **{format_time(alt_arrival)}** | {len(alt_path) - 1} stop(s) | {legs}")
+
+            # Save trip (queued for the background writer)
+            itinerary_str = " → ".join([f.origin.name for f in path] + [path[-1].dest.name])
+            save_trip(st.session_state.user_id, source, destination, start_time, itinerary_str,
+                      format_time(arrival_time), int(total_delay))
+
+            # Plot map (folium is imported on the first route found)
+            from geo_visualize import plot_geo_path
+            map_html = plot_geo_path(path)  # in memory, so sessions don't share a file
             st.markdown("🗺️ **Route Map:**")
-            with open("flight_path_map.html", "r", encoding="utf-8") as f:
-                map_html = f.read()
             st.components.v1.html(map_html, height=500)
         else:
             st.error("❌ No valid path found.")
 
+# Multi-criteria search: the itineraries that are best for arrival time,
+# number of connections or predicted delay, and the trade-offs in between.
+if st.button("⚖️ Compare Trade-offs"):
+    if source == destination:
+        st.error("⚠️ Source and destination can't be the same.")
+    else:
+        journeys = router.pareto(source, destination, start_time, snapshot.delay_criterion,
+                                 min_connection if delay_aware else 0)
+        if journeys:
+            earliest = min(arrival for arrival, _, _ in journeys)
+            least_delay = min(delay for _, delay, _ in journeys)
+            rows = []
+            for arrival, delay, path in journeys:
+                tags = [tag for tag, best in (("⚡ Earliest", arrival == earliest),
+                                              ("🔁 Fewest Connections", len(path) == len(journeys[0][2])),
+                                              ("⏱️ Least Delay", delay == least_delay)) if best]
+                rows.append({
+                    "Best For": ", ".join(tags),
+                    "Arrives": format_time(arrival),
+                    "Connections": len(path) - 1,
+                    "Expected Delay": f"{int(delay)} min",
+                    "Flights": " → ".join(f.name for f in path),
+                })
+            st.subheader(f"⚖️ {len(journeys)} options from **{source}** to **{destination}**")
+            st.table(rows)
+        else:
+            st.error("❌ No valid path found.")
+
+# One profile query gives every option leaving that day, so moving the start
+# time needs no new search: each start time maps to the first row after it.
+if st.button("📋 Show All Departures That Day"):
+    if source == destination:
+        st.error("⚠️ Source and destination can't be the same.")
+    else:
+        day_start = to_minutes(start_day, 0)
+        options = (snapshot.expected, min_connection) if delay_aware else ()
+        journeys = router.profile(source, destination, day_start, day_start + MINUTES_PER_DAY, *options)
+        if journeys:
+            st.subheader(f"📋 {len(journeys)} options from **{source}** to **{destination}** on {start_day}")
+            st.table([{
+                "Departs": format_time(departure),
+                "Arrives": format_time(arrival),
+                "Duration": format_duration(arrival - departure),
+                "Stops": len(path) - 1,
+                "Flights": " → ".join(f.name for f in path),
+            } for departure, arrival, path in journeys])
+        else:
+            st.error("❌ No departures that day reach the destination.")
+
+# ---------------- Reachability ------------------
+with st.expander(f"🌐 Where can I get from {source}?"):
+    deadline_hour = st.slider("🏁 Arrive by (hour, same day):", 0, 23, 18)
+    deadline = to_minutes(start_day, deadline_hour)
+    # The matrix is built from the CSV, so not after live timetable updates (snapshot.revision)
+    if arrival_matrix is not None and start_time in arrival_matrix.start_index and not delay_aware and not snapshot.revision:
+        arrivals = arrival_matrix.reachable(source, start_time, deadline)  # precomputed lookup
+    else:
+        options = (snapshot.expected, min_connection) if delay_aware else ()
+        arrivals = {code: t for code, t in router.one_to_all(source, start_time, *options).items() if t <= deadline}
+    arrivals.pop(source, None)
+    if arrivals:
+        st.markdown(f"**{len(arrivals)}** airports reachable by {format_time(deadline)}:")
+        st.table([{"Airport": code, "Earliest Arrival": format_time(t)} for code, t in sorted(arrivals.items(), key=lambda item: item[1])])
+    else:
+        st.info("No airports reachable by then.")
+
 # ---------------- Show Past Trips ------------------
+# Newest first, a page at a time; "Show older" fetches the next page after the last one shown
 with st.expander("📒 View Your Saved Trips"):
-    trips = show_user_trips(st.session_state.user_id)
+    if "trip_cursors" not in st.session_state:
+        st.session_state.trip_cursors = [None]
+    trips = []
+    for before_id in st.session_state.trip_cursors:
+        page, cursor = get_trips(st.session_state.user_id, before_id=before_id)
+        trips.extend(page)
     if trips:
         st.markdown("### 🧳 Past Itineraries")
         for t in trips:
-            st.markdown(f"🔸 **{t[0]} → {t[1]}** | Start: {t[2]}:00 | ETA: {t[4]} (+{t[5]} min) | Route: `{t[3]}`")
+            st.markdown(f"🔸 **{t[0]} → {t[1]}** | Start: {format_time(t[2])} | ETA: {t[4]} (+{t[5]} min) | Route: `{t[3]}`")
+        if cursor is not None and st.button("⬇️ Show older trips"):
+            st.session_state.trip_cursors.append(cursor)
+            st.rerun()
     else:
         st.info("No saved trips found.")
 
@@ -0,0 +1,208 @@
+"""
+Goal-directed search (A* with landmark and great-circle bounds).
+
+search.earliest_arrival settles airports in order of arrival time, so it
+explores everything reachable sooner than the destination. A* orders them
+by arrival time plus a lower bound on the time still needed to reach the
+destination, and leaves alone the airports that lead away from it.
+
+Both bounds ignore waiting, which is why they hold at any time of day:
+
+- landmarks (ALT): shortest block-time distances to and from a few
+  landmark airports, precomputed on the static route graph; by the triangle
+  inequality dist(v, d) >= dist(L, d) - dist(L, v) and
+  >= dist(v, L) - dist(d, L) for every landmark L.
+- great circle: the distance from v to d over the fastest speed any route
+  in the timetable implies (at least MAX_CRUISE_KMH), for airports with
+  coordinates in airports.csv.
+
+Both are consistent, so every airport is settled once with its final
+arrival time and the results are exactly those of search.earliest_arrival.
+
+It is exact, not faster. On the Indian timetable the bounds miss the hours
+spent waiting for connections, so A* still settles about two thirds of the
+airports Dijkstra does, and the bound it computes per airport costs more
+than the ones skipped save: per query it is no quicker, and often slower
+(benchmarks/bench_astar.py). Use it to compare settled counts or as a
+check, not to speed up routing.
+"""
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+
+import search
+from airports import great_circle_km, load_airport_coords
+
+LANDMARKS = 8
+MAX_CRUISE_KMH = 950
+
+
+class Landmarks:
+    """
+    Lower bounds on the travel time between any two airports of a network,
+    precomputed once (see the module docstring).
+
+    network: Network with the CSR timetable
+    arrivalT: Arrival time per slot the bounds must hold for (the network's
+        own by default; pass the expected arrivals for delay-aware searches)
+    count: Number of landmarks, picked farthest-first
+    """
+
+    def __init__(self, network, arrivalT=None, count=LANDMARKS):
+        self.arrivalT = network.arrivalT if arrivalT is None else arrivalT
+        n = network.num_airports
+        nonempty = np.diff(network.flight_offsets) > 0
+        blocks = np.full(network.num_edges, np.inf)
+        blocks[nonempty] = np.minimum.reduceat(np.asarray(self.arrivalT) - network.departT,
+                                               network.flight_offsets[:-1][nonempty])
+        blocks = np.maximum(blocks, 0)
+
+        origins, targets = network.edge_origins(), network.edge_targets
+        forward = _adjacency(n, origins, targets, blocks)
+        backward = _adjacency(n, targets, origins, blocks)
+
+        # Farthest-first: start from the busiest airport, then keep adding the
+        # airport farthest (either way) from the landmarks chosen so far
+        ids, to_landmark, from_landmark = [], [], []
+        hub = int(np.argmax(np.diff(network.edge_offsets))) if n else 0
+        far = _spread(_distances(forward, hub), _distances(backward, hub))
+        for _ in range(min(count, n)):
+            far[ids] = -1.0
+            landmark = int(np.argmax(far)) if n else 0
+            if ids and far[landmark] <= 0:
+                break  # every other airport is a landmark or out of their reach
+            ids.append(landmark)
+            from_landmark.append(_distances(forward, landmark))
+            to_landmark.append(_distances(backward, landmark))
+            spread = _spread(from_landmark[-1], to_landmark[-1])
+            far = spread if len(ids) == 1 else np.minimum(far, spread)
+        self.landmarks = ids
+        self.from_landmark = np.array(from_landmark).reshape(len(ids), n)  # [i, v] = dist(L_i, v)
+        self.to_landmark = np.array(to_landmark).reshape(len(ids), n)      # [i, v] = dist(v, L_i)
+
+        # Great circle: unit speed is the fastest route in the timetable, so no flight beats the bound
+        coords = load_airport_coords()
+        self.located = np.array([code in coords for code in network.codes], dtype=bool)
+        latlon = np.array([coords.get(code, (0.0, 0.0)) for code in network.codes], dtype=np.float64).reshape(n, 2)
+        self.lat, self.lon = latlon[:, 0], latlon[:, 1]
+        routes = self.located[origins] & self.located[targets] & nonempty
+        km = great_circle_km(self.lat[origins[routes]], self.lon[origins[routes]],
+                             self.lat[targets[routes]], self.lon[targets[routes]])
+        minutes = blocks[routes]
+        if np.any((minutes == 0) & (km > 0)):
+            self.minutes_per_km = 0.0  # an instant flight: no distance bound holds
+        else:
+            fastest = float(np.max(km / minutes, initial=0.0)) if len(km) else 0.0
+            self.minutes_per_km = 1.0 / max(MAX_CRUISE_KMH / 60, fastest)
+
+    def bounds(self, d):
+        """
+        Lower bound on the minutes from every airport to airport id d, as an
+        array (inf where d cannot be reached at all).
+        """
+        bound = np.zeros(len(self.located))
+        if len(self.landmarks):
+            with np.errstate(invalid='ignore'):
+                # nan (inf - inf) means the landmark says nothing: fmax skips it
+                ahead = self.from_landmark[:, d][:, None] - self.from_landmark
+                behind = self.to_landmark - self.to_landmark[:, d][:, None]
+            bound = np.fmax(bound, np.fmax.reduce(np.fmax(ahead, behind), axis=0))
+        if self.minutes_per_km and self.located[d]:
+            km = great_circle_km(self.lat, self.lon, self.lat[d], self.lon[d])
+            # Floored, so the bound stays consistent with integer block times
+            bound = np.fmax(bound, np.where(self.located, np.floor(km * self.minutes_per_km), 0.0))
+        bound[d] = 0.0
+        return bound
+
+
+def earliest_arrival(network, s, startT, d=None, expected=None, min_connection=0, landmarks=None, stats=None):
+    """
+    Time-dependent A*: Dijkstra ordered by arrival time plus Landmarks.bounds.
+
+    Same arguments and result as search.earliest_arrival, which it falls
+    back to without a destination; T is exact for d and for every airport
+    settled before it, and an upper bound for the rest.
+
+    landmarks: Landmarks for the network (built here if not given; build
+        them once, for the arrivals in `expected` if given, and reuse them)
+    stats: Optional dict; stats['settled'] is set to the number of airports
+        the search settled
+    """
+    if d is None:
+        return search.earliest_arrival(network, s, startT, d, expected, min_connection, stats)
+    edge_offsets, edge_targets, flight_offsets, departT, arrivalT, best = network.views()
+    if expected is not None:
+        arrivalT, best = (memoryview(a) for a in expected)
+    if landmarks is None:
+        landmarks = Landmarks(network, None if expected is None else expected[0])
+    remaining = landmarks.bounds(d).tolist()
+
+    n = network.num_airports
+    T = [float('inf')] * n
+    prev_slot = [-1] * n
+    settled = bytearray(n)
+    T[s] = startT
+
+    # Entries are (arrival + bound, airport id); the first pop of an airport
+    # carries its current T, later ones are stale.
+    heap = [(startT + remaining[s], s)] if remaining[s] != float('inf') else []
+
+    while heap:
+        _, v = heapq.heappop(heap)
+        if settled[v]:
+            continue
+        settled[v] = 1
+        if v == d:
+            break
+
+        time = T[v]
+        ready = time if v == s else time + min_connection
+        for e in range(edge_offsets[v], edge_offsets[v + 1]):
+            w = edge_targets[e]
+            if settled[w] or remaining[w] == float('inf'):
+                continue
+            hi = flight_offsets[e + 1]
+            i = bisect_left(departT, ready, flight_offsets[e], hi)
+            if i == hi:
+                continue
+            slot = best[i]
+            arrival_time = arrivalT[slot]
+            if arrival_time < T[w]:
+                T[w] = arrival_time
+                prev_slot[w] = slot
+                heapq.heappush(heap, (arrival_time + remaining[w], w))
+
+    if stats is not None:
+        stats['settled'] = sum(settled)
+    return T, prev_slot
+
+
+def _adjacency(n, origins, targets, weights):
+    """Adjacency lists [(target, weight)] per airport, skipping edges with no flights."""
+    adjacency = [[] for _ in range(n)]
+    for a, b, w in zip(origins.tolist(), targets.tolist(), weights.tolist()):
+        if w != float('inf'):
+            adjacency[a].append((b, w))
+    return adjacency
+
+
+def _distances(adjacency, source):
+    """Static shortest distances from source over adjacency lists, as an array (inf if unreachable)."""
+    dist = [float('inf')] * len(adjacency)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        du, u = heapq.heappop(heap)
+        if du > dist[u]:
+            continue
+        for v, w in adjacency[u]:
+            if du + w < dist[v]:
+                dist[v] = du + w
+                heapq.heappush(heap, (du + w, v))
+    return np.array(dist)
+
+
+def _spread(there, back):
+    """Distance there and back, counting only the directions that are reachable."""
+    return np.where(np.isfinite(there), there, 0.0) + np.where(np.isfinite(back), back, 0.0)
@@ -0,0 +1,223 @@
+"""
+Bulk route queries for offline runs (e.g. every origin x destination x hour).
+
+The query file (CSV, or Parquet with pyarrow installed) has columns
+source, destination and start ('Tue 14:05' labels or minutes since Monday
+00:00). It is read in chunks; within a chunk the queries are grouped by
+(source, start) so each group is one one-to-all search whose tree answers
+every destination in it, and the groups are spread over worker processes.
+Results are written chunk by chunk, in input order, so memory stays
+bounded by the chunk size whatever the file size.
+
+Output columns: source, destination, start, arrival (scheduled, empty if
+unreachable), expected_arrival (with predicted delays), total_delay, legs
+and flights (flight numbers joined by ' > '). Queries with a missing or
+malformed start are written as unreachable.
+
+    python batch.py queries.csv routes.csv [--workers N] [--chunk ROWS]
+                    [--delay-aware] [--min-connection MIN] [--backend csa]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from router import get_router
+from snapshot import get_snapshot
+from timemodel import parse_time
+
+CHUNK_ROWS = 100000
+GROUPS_PER_TASK = 64
+OUTPUT_COLUMNS = ['source', 'destination', 'start', 'arrival', 'expected_arrival', 'total_delay', 'legs', 'flights']
+
+
+# ---------------- Routing ----------------
+_worker = {}
+
+
+def _init_worker(paths, backend, delay_aware, min_connection):
+    with contextlib.redirect_stdout(sys.stderr):
+        snapshot = get_snapshot(*paths)
+    _worker.update(snapshot=snapshot, router=get_router(snapshot.network, backend),
+                   expected=snapshot.expected if delay_aware else None, min_connection=min_connection)
+
+
+def route_groups(groups):
+    """
+    Answers groups of queries that share a source and start time, one
+    one-to-all search per group, in a worker initialized by _init_worker.
+    The search tree is walked once per group, so every destination's
+    itinerary extends its parent airport's.
+
+    groups: list of (source, startT, rows, destinations)
+
+    Returns:
+        (rows, arrival, expected_arrival, total_delay, legs, flights), one
+        entry per query; arrivals are nan where the destination is not reached
+    """
+    snapshot, router = _worker['snapshot'], _worker['router']
+    expected, min_connection = _worker['expected'], _worker['min_connection']
+    network, delays = snapshot.network, snapshot.delays
+    arrivalT = network.views()[4]
+    if 'slot_origins' not in _worker:
+        _worker.update(slot_origins=network.slot_origins().tolist(), names={})
+    slot_origins, names = _worker['slot_origins'], _worker['names']
+    unreached = (np.nan, np.nan, np.nan, 0, "")
+
+    def name(slot):
+        if slot not in names:
+            names[slot] = network.names[int(network.flight_ids[slot])]
+        return names[slot]
+
+    rows, results = [], []
+    for source, startT, group_rows, dests in groups:
+        rows.extend(group_rows)
+        src = network.index.get(source)
+        if src is None:
+            results.extend([unreached] * len(dests))
+            continue
+        T, prev_slot = router.earliest_arrival(src, startT, None, expected, min_connection)
+
+        # (legs, total delay, flight numbers) of the itinerary to each airport, from its parent's
+        tree = {src: (0, 0.0, ())}
+
+        def itinerary(v):
+            if v not in tree:
+                slot = prev_slot[v]
+                legs, delay, flights = itinerary(slot_origins[slot])
+                tree[v] = (legs + 1, delay + float(delays[slot]), flights + (slot,))
+            return tree[v]
+
+        for dest in dests:
+            dst = network.index.get(dest)
+            if dst is None or dst == src or T[dst] == float('inf'):
+                results.append(unreached)
+                continue
+            legs, delay, path = itinerary(dst)
+            # With expected arrivals the search already planned on delayed arrivals
+            results.append((arrivalT[path[-1]], T[dst] if expected is not None else T[dst] + delay,
+                            delay, legs, " > ".join(name(slot) for slot in path)))
+    return (rows, *(list(column) for column in zip(*results))) if results else (rows, [], [], [], [], [])
+
+
+def route_chunk(pool, chunk):
+    """
+    Routes one DataFrame chunk of queries on the pool.
+
+    Returns:
+        the chunk with the OUTPUT_COLUMNS, in input order
+    """
+    startTs = chunk['start'] if pd.api.types.is_numeric_dtype(chunk['start']) else chunk['start'].map(_start_minutes)
+    keys = pd.DataFrame({'source': chunk['source'].astype(str).to_numpy(), 'startT': startTs.to_numpy()})
+    groups = [(source, startT, rows.tolist(), chunk['destination'].iloc[rows].astype(str).tolist())
+              for (source, startT), rows in keys.groupby(['source', 'startT'], sort=False).indices.items()]
+    tasks = [groups[i:i + GROUPS_PER_TASK] for i in range(0, len(groups), GROUPS_PER_TASK)]
+
+    out = chunk[['source', 'destination', 'start']].reset_index(drop=True)
+    # Rows no group covers (no or a malformed start: groupby drops nan keys) stay unreachable
+    columns = {name: np.full(len(chunk), fill, dtype=dtype) for name, fill, dtype in
+               (('arrival', np.nan, np.float64), ('expected_arrival', np.nan, np.float64),
+                ('total_delay', np.nan, np.float64), ('legs', 0, np.int64), ('flights', "", object))}
+    for rows, *values in pool.map(route_groups, tasks):
+        for name, value in zip(columns, values):
+            columns[name][rows] = value
+    for name, column in columns.items():
+        out[name] = column
+    return out[OUTPUT_COLUMNS]
+
+
+def _start_minutes(value):
+    """parse_time, or nan for a missing or malformed start so one bad row does not abort the run."""
+    try:
+        return parse_time(value)
+    except (ValueError, AttributeError):
+        return np.nan
+
+
+# ---------------- Files ----------------
+def read_queries(path, chunk_rows=CHUNK_ROWS):
+    """Yields the query file as DataFrames of at most chunk_rows rows."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype={'source': str, 'destination': str})
+
+
+class ResultWriter:
+    """Appends result chunks to a CSV file, or a Parquet file (needs pyarrow)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = None
+
+    def write(self, chunk):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_batch(query_path, out_path, workers=None, chunk_rows=CHUNK_ROWS, delay_aware=False,
+              min_connection=0, backend='dijkstra', paths=(None, None, None), progress=sys.stderr):
+    """
+    Routes every query in query_path and writes the results to out_path,
+    reporting rows/sec to `progress` after each chunk.
+
+    workers: Worker processes (default: one per CPU)
+    paths: (csv, model, encoders[, db]) for the snapshot, as for get_snapshot
+
+    Returns:
+        number of rows written
+    """
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(paths, backend, delay_aware, min_connection)) as pool, \
+            ResultWriter(out_path) as writer:
+        for chunk in read_queries(query_path, chunk_rows):
+            writer.write(route_chunk(pool, chunk))
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                print(f"⏱️ {writer.rows} rows, {writer.rows / elapsed:,.0f} rows/s", file=progress, flush=True)
+    return writer.rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SkyPath bulk route queries")
+    parser.add_argument("queries", help="CSV or Parquet file with source, destination, start columns")
+    parser.add_argument("output", help="CSV or Parquet file to write")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--delay-aware", action="store_true", help="plan around predicted delays")
+    parser.add_argument("--min-connection", type=int, default=0, help="minimum connection time in minutes")
+    parser.add_argument("--backend", default='dijkstra', help="search backend, dijkstra or csa")
+    parser.add_argument("--csv", default=None, help="flights CSV (default: Indian-Airlines-Dataset.csv)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = run_batch(args.queries, args.output, args.workers or os.cpu_count(), args.chunk, args.delay_aware,
+                     args.min_connection, args.backend, (args.csv, None, None))
+    print(f"✅ Routed {rows} queries in {time.perf_counter() - started:.1f} s to {args.output}", file=sys.stderr)
@@ -0,0 +1,48 @@
+"""
+Benchmark: K alternative itineraries (alternatives.k_earliest) for growing
+K on the week-long expanded Indian-Airlines-Dataset.csv timetable, next to
+a single earliest-arrival search for reference.
+
+Run from the repo root:
+    python -m benchmarks.bench_alternatives
+"""
+import random
+import time
+
+import alternatives
+import search
+from benchmarks.bench_search import CSV_PATH
+from loader import load_network
+from timemodel import MINUTES_PER_DAY
+
+SEED = 42
+QUERIES = 200
+MIN_CONNECTION = 30
+
+
+def main():
+    network, _ = load_network(CSV_PATH)
+    rng = random.Random(SEED)
+    queries = []
+    for _ in range(QUERIES):
+        s, d = rng.sample(range(network.num_airports), 2)
+        queries.append((s, d, rng.randint(0, 6 * MINUTES_PER_DAY)))
+
+    started = time.perf_counter()
+    for s, d, t in queries:
+        search.earliest_arrival(network, s, t, d, None, MIN_CONNECTION)
+    single = (time.perf_counter() - started) * 1000 / QUERIES
+
+    print(f"{len(network)} departures, {network.num_airports} airports, {QUERIES} queries")
+    print(f"one earliest-arrival search : {single:7.3f} ms/query")
+    for k in (1, 3, 5, 10, 20):
+        found = 0
+        started = time.perf_counter()
+        for s, d, t in queries:
+            found += len(alternatives.k_earliest(network, s, d, t, k, MIN_CONNECTION))
+        elapsed = (time.perf_counter() - started) * 1000 / QUERIES
+        print(f"k = {k:2d}                      : {elapsed:7.3f} ms/query ({found / QUERIES:.1f} itineraries)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: goal-directed A* (astar.py) vs. plain time-dependent Dijkstra
+on point-to-point queries: airports settled per query (the pruning) and
+time per query, for a growing number of landmarks, checking that every
+query gets the same arrival.
+
+Runs on the Indian-Airlines-Dataset.csv timetable, or on a synthetic one
+(benchmarks.synthetic; no coordinates, so landmarks only) with a scale.
+
+Run from the repo root:
+    python -m benchmarks.bench_astar [small|medium|large]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import astar
+import search
+from benchmarks.bench_search import CSV_PATH
+from benchmarks.synthetic import write_synthetic_csv
+from loader import load_network
+from timemodel import MINUTES_PER_DAY
+
+SEED = 42
+QUERIES = 300
+MIN_CONNECTION = 45
+
+
+def main(scale=None):
+    csv_path = CSV_PATH
+    if scale is not None:
+        csv_path = os.path.join(tempfile.mkdtemp(), f"flights_{scale}.csv")
+        write_synthetic_csv(csv_path, scale)
+    network, _ = load_network(csv_path)
+    rng = random.Random(SEED)
+    queries = []
+    for _ in range(QUERIES):
+        s, d = rng.sample(range(network.num_airports), 2)
+        queries.append((s, d, rng.randint(0, 6 * MINUTES_PER_DAY)))
+
+    print(f"{len(network)} departures, {network.num_airports} airports, {QUERIES} queries")
+    for min_connection in (0, MIN_CONNECTION):
+        print(f"\nmin_connection = {min_connection} min")
+        settled, arrivals = 0, []
+        started = time.perf_counter()
+        for s, d, t in queries:
+            stats = {}
+            T, _ = search.earliest_arrival(network, s, t, d, None, min_connection, stats)
+            settled += stats['settled']
+            arrivals.append(T[d])
+        elapsed = time.perf_counter() - started
+        print(f"dijkstra            : {settled / QUERIES:7.1f} settled {elapsed * 1000 / QUERIES:7.3f} ms/query")
+
+        for count in (1, 4, 8, 16):
+            started = time.perf_counter()
+            landmarks = astar.Landmarks(network, count=count)
+            build = time.perf_counter() - started
+            settled, mismatches = 0, 0
+            started = time.perf_counter()
+            for (s, d, t), reference in zip(queries, arrivals):
+                stats = {}
+                T, _ = astar.earliest_arrival(network, s, t, d, None, min_connection, landmarks, stats)
+                settled += stats['settled']
+                mismatches += T[d] != reference
+            elapsed = time.perf_counter() - started
+            print(f"astar {len(landmarks.landmarks):2d} landmarks : {settled / QUERIES:7.1f} settled "
+                  f"{elapsed * 1000 / QUERIES:7.3f} ms/query (built in {build * 1000:.1f} ms, "
+                  f"{mismatches} mismatches)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
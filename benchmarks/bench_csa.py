@@ -0,0 +1,56 @@
+"""
+Benchmark: Dijkstra vs. Connection Scan (CSA) routing backends on the
+week-long expanded Indian-Airlines-Dataset.csv timetable.
+
+Times single queries through Router.route and a stream of queries through
+Router.route_many (where CSA scans batches of queries at once), with and
+without a minimum connection time, and checks that every backend finds the
+same arrival times.
+
+Run from the repo root:
+    python -m benchmarks.bench_csa
+"""
+import random
+import time
+
+from benchmarks.bench_search import CSV_PATH
+from loader import load_network
+from router import ROUTERS, get_router
+from timemodel import MINUTES_PER_DAY
+
+SEED = 42
+QUERIES = 2000
+SINGLE_QUERIES = 300
+MIN_CONNECTION = 45
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    network, _ = load_network(CSV_PATH)
+    rng = random.Random(SEED)
+    airports = list(range(network.num_airports))
+    queries = [(rng.choice(airports), rng.choice(airports), rng.randint(0, 6 * MINUTES_PER_DAY))
+               for _ in range(QUERIES)]
+    routers = [get_router(network, backend) for backend in ROUTERS]
+
+    print(f"{len(network)} departures, {network.num_airports} airports, {QUERIES} queries")
+    for min_connection in (0, MIN_CONNECTION):
+        print(f"\nmin_connection = {min_connection} min")
+        arrivals = []
+        for router in routers:
+            single, _ = timed(lambda: [router.route(s, d, t, None, min_connection) for s, d, t in queries[:SINGLE_QUERIES]])
+            batch, results = timed(router.route_many, queries, None, min_connection)
+            arrivals.append([arrival for arrival, _ in results])
+            print(f"{router.name:9s} route: {single * 1000 / SINGLE_QUERIES:7.3f} ms/query   "
+                  f"route_many: {batch * 1000 / QUERIES:7.3f} ms/query")
+        mismatches = sum(1 for row in zip(*arrivals) if len(set(row)) > 1)
+        print(f"arrival mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
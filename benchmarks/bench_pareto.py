@@ -0,0 +1,50 @@
+"""
+Benchmark: multi-criteria (arrival, flights, predicted delay) routing on the
+week-long expanded Indian-Airlines-Dataset.csv timetable.
+
+Delays are drawn at random (mean 12 min) so the delay criterion actually
+splits itineraries; the arrival-only search is timed for reference.
+
+Run from the repo root:
+    python -m benchmarks.bench_pareto
+"""
+import random
+import time
+
+import numpy as np
+
+import raptor
+from benchmarks.bench_search import CSV_PATH
+from loader import load_network
+from timemodel import MINUTES_PER_DAY
+
+SEED = 42
+QUERIES = 300
+MIN_CONNECTION = 30
+
+
+def main():
+    network, _ = load_network(CSV_PATH)
+    delays = np.random.default_rng(SEED).gamma(1.0, 12.0, len(network))
+    rng = random.Random(SEED)
+    queries = []
+    for _ in range(QUERIES):
+        s, d = rng.sample(range(network.num_airports), 2)
+        queries.append((s, d, rng.randint(0, 6 * MINUTES_PER_DAY)))
+
+    print(f"{len(network)} departures, {network.num_airports} airports, {QUERIES} queries, "
+          f"up to {raptor.MAX_LEGS} flights")
+    for name, criterion in (("arrival, flights", None),
+                            ("arrival, flights, delay", raptor.delay_criterion(network, delays))):
+        times, journeys = [], 0
+        for s, d, t in queries:
+            started = time.perf_counter()
+            journeys += len(raptor.pareto_journeys(network, s, d, t, criterion, MIN_CONNECTION))
+            times.append(time.perf_counter() - started)
+        times = np.array(times) * 1000
+        print(f"{name:24s}: {times.mean():6.2f} ms/query (p95 {np.percentile(times, 95):6.2f} ms), "
+              f"{journeys / QUERIES:.2f} itineraries")
+
+
+if __name__ == '__main__':
+    main()
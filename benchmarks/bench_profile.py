@@ -0,0 +1,60 @@
+"""
+Benchmark: one profile query per pair and day vs. independent earliest-
+arrival searches, on the week-long expanded Indian-Airlines-Dataset.csv
+timetable.
+
+The profile query returns every non-dominated journey of the day; the
+baselines are the 24 hourly searches of dragging the start-time slider and
+one search per departure from the source, which is what it takes to find
+the same journeys by hand.
+
+Run from the repo root:
+    python -m benchmarks.bench_profile
+"""
+import random
+import time
+
+from benchmarks.bench_search import CSV_PATH
+from loader import load_network
+from router import get_router
+from timemodel import MINUTES_PER_DAY, MINUTES_PER_HOUR
+
+SEED = 42
+PAIRS = 100
+
+
+def main():
+    network, _ = load_network(CSV_PATH)
+    router = get_router(network)
+    rng = random.Random(SEED)
+    pairs = []
+    for _ in range(PAIRS):
+        s, d = rng.sample(range(network.num_airports), 2)
+        pairs.append((s, d, rng.randrange(6) * MINUTES_PER_DAY))
+
+    started = time.perf_counter()
+    journeys = sum(len(router.profile(s, d, day, day + MINUTES_PER_DAY)) for s, d, day in pairs)
+    profile_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for s, d, day in pairs:
+        for hour in range(24):
+            router.route(s, d, day + hour * MINUTES_PER_HOUR)
+    hourly_time = time.perf_counter() - started
+
+    searches = 0
+    started = time.perf_counter()
+    for s, d, day in pairs:
+        for t in network.departures(s, day, day + MINUTES_PER_DAY):
+            router.route(s, d, t)
+            searches += 1
+    departures_time = time.perf_counter() - started
+
+    print(f"{len(network)} departures, {network.num_airports} airports, {PAIRS} pairs, one day each")
+    print(f"profile query           : {profile_time * 1000 / PAIRS:8.3f} ms/pair ({journeys / PAIRS:.1f} journeys)")
+    print(f"24 hourly searches      : {hourly_time * 1000 / PAIRS:8.3f} ms/pair")
+    print(f"search per departure    : {departures_time * 1000 / PAIRS:8.3f} ms/pair ({searches / PAIRS:.1f} searches)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Microbenchmark: heapq search core vs. the old queue.PriorityQueue FlightAgency
+on the Indian-Airlines-Dataset.csv network.
+
+Runs on the week-long expanded timetable the loader builds (every row of the
+CSV turned into its dated departures, times in minutes).
+
+Run from the repo root:
+    python -m benchmarks.bench_search
+"""
+import os
+import queue
+import random
+import time
+
+from flight import Flight, Vertex, Graph as FlightGraph, FlightAgency, Schedule
+from loader import load_network
+from timemodel import MINUTES_PER_DAY
+from timetable import Timetable
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Indian-Airlines-Dataset.csv")
+SEED = 42
+QUERIES = 300
+
+
+def legacy_flight_agency(F, G, s, d, startT):
+    """The pre-heapq FlightAgency: every vertex pre-seeded, no stale skipping, no early exit."""
+    timetable = F if isinstance(F, Timetable) else Timetable(F)
+
+    T = {vertex: float('inf') for vertex in G.vertices}
+    T[s] = startT
+    prev_flight = {}
+
+    q = queue.PriorityQueue()
+    for vertex in G.vertices:
+        q.put(Schedule(vertex, T[vertex]))
+
+    while not q.empty():
+        current_vertex = q.get().vertex
+        for neighbor in current_vertex.adjacentVertices:
+            best_flight = timetable.earliest_flight(current_vertex, neighbor, T[current_vertex])
+            if best_flight is not None and best_flight.arrivalT < T[neighbor]:
+                T[neighbor] = best_flight.arrivalT
+                prev_flight[neighbor] = best_flight
+                q.put(Schedule(neighbor, best_flight.arrivalT))
+
+    path = []
+    current = d
+    while current != s:
+        if current not in prev_flight:
+            return float('inf'), []
+        path.append(prev_flight[current])
+        current = prev_flight[current].origin
+    path.reverse()
+    return T[d], path
+
+
+def build_indian_network():
+    network, _ = load_network(CSV_PATH)
+
+    # Materialize Flight/Vertex objects with adjacency lists for the legacy loop
+    vertices = {code: Vertex(code, []) for code in network.codes}
+    flights = []
+    for slot in range(len(network)):
+        flight = network.flight(slot)
+        origin, dest = vertices[flight.origin.name], vertices[flight.dest.name]
+        if dest not in origin.adjacentVertices:
+            origin.adjacentVertices.append(dest)
+        flights.append(Flight(flight.name, origin, dest, flight.arrivalT, flight.departT))
+
+    return flights, FlightGraph(list(vertices.values())), vertices
+
+
+def run(fn, timetable, graph, queries):
+    results = []
+    started = time.perf_counter()
+    for s, d, t in queries:
+        results.append(fn(timetable, graph, s, d, t))
+    return time.perf_counter() - started, results
+
+
+def main():
+    flights, graph, airport_vertices = build_indian_network()
+    timetable = Timetable(flights)
+    rng = random.Random(SEED)
+    vertices = list(airport_vertices.values())
+    queries = [(rng.choice(vertices), rng.choice(vertices), rng.randint(0, 6 * MINUTES_PER_DAY)) for _ in range(QUERIES)]
+
+    legacy_time, legacy_results = run(legacy_flight_agency, timetable, graph, queries)
+    heap_time, heap_results = run(FlightAgency, timetable, graph, queries)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, heap_results) if a[0] != b[0])
+    print(f"{len(flights)} departures, {len(vertices)} airports, {QUERIES} queries")
+    print(f"queue.PriorityQueue : {legacy_time * 1000 / QUERIES:8.3f} ms/query")
+    print(f"heapq               : {heap_time * 1000 / QUERIES:8.3f} ms/query")
+    print(f"speedup             : {legacy_time / heap_time:8.2f}x")
+    print(f"arrival mismatches  : {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Startup budget: how long importing an entry point takes, measured in a
+fresh interpreter with `python -X importtime`, and which heavy libraries it
+pulls in before they are needed.
+
+main.py should import only what login and the trip list need; the route
+search, the delay model and the plotting libraries load on first use.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup [module] [--budget MS]
+
+Exits with status 1 if the import takes longer than the budget (best of
+RUNS) or loads any of HEAVY_MODULES.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+BUDGET_MS = 100
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'networkx', 'folium', 'joblib', 'sklearn')
+
+
+def import_times(module):
+    """
+    Imports `module` in a fresh interpreter under -X importtime.
+
+    Returns:
+        {module name: (self us, cumulative us)} for every module it imported,
+        leaving out what the interpreter imports at startup (site)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if name == " site":
+            times = {}  # everything so far was the interpreter's own startup
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def check_startup(module='main', runs=RUNS):
+    """
+    Returns:
+        (best cumulative import time of `module` in ms, HEAVY_MODULES it
+        loaded, its slowest imports as (name, cumulative ms) from the best run)
+    """
+    best = None
+    for _ in range(runs):
+        times = import_times(module)
+        if best is None or times[module][1] < best[module][1]:
+            best = times
+    heavy = sorted({name.split(".")[0] for name in best} & set(HEAVY_MODULES))
+    slowest = sorted(((name, cumulative / 1000) for name, (_, cumulative) in best.items() if name != module),
+                     key=lambda item: -item[1])[:10]
+    return best[module][1] / 1000, heavy, slowest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SkyPath startup budget check")
+    parser.add_argument("module", nargs="?", default='main')
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="import budget in ms")
+    args = parser.parse_args()
+
+    total, heavy, slowest = check_startup(args.module)
+    print(f"import {args.module}: {total:.1f} ms (best of {RUNS}, budget {args.budget:.0f} ms)")
+    for name, ms in slowest:
+        print(f"  {name:40s} {ms:8.1f} ms")
+    if heavy:
+        print(f"❌ loads {', '.join(heavy)} at startup")
+    if total > args.budget:
+        print(f"❌ over budget by {total - args.budget:.1f} ms")
+    sys.exit(1 if heavy or total > args.budget else 0)
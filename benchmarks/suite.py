@@ -0,0 +1,226 @@
+"""
+Benchmark suite: timetable load, graph build, routing, delay prediction and
+trip persistence on a seeded synthetic network (benchmarks.synthetic), with
+the results written as JSON so runs can be compared.
+
+Every benchmark reports the best of REPEAT runs as seconds, microseconds per
+operation and operations per second.
+
+Run from the repo root:
+    python -m benchmarks.suite [--scale small|medium|large] [--out results.json]
+                               [--compare baseline.json] [--only route,predict]
+
+The table goes to stderr; the JSON goes to --out, or stdout without it.
+--compare prints each benchmark's per-operation time against a previous run.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import compiled
+import loader
+from benchmarks.synthetic import SCALES, SEED, write_synthetic_csv
+from database import close_connections, get_trip_writer, get_trips, init_db, save_trip
+from flight import FlightAgency
+from network import Network
+from predictor import LinearDelayPredictor
+from router import get_router
+from timemodel import MINUTES_PER_DAY
+
+REPEAT = 3
+QUERIES = 300
+BATCH_QUERIES = 2000
+PREDICT_FLIGHTS = 2000
+TRIPS = 2000
+
+
+def best_of(fn, repeat=REPEAT):
+    """Smallest wall time of `repeat` calls to fn(); returns (seconds, last result)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def result(seconds, ops):
+    return {'ops': ops, 'seconds': round(seconds, 6), 'per_op_us': round(seconds * 1e6 / ops, 3),
+            'ops_per_s': round(ops / seconds, 1) if seconds else None}
+
+
+# ---------------- Benchmarks ----------------
+def bench_load(ctx):
+    """CSV -> Network, compiling it, and memory-mapping the compiled file."""
+    csv_path = ctx['csv_path']
+    seconds, (network, stats) = best_of(lambda: loader.load_network(csv_path))
+    ctx['network'] = network
+    compiled_path = compiled.get_compiled_path(csv_path)
+    compile_seconds, _ = best_of(lambda: compiled.compile_network(network, compiled_path, csv_path, stats['rows']))
+    mmap_seconds, _ = best_of(lambda: compiled.load_compiled(compiled_path))
+    return {
+        'load_csv': result(seconds, len(network)),
+        'compile': result(compile_seconds, len(network)),
+        'load_compiled': result(mmap_seconds, len(network)),
+    }
+
+
+def bench_build(ctx):
+    """Network CSR build from per-departure columns (no CSV parsing)."""
+    network = ctx['network']
+    codes = np.asarray(network.codes)
+    columns = (codes[network.slot_origins()], codes[network.slot_dests()], network.departT, network.arrivalT,
+               np.asarray(network.names, dtype=object)[network.flight_ids])
+    seconds, _ = best_of(lambda: Network.from_arrays(*columns))
+    return {'graph_build': result(seconds, len(network))}
+
+
+def bench_route(ctx):
+    """Single FlightAgency queries per backend, and CSA batches through route_many."""
+    network = ctx['network']
+    rng = random.Random(SEED)
+    queries = [(*rng.sample(network.codes, 2), rng.randint(0, 6 * MINUTES_PER_DAY)) for _ in range(BATCH_QUERIES)]
+    results = {}
+    for backend in ('dijkstra', 'csa'):
+        seconds, _ = best_of(lambda: [FlightAgency(network, None, s, d, t, backend=backend) for s, d, t in queries[:QUERIES]])
+        results[f'route_{backend}'] = result(seconds, QUERIES)
+    router = get_router(network, 'csa')
+    seconds, _ = best_of(lambda: router.route_many(queries))
+    results['route_many_csa'] = result(seconds, BATCH_QUERIES)
+    return results
+
+
+def bench_predict(ctx):
+    """predict_flights one flight at a time vs. the whole timetable in one batch."""
+    network = ctx['network']
+    predictor = LinearDelayPredictor.load()
+    flights = [network.flight(slot) for slot in range(0, len(network), max(1, len(network) // PREDICT_FLIGHTS))]
+    per_flight, _ = best_of(lambda: [predictor.predict_flights([f]) for f in flights])
+    batched, _ = best_of(lambda: predictor.predict_network(network))
+    return {
+        'predict_per_flight': result(per_flight, len(flights)),
+        'predict_batched': result(batched, len(network)),
+    }
+
+
+def bench_trips(ctx):
+    """Trips saved through the background writer (until flushed), and history read a page at a time."""
+    db_path = os.path.join(ctx['tmp'], "trips.db")
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout for the JSON
+        init_db(db_path)
+    users = 50
+    rows = [(i % users, "DEL", "BOM", i, "DEL → BOM", "Mon 10:00", i % 30) for i in range(TRIPS)]
+
+    def save():
+        for row in rows:
+            save_trip(*row, db_path=db_path)
+        get_trip_writer(db_path).flush()
+
+    def read():
+        pages = 0
+        for user_id in range(users):
+            cursor = None
+            while True:
+                _, cursor = get_trips(user_id, before_id=cursor, db_path=db_path)
+                pages += 1
+                if cursor is None:
+                    break
+        return pages
+
+    save_seconds, _ = best_of(save, 1)
+    read_seconds, pages = best_of(read)
+    get_trip_writer(db_path).close()
+    close_connections()
+    return {'trip_save': result(save_seconds, TRIPS), 'trip_read': result(read_seconds, pages)}
+
+
+BENCHMARKS = {
+    'load': bench_load,
+    'build': bench_build,
+    'route': bench_route,
+    'predict': bench_predict,
+    'trips': bench_trips,
+}
+
+
+# ---------------- Runner ----------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(scale='small', only=None):
+    """
+    Runs the benchmarks (all, or the names in `only`; load always runs as
+    the others need its network) on the synthetic dataset for `scale`.
+
+    Returns:
+        dict with 'meta' (scale, sizes, seed, versions, commit) and
+        'results' {benchmark: {ops, seconds, per_op_us, ops_per_s}}
+    """
+    tmp = tempfile.mkdtemp()
+    try:
+        ctx = {'tmp': tmp, 'csv_path': os.path.join(tmp, f"flights_{scale}.csv")}
+        rows = write_synthetic_csv(ctx['csv_path'], scale)
+        results = {}
+        for name, bench in BENCHMARKS.items():
+            if name == 'load' or only is None or name in only:
+                results.update(bench(ctx))
+        network = ctx['network']
+    finally:
+        shutil.rmtree(tmp)
+
+    meta = {
+        'scale': scale, 'seed': SEED, 'rows': rows, 'airports': network.num_airports,
+        'departures': len(network), 'edges': network.num_edges, 'repeat': REPEAT,
+        'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+        'cpus': os.cpu_count(), 'commit': _git_commit(), 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return {'meta': meta, 'results': results}
+
+
+def print_table(report, baseline=None, out=sys.stderr):
+    meta = report['meta']
+    print(f"{meta['scale']}: {meta['departures']} departures, {meta['airports']} airports, {meta['edges']} edges",
+          file=out)
+    for name, r in report['results'].items():
+        line = f"{name:20s} {r['per_op_us']:12.3f} us/op {r['ops_per_s'] or 0:14,.0f} ops/s"
+        if baseline is not None and name in baseline['results']:
+            line += f"   {r['per_op_us'] / baseline['results'][name]['per_op_us']:6.2f}x baseline"
+        print(line, file=out)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SkyPath benchmark suite")
+    parser.add_argument("--scale", choices=sorted(SCALES), default='small')
+    parser.add_argument("--out", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--only", help="comma-separated benchmarks: " + ", ".join(BENCHMARKS))
+    args = parser.parse_args()
+
+    report = run_suite(args.scale, args.only.split(",") if args.only else None)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,70 @@
+"""
+Synthetic flight datasets of any size, in the Indian-Airlines-Dataset.csv
+format (fltno, source, dest, freq), for benchmarking.
+
+Like generate_flight_data.py, but seeded and scalable: airports get
+three-letter codes, and routes favour a few hubs (Zipf-like weights) as
+real networks do. loader.synthetic_schedule turns each row into `freq`
+weekly departures, 4 on average.
+
+    python -m benchmarks.synthetic large flights_large.csv
+"""
+import sys
+from itertools import product
+from string import ascii_uppercase
+
+import numpy as np
+import pandas as pd
+
+SEED = 42
+# name: (airports, weekly departures)
+SCALES = {
+    'small': (100, 50000),
+    'medium': (300, 250000),
+    'large': (1000, 1000000),
+}
+MEAN_FREQ = 4
+
+
+def airport_codes(n):
+    """n distinct three-letter codes, AAA, AAB, ..."""
+    return ["".join(letters) for _, letters in zip(range(n), product(ascii_uppercase, repeat=3))]
+
+
+def synthetic_flights(airports, departures, seed=SEED):
+    """
+    Returns:
+        DataFrame with fltno, source, dest, freq rows that expand to about
+        `departures` weekly departures between `airports` airports
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.asarray(airport_codes(airports))
+    rows = max(1, departures // MEAN_FREQ)
+
+    weights = 1.0 / np.arange(1, airports + 1)
+    weights /= weights.sum()
+    source = rng.choice(airports, size=rows, p=weights)
+    # A different destination for every row: shift by 1..airports-1
+    dest = (source + 1 + rng.choice(airports - 1, size=rows, p=weights[:-1] / weights[:-1].sum())) % airports
+    freq = rng.integers(1, 2 * MEAN_FREQ, size=rows)  # 1..7
+
+    return pd.DataFrame({
+        'fltno': [f"SX {i}" for i in range(rows)],
+        'source': codes[source],
+        'dest': codes[dest],
+        'freq': freq,
+    })
+
+
+def write_synthetic_csv(path, scale='small', seed=SEED):
+    """Writes the dataset for a SCALES entry to path; returns its row count."""
+    df = synthetic_flights(*SCALES[scale], seed=seed)
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+if __name__ == '__main__':
+    scale = sys.argv[1] if len(sys.argv) > 1 else 'small'
+    path = sys.argv[2] if len(sys.argv) > 2 else f"flights_{scale}.csv"
+    rows = write_synthetic_csv(path, scale)
+    print(f"✅ Wrote {rows} flights ({SCALES[scale][0]} airports) to {path}")
@@ -0,0 +1,265 @@
+"""
+Query-result cache.
+
+The same few routes are asked for over and over, so results are kept in a
+bounded in-memory map with least-recently-used eviction and a time-to-live,
+optionally backed by a SQLite table so warm entries survive a restart.
+
+Keys are tuples of plain values that include the timetable version
+(NetworkSnapshot.version or Network.fingerprint()), so reloading the CSV
+or the delay model simply stops old entries from being hit; they age out
+through the LRU and the TTL. Values must be JSON-serializable.
+
+    cache = get_query_cache()
+    arrival, flights, delays = cached_route(cache, network, version, 'DEL', 'BOM', startT, compute)
+
+where compute() returns (arrival, slots, delays) from Router.route_slots.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 1024
+TTL_SECONDS = 6 * 60 * 60
+
+
+def get_cache_path():
+    return os.path.join(os.path.dirname(__file__), "query_cache.db")
+
+
+class QueryCache:
+    """
+    LRU + TTL cache with hit/miss counters and an optional SQLite tier.
+
+    max_entries: Entries kept in memory; the least recently used goes first
+    ttl: Seconds an entry stays valid, in memory and on disk
+    db_path: Optional SQLite file for the second tier; misses in memory
+        fall through to it and every put is written through
+    clock: Time source in seconds (wall-clock, so disk entries expire
+        across restarts too)
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, db_path=None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires, value), oldest use first
+        self._lock = threading.Lock()  # Streamlit sessions share one cache
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if db_path is not None:
+            self._init_db()
+
+    # ---------------- Lookups ----------------
+    def get(self, key, default=None):
+        """Cached value for key, or default if it is missing or expired."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        entry = self._db_get(key, now) if self.db_path is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, entry)
+        return entry[1]
+
+    def put(self, key, value):
+        """Stores value under key for the next `ttl` seconds."""
+        entry = (self.clock() + self.ttl, value)
+        with self._lock:
+            self._store(key, entry)
+        if self.db_path is not None:
+            self._db_put(key, entry)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, calling compute() and storing its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def rekey(self, rekey_fn):
+        """
+        Moves every entry to the key rekey_fn(key, value) returns, dropping
+        it when that is None. In the SQLite tier the moved entries are
+        copied and the originals kept: they are still right for the
+        timetable they were computed on, should it be loaded again.
+        """
+        with self._lock:
+            entries = OrderedDict()
+            for key, entry in self._entries.items():
+                new_key = rekey_fn(key, entry[1])
+                if new_key is not None:
+                    entries[new_key] = entry
+            self._entries = entries
+        if self.db_path is None:
+            return
+
+        conn = self._connect()
+        with conn:
+            rows = conn.execute("SELECT key, value, expires FROM query_cache WHERE expires > ?",
+                                (self.clock(),)).fetchall()
+            copies = []
+            for key, value, expires in rows:
+                key = tuple(json.loads(key))
+                new_key = rekey_fn(key, json.loads(value))
+                if new_key is not None and new_key != key:
+                    copies.append((json.dumps(new_key), value, expires))
+            conn.executemany("INSERT OR REPLACE INTO query_cache (key, value, expires) VALUES (?, ?, ?)", copies)
+        conn.close()
+
+    def clear(self):
+        """Drops every entry, in memory and on disk; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path is not None:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM query_cache")
+            conn.close()
+
+    def stats(self):
+        """Counters for monitoring: hits (memory + disk), disk_hits, misses, evictions, entries, hit_rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ---------------- SQLite tier ----------------
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+            """)
+            conn.execute("DELETE FROM query_cache WHERE expires <= ?", (self.clock(),))
+        conn.close()
+
+    def _db_get(self, key, now):
+        conn = self._connect()
+        row = conn.execute("SELECT value, expires FROM query_cache WHERE key = ? AND expires > ?",
+                           (json.dumps(key), now)).fetchone()
+        conn.close()
+        return None if row is None else (row[1], json.loads(row[0]))
+
+    def _db_put(self, key, entry):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO query_cache (key, value, expires) VALUES (?, ?, ?)",
+                         (json.dumps(key), json.dumps(entry[1]), entry[0]))
+        conn.close()
+
+
+_MISSING = object()
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_cache(db_path=None):
+    """
+    Process-wide cache, created on first use, with its SQLite tier at
+    db_path (get_cache_path() by default).
+    """
+    db_path = db_path or get_cache_path()
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = _caches[db_path] = QueryCache(db_path=db_path)
+        return cache
+
+
+def cached_route(cache, network, version, s, d, startT, compute, *options):
+    """
+    An itinerary with its predicted delays, from the cache when possible.
+
+    network: Network the itinerary is on; flights are cached by flight id
+    version: Timetable version the result is valid for
+    s, d: Source and destination airport codes
+    startT: Start time in minutes since Monday 00:00
+    compute: Called on a miss; returns (arrival, slots, delays per flight),
+        with the slots from Router.route_slots (flights sharing an edge and
+        a departure time can only be told apart by slot)
+    options: Anything else the result depends on (e.g. delay-aware flag,
+        minimum connection time), part of the key
+
+    Returns:
+        (arrival, flights, delays); arrival is inf and flights empty if
+        there is no itinerary
+    """
+    def record():
+        arrival, slots, delays = compute()
+        return {'arrival': arrival, 'flights': [int(network.flight_ids[slot]) for slot in slots],
+                'delays': [float(delay) for delay in delays]}
+
+    key = ('route', version, str(s), str(d), int(startT), *options)
+    result = cache.get_or_compute(key, record)
+    flights = [network.flight(network.slot_of(flight_id)) for flight_id in result['flights']]
+    return result['arrival'], flights, result['delays']
+
+
+def carry_over_routes(cache, old_version, new_version, removed, added):
+    """
+    After a timetable update, moves the cached routes of old_version to
+    new_version, except those the update may have changed: routes that
+    take a removed flight, and routes an added flight could beat because
+    it leaves no earlier than their start and lands before their arrival.
+
+    removed: flight ids of the cancelled flights
+    added: (departT, arrivalT) of each added flight
+
+    Returns:
+        number of routes dropped from memory
+    """
+    removed = set(removed)
+
+    def rekey(key, value):
+        if key[0] != 'route' or key[1] != old_version:
+            return key
+        startT, arrival = key[4], value['arrival']
+        if removed.intersection(value['flights']) or any(dep >= startT and arr < arrival for dep, arr in added):
+            return None
+        return (key[0], new_version) + tuple(key[2:])
+
+    before = len(cache)
+    cache.rekey(rekey)
+    return before - len(cache)
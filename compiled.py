@@ -0,0 +1,180 @@
+"""
+Precompiled on-disk network format.
+
+The CSV stays the source of truth; `load_network` compiles it to a binary
+file next to it and memory-maps that file on later starts, so the arrays
+are used straight from the page cache without parsing or copying.
+
+File layout (little-endian):
+
+    b"SKYPATH\\0"                 magic
+    uint32                        format version
+    uint32                        header length
+    header                        UTF-8 JSON: source stamp, array table
+    padding to 64 bytes
+    arrays                        raw array bytes, each 64-byte aligned
+
+Run `python compiled.py [csv_path]` to (re)compile by hand.
+"""
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+import loader
+from network import Network
+
+MAGIC = b"SKYPATH\0"
+FORMAT_VERSION = 3  # 2: minute-resolution, week-expanded timetable; 3: duplicate CSV rows merged
+ALIGN = 64
+_PREFIX = struct.Struct("<8sII")
+
+_ARRAYS = ('edge_offsets', 'edge_targets', 'flight_offsets', 'departT', 'arrivalT', 'flight_ids', 'best')
+
+
+class StringTable:
+    """Read-only list of strings stored as one UTF-8 blob plus offsets."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def pack(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self):
+        return [self[i] for i in range(len(self))]
+
+
+def get_compiled_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".skypath"
+
+
+def _source_stamp(csv_path):
+    st = os.stat(csv_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def compile_network(network, out_path, csv_path, rows=None):
+    """
+    Writes `network` to `out_path`, stamped with the current size/mtime of
+    csv_path. `rows` is the CSV row count, kept for the load stats.
+    """
+    arrays = {name: np.ascontiguousarray(getattr(network, name)) for name in _ARRAYS}
+    arrays['code_offsets'], arrays['code_blob'] = StringTable.pack(network.codes)
+    names = network.names.tolist() if hasattr(network.names, 'tolist') else list(network.names)
+    arrays['name_offsets'], arrays['name_blob'] = StringTable.pack([str(n) for n in names])
+
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        table[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({'source': _source_stamp(csv_path), 'rows': rows, 'arrays': table}).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + table[name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp_path, out_path)  # readers never see a half-written file
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None, 0
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    return header, _aligned(_PREFIX.size + header_len)
+
+
+def is_stale(compiled_path, csv_path):
+    """True if the compiled file is missing, from another format version or older than the CSV."""
+    if not os.path.exists(compiled_path):
+        return True
+    try:
+        header, _ = _read_header(compiled_path)
+    except (OSError, ValueError, struct.error):
+        return True
+    return header is None or header['source'] != _source_stamp(csv_path)
+
+
+def load_compiled(path):
+    """
+    Memory-maps a compiled network; the CSR arrays are views into the mapping.
+
+    Returns:
+        (network, header)
+    """
+    header, data_start = _read_header(path)
+    if header is None:
+        raise ValueError(f"{path} is not a SkyPath network file of version {FORMAT_VERSION}")
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        start = data_start + spec['offset']
+        count = int(np.prod(spec['shape']))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=start).reshape(spec['shape'])
+
+    codes = StringTable(arrays['code_offsets'], arrays['code_blob']).tolist()
+    names = StringTable(arrays['name_offsets'], arrays['name_blob'])
+    return Network(codes, *(arrays[name] for name in _ARRAYS), names), header
+
+
+def load_network(csv_path=None):
+    """
+    Same result as loader.load_network, but through the compiled file:
+    memory-mapped when it is fresh, recompiled from the CSV when it is stale.
+    """
+    csv_path = csv_path or loader.get_csv_path()
+    compiled_path = get_compiled_path(csv_path)
+
+    if is_stale(compiled_path, csv_path):
+        network, stats = loader.load_network(csv_path)
+        compile_network(network, compiled_path, csv_path, stats['rows'])
+        stats['compiled'] = False
+        return network, stats
+
+    started = time.perf_counter()
+    network, header = load_compiled(compiled_path)
+    stats = {
+        'rows': header['rows'],
+        'departures': len(network),
+        'airports': network.num_airports,
+        'edges': network.num_edges,
+        'read_seconds': 0.0,
+        'build_seconds': time.perf_counter() - started,
+        'compiled': True,
+    }
+    return network, stats
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else loader.get_csv_path()
+    network, stats = loader.load_network(csv_path)
+    compile_network(network, get_compiled_path(csv_path), csv_path, stats['rows'])
+    print(f"✅ Compiled {stats['departures']} departures, {stats['airports']} airports to {get_compiled_path(csv_path)}")
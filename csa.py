@@ -0,0 +1,250 @@
+"""
+Connection Scan Algorithm (CSA) backend.
+
+Instead of a priority queue over airports, CSA walks every flight once in
+departure order and keeps a flight if it can be caught from where the
+traveller already is. `earliest_arrival` answers one query that way.
+
+`earliest_arrival_many` answers a batch of queries in one scan with NumPy:
+departures are cut into chunks narrower than the shortest block time plus
+the minimum connection, so no flight in a chunk can feed another flight in
+the same chunk, and each chunk is relaxed for every query at once.
+
+`profile` scans backwards instead and finds every non-dominated journey
+between two airports over a whole departure window in one pass.
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+import search
+
+
+def earliest_arrival(network, s, startT, d=None, expected=None, min_connection=0):
+    """
+    Connection Scan Algorithm: one pass over the flights in departure order.
+
+    Same arguments and result as search.earliest_arrival, so the two are
+    interchangeable behind router.Router:
+
+    network: Network with the CSR timetable
+    s: Source airport id
+    startT: Start time at the source
+    d: Optional destination airport id; the scan stops once departures are
+        no earlier than the best known arrival there
+    expected: Optional (arrivalT, best) pair from Network.expected_arrivals
+    min_connection: Minimum connection time (not applied at the source)
+
+    Returns:
+        (T, prev_slot) lists indexed by airport id.
+    """
+    departs, origins, dests, slots = network.connections()
+    arrivalT = network.views()[4] if expected is None else memoryview(expected[0])
+    n = network.num_airports
+    inf = float('inf')
+    T = [inf] * n
+    prev_slot = [-1] * n
+    T[s] = startT
+
+    # ready[v]: earliest departure that can be caught at v
+    ready = [inf] * n
+    ready[s] = startT
+    target = inf  # best known arrival at d
+
+    start = bisect_left(departs, startT)
+    for dep, v, w, slot in zip(departs[start:], origins[start:], dests[start:], slots[start:]):
+        if ready[v] > dep:
+            continue
+        if dep >= target:
+            break  # nothing departing now can still improve the destination
+        arrival_time = arrivalT[slot]
+        if arrival_time < T[w]:
+            T[w] = arrival_time
+            prev_slot[w] = slot
+            if w != s:
+                ready[w] = arrival_time + min_connection
+            if w == d:
+                target = arrival_time
+
+    return T, prev_slot
+
+
+def earliest_arrival_many(network, sources, startTs, dests=None, expected=None, min_connection=0):
+    """
+    Earliest arrivals for a batch of queries in one vectorized scan.
+
+    sources: Source airport id per query
+    startTs: Start time per query
+    dests: Optional destination airport id per query; the scan stops once
+        every query's destination can no longer improve
+    expected, min_connection: as for earliest_arrival
+
+    Returns:
+        float array T of shape (queries, airports); T[q, v] is the earliest
+        arrival at v for query q (inf if not reached).
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    startTs = np.asarray(startTs, dtype=np.float64)
+    Q, n = len(sources), network.num_airports
+    rows = np.arange(Q)
+    T = np.full((Q, n), np.inf)
+    T[rows, sources] = startTs
+    if Q == 0 or len(network) == 0:
+        return T
+
+    width = int((network.arrivalT - network.departT).min()) + min_connection
+    if width <= 0:
+        # Zero-length hops: flights in the same minute can chain, scan one query at a time
+        for q in range(Q):
+            d = None if dests is None else int(dests[q])
+            T[q] = earliest_arrival(network, int(sources[q]), startTs[q], d, expected, min_connection)[0]
+        return T
+
+    bounds, groups, group_starts, departT, origin, slot, group_dests = network.connection_chunks(width)
+    arrival = np.asarray(network.arrivalT if expected is None else expected[0], dtype=np.float64)[slot]
+
+    # Airports along the first axis so each chunk reduces over contiguous rows
+    A = np.full((n, Q), np.inf)
+    A[sources, rows] = startTs
+    ready = A.copy()  # earliest departure each query can catch at each airport
+    if dests is not None:
+        dests = np.asarray(dests, dtype=np.int64)
+
+    first = bisect_left(network.connections()[0], startTs.min())
+    for k in range(int(np.searchsorted(bounds, first, side='right')) - 1, len(bounds) - 1):
+        lo, hi = bounds[k], bounds[k + 1]
+        if dests is not None and departT[lo:hi].min() >= A[dests, rows].max():
+            break
+        g0, g1 = groups[k], groups[k + 1]
+        caught = np.where(ready[origin[lo:hi]] <= departT[lo:hi, None], arrival[lo:hi, None], np.inf)
+        w = group_dests[g0:g1]
+        A[w] = np.minimum(A[w], np.minimum.reduceat(caught, group_starts[g0:g1] - lo, axis=0))
+        ready[w] = A[w] + min_connection
+        ready[sources, rows] = startTs
+
+    return A.T
+
+
+def extract_path(network, T, s, d, startT, expected=None, min_connection=0):
+    """
+    Rebuilds the flights to d from a row of earliest_arrival_many: walks back
+    from d, each time taking an incoming flight that can be caught at its
+    origin and lands exactly at the recorded arrival.
+
+    Returns:
+        the list of slots from s to d, or None if d was not reached.
+    """
+    if T[d] == float('inf'):
+        return None
+    _, _, flight_offsets, departT, arrivalT, best = network.views()
+    if expected is not None:
+        arrivalT, best = (memoryview(a) for a in expected)
+    edge_origins, incoming = network.incoming_edges()
+
+    path = []
+    v = d
+    while v != s:
+        for e in incoming[v]:
+            u = edge_origins[e]
+            if T[u] == float('inf'):
+                continue
+            ready = startT if u == s else T[u] + min_connection
+            hi = flight_offsets[e + 1]
+            i = bisect_left(departT, ready, flight_offsets[e], hi)
+            if i < hi and arrivalT[best[i]] == T[v]:
+                path.append(best[i])
+                v = u
+                break
+        else:
+            return None
+    path.reverse()
+    return path
+
+
+def profile(network, s, d, startT, endT, expected=None, min_connection=0):
+    """
+    Profile query: every non-dominated journey from s to d departing in
+    [startT, endT), i.e. no other one leaves later and arrives no later.
+    Together they are the departure time -> earliest arrival function over
+    the window.
+
+    No useful journey arrives after the earliest arrival for a start at
+    endT, which bounds the scan (see arrival_profiles).
+
+    Returns:
+        list of (departure, arrival, slots) by departure time.
+    """
+    if s == d:
+        return []
+    horizon = search.earliest_arrival(network, s, endT, d, expected, min_connection)[0][d]
+    neg_departs, arrivals, legs = arrival_profiles(network, s, d, startT, horizon, endT, expected, min_connection)
+
+    journeys = []
+    for i in range(len(arrivals[s]) - 1, -1, -1):
+        path = []
+        v, entry = s, i
+        while entry >= 0:
+            sl, v, entry = legs[v][entry]
+            path.append(sl)
+        journeys.append((-neg_departs[s][i], arrivals[s][i], path))
+    return journeys
+
+
+def arrival_profiles(network, s, d, startT, horizon, endT=None, expected=None, min_connection=0):
+    """
+    Profile CSA towards d: connections are scanned latest first, keeping for
+    each airport the Pareto list of (departure, arrival at d) pairs found so
+    far, each extended backwards by one flight.
+
+    Only journeys that start from s at startT or later and arrive by
+    `horizon` are considered: an earliest-arrival search from s drops every
+    connection that cannot be reached in time. With endT, flights out of s
+    must also depart before it.
+
+    Returns:
+        (neg_departs, arrivals, legs) lists per airport, entries by
+        decreasing departure: the earliest arrival at d leaving v at or
+        after t is arrivals[v][bisect_right(neg_departs[v], -t) - 1], and
+        legs[v][i] = (slot, next airport, its entry, -1 at d).
+    """
+    inf = float('inf')
+    T = np.array(search.earliest_arrival(network, s, startT, None, expected, min_connection)[0])
+    ready = T + min_connection
+    ready[s] = startT
+
+    departs, origins, dests, slots = network.connections()
+    lo = bisect_left(departs, startT)
+    hi = bisect_left(departs, horizon) if horizon != inf else len(departs)
+    departT = np.asarray(departs[lo:hi])
+    origin, dest, slot = np.asarray(origins[lo:hi]), np.asarray(dests[lo:hi]), np.asarray(slots[lo:hi])
+    arrivalT = np.asarray(network.arrivalT if expected is None else expected[0])[slot]
+
+    keep = (departT >= ready[origin]) & (arrivalT <= horizon) & (origin != d) & (dest != s)
+    if endT is not None:
+        keep &= (origin != s) | (departT < endT)
+    keep = np.flatnonzero(keep)[::-1]
+
+    n = network.num_airports
+    neg_departs = [[] for _ in range(n)]
+    arrivals = [[] for _ in range(n)]
+    legs = [[] for _ in range(n)]
+    columns = (departT[keep], origin[keep], dest[keep], slot[keep], arrivalT[keep])
+    for dep, u, v, sl, arrival_time in zip(*(c.tolist() for c in columns)):
+        if v == d:
+            best, nxt = arrival_time, -1
+        else:
+            # Earliest arrival at d from v after connecting
+            nxt = bisect_right(neg_departs[v], -(arrival_time + min_connection)) - 1
+            if nxt < 0:
+                continue
+            best = arrivals[v][nxt]
+        if arrivals[u] and best >= arrivals[u][-1]:
+            continue  # a later departure from u does at least as well
+        if neg_departs[u] and neg_departs[u][-1] == -dep:
+            arrivals[u][-1], legs[u][-1] = best, (sl, v, nxt)
+        else:
+            neg_departs[u].append(-dep)
+            arrivals[u].append(best)
+            legs[u].append((sl, v, nxt))
+
+    return neg_departs, arrivals, legs
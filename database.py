@@ -1,36 +1,242 @@
+import atexit
+import contextlib
+import queue
 import sqlite3
 import os
+import sys
+import threading
+
+WRITE_BATCH = 256      # most trips inserted in one transaction by the writer
+PAGE_SIZE = 20         # trips per page of history
+BUSY_TIMEOUT_MS = 5000
+POOL_SIZE = 4          # idle connections kept per database file
+
+TRIP_COLUMNS = "start, end, start_time, itinerary, arrival_time, delay_minutes"
+
 
 def get_db_path():
     return os.path.join(os.path.dirname(__file__), "flight_data.db")
 
-def init_db():
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        password TEXT NOT NULL
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS trips (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        start TEXT,
-        end TEXT,
-        start_time INTEGER,
-        itinerary TEXT,
-        arrival_time TEXT,
-        delay_minutes INTEGER,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+def init_db(db_path=None):
+    db_path = db_path or get_db_path()
+    with connection(db_path) as conn:
+        cur = conn.cursor()
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+        """)
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS trips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            start TEXT,
+            end TEXT,
+            start_time INTEGER,
+            itinerary TEXT,
+            arrival_time TEXT,
+            delay_minutes INTEGER,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+        """)
+
+        # Trip history is looked up by user; the index also orders each user's trips
+        # by id. users(username) is already indexed through its UNIQUE constraint.
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_trips_user_id ON trips(user_id)")
+
+        # Schema version 1: trips.start_time is in minutes since Monday 00:00 (see
+        # timemodel), not hours. Old rows hold hours 0-23; every start saved since is
+        # a whole hour in minutes, so values 1-23 can only be old ones (0 means the same).
+        if cur.execute("PRAGMA user_version").fetchone()[0] < 1:
+            cur.execute("UPDATE trips SET start_time = start_time * 60 WHERE start_time BETWEEN 1 AND 23")
+            cur.execute("PRAGMA user_version = 1")
+
+        conn.commit()
     print("✅ Tables created successfully.")
+
+
+# ---------------- Connections ----------------
+# A few connections per database file, shared by every thread: Streamlit runs
+# each rerun of a session on a new thread, so per-thread connections would
+# never be reused. The trip writer keeps its own connection.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(db_path):
+    """
+    Opens a connection in WAL mode, so readers never wait for the writer and
+    the writer only waits for other writers (up to BUSY_TIMEOUT_MS).
+    """
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # durable at each checkpoint, safe against corruption
+    return conn
+
+
+@contextlib.contextmanager
+def connection(db_path=None):
+    """
+    Borrows an idle connection to db_path (get_db_path() by default) from
+    the shared pool, or opens one, for the duration of the with block.
+    Up to POOL_SIZE connections are kept idle for reuse; an unfinished
+    transaction is rolled back before the connection goes back.
+    """
+    db_path = db_path or get_db_path()
+    with _pools_lock:
+        idle = _pools.setdefault(db_path, [])
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = _connect(db_path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        with _pools_lock:
+            idle = _pools.setdefault(db_path, [])
+            keep = len(idle) < POOL_SIZE
+            if keep:
+                idle.append(conn)
+        if not keep:
+            conn.close()
+
+
+def close_connections():
+    """Closes the idle pooled connections (e.g. before deleting a database file)."""
+    with _pools_lock:
+        idle = [conn for conns in _pools.values() for conn in conns]
+        _pools.clear()
+    for conn in idle:
+        conn.close()
+
+
+# ---------------- Users ----------------
+def add_user(username, password, db_path=None):
+    """Registers a user; raises sqlite3.IntegrityError if the username is taken."""
+    with connection(db_path) as conn, conn:
+        conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+
+
+def find_user(username, password, db_path=None):
+    """
+    Returns:
+        the user's id, or None if the credentials don't match
+    """
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT id FROM users WHERE username = ? AND password = ?",
+                           (username, password)).fetchone()
+    return row[0] if row else None
+
+
+# ---------------- Trips ----------------
+class TripWriter:
+    """
+    Inserts trips on a background thread: save() only queues the row, and
+    the thread writes whatever has queued up, up to WRITE_BATCH rows, in one
+    transaction, so a burst of saves costs one commit instead of one each.
+    """
+
+    def __init__(self, db_path=None, batch_size=WRITE_BATCH):
+        self.db_path = db_path or get_db_path()
+        self.batch_size = batch_size
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="trip-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, user_id, start, end, start_time, itinerary, arrival_time, delay_minutes):
+        self._queue.put((user_id, start, end, start_time, itinerary, arrival_time, int(delay_minutes)))
+
+    def flush(self):
+        """Blocks until every trip saved so far has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Writes the remaining trips and stops the thread; get_trip_writer starts a new one."""
+        with _writers_lock:
+            if _writers.get(self.db_path) is self:
+                del _writers[self.db_path]
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        conn = _connect(self.db_path)
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            try:
+                with conn:
+                    conn.executemany(f"""INSERT INTO trips (user_id, {TRIP_COLUMNS})
+                                         VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+                self.written += len(rows)
+                self.batches += 1
+            except sqlite3.Error as e:
+                self.errors += len(rows)
+                print(f"❌ Failed to save {len(rows)} trip(s): {e}", file=sys.stderr)
+            finally:
+                for _ in range(len(rows) + stop):
+                    self._queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_trip_writer(db_path=None):
+    """Process-wide TripWriter for db_path, started on first use and flushed at exit."""
+    db_path = db_path or get_db_path()
+    writer = _writers.get(db_path)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(db_path)
+            if writer is None:
+                writer = _writers[db_path] = TripWriter(db_path)
+                atexit.register(writer.close)
+    return writer
+
+
+def save_trip(user_id, start, end, start_time, itinerary, arrival_time, delay_minutes, db_path=None):
+    """Queues a trip for the background writer; get_trips sees it once written."""
+    get_trip_writer(db_path).save(user_id, start, end, start_time, itinerary, arrival_time, delay_minutes)
+
+
+def get_trips(user_id, page_size=PAGE_SIZE, before_id=None, db_path=None):
+    """
+    One page of a user's trips, newest first. Pages are keyed on the trip id
+    rather than an OFFSET, so each page is a single index range scan however
+    far back it is.
+
+    before_id: the cursor returned with the previous page (None for the first)
+
+    Returns:
+        (trips, cursor): rows of (start, end, start_time, itinerary,
+        arrival_time, delay_minutes), and the cursor for the next page, or
+        None after the last one
+    """
+    db_path = db_path or get_db_path()
+    writer = _writers.get(db_path)
+    if writer is not None:
+        writer.flush()  # read your own writes
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            f"""SELECT id, {TRIP_COLUMNS} FROM trips WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?""",
+            (user_id, sys.maxsize if before_id is None else before_id, page_size + 1)).fetchall()
+    cursor = rows[page_size - 1][0] if len(rows) > page_size else None
+    return [row[1:] for row in rows[:page_size]], cursor
@@ -4,6 +4,7 @@ from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 import joblib
+from predictor import LinearDelayPredictor
 
 # ✅ Sample dataset
 data = {
@@ -43,4 +44,7 @@ model.fit(X_train, y_train)
 joblib.dump(model, 'delay_model.pkl')
 joblib.dump((le_origin, le_dest, le_day, le_weather), 'label_encoders.pkl')
 
+# NumPy-only export for callers that shouldn't import scikit-learn
+LinearDelayPredictor.from_model(model, (le_origin, le_dest, le_day, le_weather)).save('delay_model.json')
+
 print("✅ Model and encoders saved successfully.")
@@ -1,4 +1,7 @@
-import queue
+from network import Network
+from router import get_router
+from timetable import Timetable
+from timemodel import format_time
 
 class Flight:
     def __init__(self, name, origin, dest, arrivalT, departT):
@@ -10,7 +13,7 @@ class Flight:
         self.weight = arrivalT - departT  # Correct: travel duration
 
     def __str__(self):
-        return f"{self.name}: {self.origin} → {self.dest} | Departs at {self.departT}:00, Arrives at {self.arrivalT}:00"
+        return f"{self.name}: {self.origin} → {self.dest} | Departs at {format_time(self.departT)}, Arrives at {format_time(self.arrivalT)}"
 
     def __repr__(self):
         return self.__str__()
@@ -30,7 +33,7 @@ class Schedule:
         self.time = time
 
     def __hash__(self):
-        return hash(str(self.vertex) + ":" + str(self.time))
+        return hash((self.vertex, self.time))
 
     def __lt__(self, other):
         return self.time < other.time
@@ -67,58 +70,28 @@ class Vertex:
         return hash(self.name)
 
 
-def FlightAgency(F, G, s, d, startT):
+def FlightAgency(F, G, s, d, startT, expected=None, min_connection=0, backend='dijkstra'):
     """
-    F: List of flights
-    G: Graph with vertices
-    s: Source vertex
-    d: Destination vertex
-    startT: Start time in 24-hour format
+    F: List of flights, a prebuilt Timetable over them, or a Network
+    G: Graph with vertices (the search walks the flights' own edges)
+    s: Source vertex, airport code or airport id
+    d: Destination vertex, airport code or airport id
+    startT: Start time in minutes since Monday 00:00 (see timemodel)
+    expected: Optional Network.expected_arrivals(delays) for delay-aware routing
+    min_connection: Minimum connection time between flights
+    backend: Search backend, 'dijkstra' or 'csa' (see router)
 
     Returns:
-        (earliest arrival time, list of flights taken as path)
+        (earliest arrival time, list of flights taken as path); with
+        `expected` the arrival time includes the predicted delays
     """
-    T = {vertex: float('inf') for vertex in G.vertices}
-    T[s] = startT
-
-    prev_flight = {}  # Track flight used to reach each vertex
-
-    q = queue.PriorityQueue()
-    for vertex in G.vertices:
-        q.put(Schedule(vertex, T[vertex]))
-
-    while not q.empty():
-        v_schedule = q.get()
-        current_vertex = v_schedule.vertex
-
-        for neighbor in current_vertex.adjacentVertices:
-            # Filter flights from current to neighbor that depart after current time
-            possible_flights = [
-                flight for flight in F
-                if flight.origin == current_vertex and flight.dest == neighbor and flight.departT >= T[current_vertex]
-            ]
-
-            if possible_flights:
-                # Choose flight with earliest arrival
-                best_flight = min(possible_flights, key=lambda f: f.arrivalT)
-                arrival_time = best_flight.arrivalT
-
-                if arrival_time < T[neighbor]:
-                    T[neighbor] = arrival_time
-                    prev_flight[neighbor] = best_flight
-                    q.put(Schedule(neighbor, arrival_time))
-
-    # Reconstruct path
-    path = []
-    current = d
-    while current != s:
-        if current in prev_flight:
-            flight = prev_flight[current]
-            path.append(flight)
-            current = flight.origin
-        else:
-            # No path found
-            return float('inf'), []
-
-    path.reverse()
-    return T[d], path
+    return get_router(as_network(F), backend).route(s, d, startT, expected, min_connection)
+
+
+def as_network(F):
+    """Returns the Network behind a flight list, Timetable or Network."""
+    if isinstance(F, Network):
+        return F
+    if isinstance(F, Timetable):
+        return F.network
+    return Network.from_flights(F)
@@ -1,27 +1,67 @@
+"""
+Route maps.
+
+Airport coordinates come from airports.load_airport_coords. The base map,
+with a marker per airport, is rendered to HTML once per set of airports and
+cached; each route then adds its own script, a Leaflet L.polyline added
+to the map by its public name (Map.get_name()), to a copy of that HTML, so
+a map costs a string join instead of a full folium render, and nothing is
+written to disk.
+"""
+import json
+import threading
+
 import folium
 
-# Dummy coordinates (update these)
-airport_coords = {
-    "A": (28.6139, 77.2090),   # Delhi
-    "B": (19.0760, 72.8777),   # Mumbai
-    "C": (12.9716, 77.5946),   # Bangalore
-    "D": (13.0827, 80.2707),   # Chennai
-    "E": (22.5726, 88.3639),   # Kolkata
-}
+from airports import DEMO_COORDS, load_airport_coords
+
+MAP_CENTER = (23.5, 80.5)
+MAP_ZOOM = 5
+ROUTE_STYLE = {"color": "green", "weight": 4.5, "opacity": 0.8}
+
+_base_maps = {}
+_lock = threading.Lock()
+
+
+def base_map(airports=None):
+    """
+    The folium Map with a marker for each airport (every airport in
+    airports.csv by default) and its rendered HTML, built once per set of
+    airports. Treat both as read-only.
+
+    Returns:
+        (folium.Map, html)
+    """
+    coords = load_airport_coords()
+    key = tuple(sorted(airports)) if airports is not None else None
+    cached = _base_maps.get(key)
+    if cached is None:
+        with _lock:
+            cached = _base_maps.get(key)
+            if cached is None:
+                m = folium.Map(location=list(MAP_CENTER), zoom_start=MAP_ZOOM)
+                for code in key if key is not None else sorted(set(coords) - set(DEMO_COORDS)):
+                    folium.Marker(coords[code], tooltip=code, icon=folium.Icon(color='blue')).add_to(m)
+                cached = _base_maps[key] = (m, m.get_root().render())
+    return cached
 
-def plot_geo_path(path):
-    m = folium.Map(location=[23.5, 80.5], zoom_start=5)
 
-    # Add markers
-    for code, coord in airport_coords.items():
-        folium.Marker(coord, tooltip=code, icon=folium.Icon(color='blue')).add_to(m)
+def plot_geo_path(path, airports=None):
+    """
+    Renders the route of `path` (a list of flights) as a green line over
+    base_map(airports).
 
-    # Highlight path
-    path_coords = [airport_coords[flight.origin.name] for flight in path]
-    path_coords.append(airport_coords[path[-1].dest.name])
+    Returns:
+        the map as a standalone HTML string
+    """
+    coords = load_airport_coords()
+    m, html = base_map(airports)
+    path_coords = [coords[flight.origin.name] for flight in path]
+    path_coords.append(coords[path[-1].dest.name])
 
-    folium.PolyLine(path_coords, color="green", weight=4.5, opacity=0.8).add_to(m)
+    # A script of its own after the map's, so the cached map is never modified
+    script = (f"<script>L.polyline({json.dumps(path_coords)}, {json.dumps(ROUTE_STYLE)})"
+              f".addTo({m.get_name()});</script>")
+    head, end, tail = html.rpartition("</html>")
+    return head + script + end + tail if end else html + script
 
-    # Save
-    m.save("flight_path_map.html")
-    print("🗺️ Map saved as flight_path_map.html")
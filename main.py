@@ -1,69 +1,79 @@
-from flight import Flight, Vertex, Graph as FlightGraph, FlightAgency
-from graph import Graph as SimpleGraph
-from visualize import visualize_graph
-from geo_visualize import plot_geo_path
+import hashlib
+import os
+from timemodel import format_time, to_minutes
 from auth import login, register
-from database import get_db_path
+import database
 from database import init_db
 from colorama import Fore, init
-import sqlite3
-import joblib
-import pandas as pd
 
-init(autoreset=True)
+# Startup only needs what login and the trip list use. The route search
+# (NumPy), the delay model and the plotting libraries (matplotlib, networkx,
+# folium) are imported where they are first needed; benchmarks/bench_startup.py
+# checks the budget.
 
-# Load ML model
-model = joblib.load("delay_model.pkl")
-le_origin, le_dest, le_day, le_weather = joblib.load("label_encoders.pkl")
+init(autoreset=True)
 
 airport_day = {"A": "Mon", "B": "Tue", "C": "Wed", "D": "Thu", "E": "Fri"}
 airport_weather = {"A": "Clear", "B": "Rain", "C": "Clear", "D": "Fog", "E": "Storm"}
 
+# ML model (NumPy-only export of delay_model.pkl, no scikit-learn needed),
+# loaded on the first prediction
+_predictor = None
+
+def get_predictor():
+    global _predictor
+    if _predictor is None:
+        from predictor import LinearDelayPredictor
+        _predictor = LinearDelayPredictor.load()
+    return _predictor
+
 # Predict delay
+def predict_delays(flights):
+    days = [airport_day.get(f.origin.name, "Tue") for f in flights]
+    weathers = [airport_weather.get(f.origin.name, "Clear") for f in flights]
+    return get_predictor().predict_flights(flights, days, weathers)
+
 def predict_delay(flight):
-    day = airport_day.get(flight.origin.name, "Tue")
-    weather = airport_weather.get(flight.origin.name, "Clear")
-    try:
-        features = pd.DataFrame([{
-            'origin': le_origin.transform([flight.origin.name])[0],
-            'dest': le_dest.transform([flight.dest.name])[0],
-            'departT': flight.departT,
-            'day': le_day.transform([day])[0],
-            'weather': le_weather.transform([weather])[0]
-        }])
-        return model.predict(features)[0]
-    except Exception as e:
-        print(Fore.RED + f"Prediction error: {e}")
-        return 0
+    return predict_delays([flight])[0]
+
+def route_version(network):
+    """
+    Version the CLI's cached routes are valid for: the timetable and the
+    delay model file the predictions come from (by mtime, as in
+    NetworkSnapshot.version), so re-exporting the model stops old delays
+    from being served.
+    """
+    from predictor import get_model_json_path
+    model_path = get_model_json_path()
+    stamp = f"{network.fingerprint()}:{model_path}:{os.path.getmtime(model_path)}"
+    return hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:16]
 
 # Save trip to database
 def save_trip(user_id, start, end, start_time, path, arrival_time, delay):
-    conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
     itinerary_str = " → ".join([f.origin.name for f in path] + [path[-1].dest.name])
-    cursor.execute("""
-        INSERT INTO trips (user_id, start, end, start_time, itinerary, arrival_time, delay_minutes)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (user_id, start, end, start_time, itinerary_str, f"{arrival_time}:00", int(delay)))
-    conn.commit()
-    conn.close()
-
-# Show user past trips
+    database.save_trip(user_id, start, end, start_time, itinerary_str, format_time(arrival_time), int(delay))
+
+# Show user past trips, a page at a time
 def show_past_trips(user_id):
-    conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-    cursor.execute("SELECT start, end, start_time, itinerary, arrival_time, delay_minutes FROM trips WHERE user_id = ?", (user_id,))
-    trips = cursor.fetchall()
+    trips, cursor = database.get_trips(user_id)
     if not trips:
         print(Fore.YELLOW + "No saved itineraries.")
-    else:
-        print(Fore.CYAN + "\n🧳 Your Saved Trips:")
+        return
+    print(Fore.CYAN + "\n🧳 Your Saved Trips:")
+    while True:
         for t in trips:
-            print(f"🔸 {t[0]} → {t[1]} | Start: {t[2]}:00 | ETA: {t[4]} (+{t[5]} min) | Route: {t[3]}")
-    conn.close()
+            print(f"🔸 {t[0]} → {t[1]} | Start: {format_time(t[2])} | ETA: {t[4]} (+{t[5]} min) | Route: {t[3]}")
+        if cursor is None or input("🔎 Show older trips? (y/n): ").strip().lower() != 'y':
+            break
+        trips, cursor = database.get_trips(user_id, before_id=cursor)
 
 # CLI scheduler
 def run_flight_scheduler_cli(user_id):
+    from cache import cached_route, get_query_cache
+    from flight import Flight, Vertex
+    from network import Network
+    from router import get_router
+
     airportE = Vertex("E", [])
     airportD = Vertex("D", [airportE])
     airportB = Vertex("B", [airportD, airportE])
@@ -72,15 +82,15 @@ def run_flight_scheduler_cli(user_id):
     airport_map = {"A": airportA, "B": airportB, "C": airportC, "D": airportD, "E": airportE}
 
     flights = [
-        Flight('FN-101', airportA, airportB, 6, 2),
-        Flight('FN-102', airportA, airportC, 8, 2),
-        Flight('FN-103', airportB, airportD, 13, 12),
-        Flight('FN-104', airportB, airportE, 17, 11),
-        Flight('FN-105', airportC, airportB, 10, 9),
-        Flight('FN-106', airportC, airportD, 10, 6),
-        Flight('FN-107', airportD, airportE, 14, 13),
+        Flight('FN-101', airportA, airportB, to_minutes("Mon", 6), to_minutes("Mon", 2)),
+        Flight('FN-102', airportA, airportC, to_minutes("Mon", 8), to_minutes("Mon", 2)),
+        Flight('FN-103', airportB, airportD, to_minutes("Mon", 13), to_minutes("Mon", 12)),
+        Flight('FN-104', airportB, airportE, to_minutes("Mon", 17), to_minutes("Mon", 11)),
+        Flight('FN-105', airportC, airportB, to_minutes("Mon", 10), to_minutes("Mon", 9)),
+        Flight('FN-106', airportC, airportD, to_minutes("Mon", 10), to_minutes("Mon", 6)),
+        Flight('FN-107', airportD, airportE, to_minutes("Mon", 14), to_minutes("Mon", 13)),
     ]
-    graph = FlightGraph(list(airport_map.values()))
+    network = Network.from_flights(flights)
 
     print(Fore.CYAN + "\n📍 Available Airports:")
     for code in airport_map:
@@ -95,44 +105,52 @@ def run_flight_scheduler_cli(user_id):
         return
 
     try:
-        startT = int(input(Fore.CYAN + "Enter preferred start time (0–23): "))
-        if not (0 <= startT <= 23):
+        start_hour = int(input(Fore.CYAN + "Enter preferred start time on Monday (0–23): "))
+        if not (0 <= start_hour <= 23):
             raise ValueError
     except ValueError:
         print(Fore.RED + "❌ Invalid time. Enter an integer between 0 and 23.")
         return
 
+    startT = to_minutes("Mon", start_hour)
     startVertex, endVertex = airport_map[source_code], airport_map[dest_code]
-    arrival_time, path = FlightAgency(flights, graph, startVertex, endVertex, startT)
+
+    def find_route():
+        arrival, slots = get_router(network).route_slots(startVertex, endVertex, startT)
+        return arrival, slots, predict_delays([network.flight(slot) for slot in slots]) if slots else []
+
+    # Repeat queries (also across runs) come from the cache
+    arrival_time, path, delays = cached_route(get_query_cache(), network, route_version(network),
+                                              source_code, dest_code, startT, find_route)
 
     if arrival_time != float('inf') and path:
-        print(Fore.GREEN + f"\n✅ Itinerary from {startVertex} to {endVertex} starting at {startT}:00\n")
+        print(Fore.GREEN + f"\n✅ Itinerary from {startVertex} to {endVertex} starting at {format_time(startT)}\n")
         total_delay = 0
-        for flight in path:
-            delay = predict_delay(flight)
+        for flight, delay in zip(path, delays):
             total_delay += delay
             print(Fore.MAGENTA + f"{flight} | Predicted Delay: {int(delay)} min")
 
-        print(Fore.YELLOW + f"\n🕓 Total arrival time (without delay): {arrival_time}:00")
-        adj_hour = arrival_time + int(total_delay // 60)
-        adj_min = int(total_delay % 60)
-        print(Fore.RED + f"🕓 Estimated arrival time (with delay): {adj_hour}:{adj_min:02d}")
+        print(Fore.YELLOW + f"\n🕓 Total arrival time (without delay): {format_time(arrival_time)}")
+        print(Fore.RED + f"🕓 Estimated arrival time (with delay): {format_time(arrival_time + total_delay)}")
 
         # Save itinerary
         save_trip(user_id, source_code, dest_code, startT, path, arrival_time, total_delay)
 
         # Visuals
+        from visualize import visualize_graph
+        from geo_visualize import plot_geo_path
         edge_path = [(f.origin.name, f.dest.name) for f in path]
-        g = SimpleGraph()
-        for f in flights:
-            g.add_edge(f.origin.name, f.dest.name, f.arrivalT)
-        visualize_graph(g, path_edges=edge_path)
-        plot_geo_path(path)
+        visualize_graph(network, path_edges=edge_path)
+        with open("flight_path_map.html", "w", encoding="utf-8") as f:
+            f.write(plot_geo_path(path, airport_map))
+        print("🗺️ Map saved as flight_path_map.html")
     else:
         print(Fore.RED + "\n❌ No valid flight path found.")
 
 # Visualize graph
 def run_visualization():
+    from graph import Graph as SimpleGraph
+    from visualize import visualize_graph
     g = SimpleGraph()
     g.add_edge("A", "B", 6)
     g.add_edge("A", "C", 8)
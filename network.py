@@ -0,0 +1,624 @@
+from bisect import bisect_left
+import zlib
+
+import numpy as np
+
+
+class Network:
+    """
+    Compact integer-indexed airport network.
+
+    Airport codes are interned to dense ints (codes[i] <-> index[code]).
+    Edges and flights are stored as CSR arrays:
+
+        edge_offsets[a]:edge_offsets[a + 1]      edges leaving airport a
+        edge_targets[e]                          destination airport of edge e
+        flight_offsets[e]:flight_offsets[e + 1]  flight slots on edge e, sorted by departT
+        departT[i], arrivalT[i]                  times of flight slot i
+        flight_ids[i]                            index of flight slot i into names
+        best[i]                                  slot with the earliest arrival among
+                                                 slots i..end of its edge
+
+    Flight ids follow the order the flights were given in, so flight_ids
+    maps back to the source rows.
+    """
+
+    def __init__(self, codes, edge_offsets, edge_targets, flight_offsets,
+                 departT, arrivalT, flight_ids, best, names, flights=None):
+        self.codes = list(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.edge_offsets = edge_offsets
+        self.edge_targets = edge_targets
+        self.flight_offsets = flight_offsets
+        self.departT = departT
+        self.arrivalT = arrivalT
+        self.flight_ids = flight_ids
+        self.best = best
+        self.names = names
+        self.flights = flights  # original Flight objects, when built from them
+        self._vertices = None
+        self._views = None
+        self._connections = None
+        self._chunks = {}
+        self._incoming = None
+        self._arrival_order = None
+        self._fingerprint = None
+        self._slots_by_id = None
+        self._layout = None
+
+    # ---------------- Construction ----------------
+    @classmethod
+    def from_arrays(cls, origins, dests, departT, arrivalT, names, codes=None):
+        """
+        Builds the network from parallel per-flight columns.
+
+        origins, dests: airport codes per flight
+        departT, arrivalT: integer times per flight
+        names: flight numbers
+        codes: optional airport list (stored sorted); defaults to the codes seen in origins/dests
+        """
+        origins = np.asarray(origins).astype(str)
+        dests = np.asarray(dests).astype(str)
+        n = len(origins)
+
+        # Intern codes with one sort: np.unique's inverse gives every row its id.
+        seen, inverse = np.unique(np.concatenate([origins, dests]), return_inverse=True)
+        if codes is None:
+            codes = seen
+            ids = inverse
+        else:
+            codes = np.sort(np.asarray(codes).astype(str))
+            ids = np.searchsorted(codes, seen)[inverse]
+            missing = np.setdiff1d(seen, codes)
+            if len(missing):
+                raise KeyError(f"Unknown airports: {', '.join(missing.tolist())}")
+        origin_ids = ids[:n].astype(np.int32)
+        dest_ids = ids[n:].astype(np.int32)
+
+        return cls.from_ids(codes.tolist(), origin_ids, dest_ids, departT, arrivalT, names)
+
+    @classmethod
+    def from_ids(cls, codes, origin_ids, dest_ids, departT, arrivalT, names, flights=None):
+        """Builds the CSR arrays from already-interned airport ids."""
+        n_airports = len(codes)
+        n_flights = len(origin_ids)
+        origin_ids = np.asarray(origin_ids, dtype=np.int32)
+        dest_ids = np.asarray(dest_ids, dtype=np.int32)
+        departT = np.asarray(departT, dtype=np.int32)
+        arrivalT = np.asarray(arrivalT, dtype=np.int32)
+
+        # Slot order: by origin, then dest, then departure, then input order.
+        order = np.lexsort((np.arange(n_flights), departT, dest_ids, origin_ids)).astype(np.int32)
+        slot_origin = origin_ids[order]
+        slot_dest = dest_ids[order]
+
+        edge_offsets, edge_targets, flight_offsets = _edges(slot_origin, slot_dest, n_airports)
+
+        slot_departT = departT[order]
+        slot_arrivalT = arrivalT[order]
+        best = _suffix_best(flight_offsets, slot_arrivalT, order)
+
+        return cls(codes, edge_offsets, edge_targets, flight_offsets,
+                   slot_departT, slot_arrivalT, order, best,
+                   np.asarray(names, dtype=object), flights)
+
+    @classmethod
+    def from_flights(cls, flights):
+        """Builds the network from Flight objects; their vertices are interned by name."""
+        flights = list(flights)
+        codes = sorted({f.origin.name for f in flights} | {f.dest.name for f in flights})
+        index = {code: i for i, code in enumerate(codes)}
+        n = len(flights)
+        network = cls.from_ids(
+            codes,
+            np.fromiter((index[f.origin.name] for f in flights), dtype=np.int32, count=n),
+            np.fromiter((index[f.dest.name] for f in flights), dtype=np.int32, count=n),
+            np.fromiter((f.departT for f in flights), dtype=np.int32, count=n),
+            np.fromiter((f.arrivalT for f in flights), dtype=np.int32, count=n),
+            [f.name for f in flights],
+            flights,
+        )
+        vertices = {}
+        for f in flights:
+            vertices.setdefault(f.origin.name, f.origin)
+            vertices.setdefault(f.dest.name, f.dest)
+        network._vertices = [vertices[code] for code in codes]
+        return network
+
+    # ---------------- Lookups ----------------
+    def __len__(self):
+        return len(self.flight_ids)
+
+    @property
+    def num_airports(self):
+        return len(self.codes)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_targets)
+
+    def airport_id(self, airport):
+        """Accepts an airport id, code or Vertex and returns its id."""
+        if isinstance(airport, (int, np.integer)):
+            return int(airport)
+        return self.index[getattr(airport, 'name', airport)]
+
+    def views(self):
+        """
+        Memoryviews over the CSR arrays for hot loops: indexing them yields
+        plain Python ints without copying the arrays into lists.
+        """
+        if self._views is None:
+            self._views = tuple(
+                memoryview(np.ascontiguousarray(a))
+                for a in (self.edge_offsets, self.edge_targets, self.flight_offsets,
+                          self.departT, self.arrivalT, self.best)
+            )
+        return self._views
+
+    def connections(self):
+        """
+        Every flight slot in departure order, for connection scans: memoryviews
+        (departT, origin, dest, slot) where entry i is the i-th departure.
+        Built on first use.
+        """
+        if self._connections is None:
+            order = np.argsort(self.departT, kind='stable').astype(np.int32)
+            self._connections = tuple(
+                memoryview(np.ascontiguousarray(a, dtype=np.int32))
+                for a in (self.departT[order], self.slot_origins()[order], self.slot_dests()[order], order)
+            )
+        return self._connections
+
+    def connection_chunks(self, width):
+        """
+        The departures cut into consecutive chunks at most `width` minutes
+        wide, for scanning a chunk at a time. Within a chunk the connections
+        are grouped by destination. Built once per width.
+
+        Returns:
+            (bounds, groups, group_starts, departT, origin, slot, group_dests):
+            chunk k holds connections bounds[k]:bounds[k + 1], which form
+            destination groups groups[k]:groups[k + 1]; group g starts at
+            connection group_starts[g] and lands at airport group_dests[g].
+        """
+        if width not in self._chunks:
+            departs = np.sort(self.departT, kind='stable')
+            order = np.argsort(self.departT, kind='stable')
+            bounds = [0]
+            while bounds[-1] < len(departs):
+                bounds.append(int(np.searchsorted(departs, departs[bounds[-1]] + width, side='left')))
+            bounds = np.asarray(bounds, dtype=np.int64)
+
+            # Regroup each chunk by destination (chunk first, then dest, then departure)
+            chunk = np.repeat(np.arange(len(bounds) - 1), np.diff(bounds))
+            dests = self.slot_dests()[order]
+            regroup = np.lexsort((dests, chunk))
+            order, dests, chunk = order[regroup], dests[regroup], chunk[regroup]
+            new_group = np.ones(len(order), dtype=bool)
+            new_group[1:] = (dests[1:] != dests[:-1]) | (chunk[1:] != chunk[:-1])
+            group_starts = np.flatnonzero(new_group)
+            groups = np.searchsorted(group_starts, bounds)
+            self._chunks[width] = (bounds, groups, group_starts, self.departT[order],
+                                   self.slot_origins()[order], order, dests[group_starts])
+        return self._chunks[width]
+
+    def departures(self, airport, startT=0, endT=float('inf')):
+        """Distinct departure times from an airport id in [startT, endT), ascending."""
+        lo = int(self.flight_offsets[self.edge_offsets[airport]])
+        hi = int(self.flight_offsets[self.edge_offsets[airport + 1]])
+        times = np.unique(self.departT[lo:hi])
+        return times[(times >= startT) & (times < endT)].tolist()
+
+    def arrival_order(self):
+        """
+        Flight slots of each edge re-sorted by arrival (later departure first
+        on ties), as a memoryview laid out like the slots themselves: edge e
+        spans flight_offsets[e]:flight_offsets[e + 1]. Built on first use.
+        """
+        if self._arrival_order is None:
+            edges = np.repeat(np.arange(self.num_edges), np.diff(self.flight_offsets))
+            order = np.lexsort((-self.departT, self.arrivalT, edges)).astype(np.int32)
+            self._arrival_order = memoryview(order)
+        return self._arrival_order
+
+    def shortest_blocks(self):
+        """Shortest block time (arrival - departure) of the flights on each edge."""
+        block = np.full(self.num_edges, np.inf)
+        nonempty = np.diff(self.flight_offsets) > 0
+        block[nonempty] = np.minimum.reduceat(self.arrivalT - self.departT, self.flight_offsets[:-1][nonempty])
+        return block
+
+    def time_to(self, dest, min_connection=0):
+        """
+        Lower bound on the minutes from every airport to `dest` (an id):
+        shortest block times plus a connection at every airport in between.
+        inf where dest cannot be reached at all.
+        """
+        origins, targets = self.edge_origins(), self.edge_targets
+        step = self.shortest_blocks() + np.where(targets == dest, 0, min_connection)
+        dist = np.full(self.num_airports, np.inf)
+        dist[dest] = 0
+        while True:
+            relaxed = dist.copy()
+            np.minimum.at(relaxed, origins, step + dist[targets])
+            if np.array_equal(relaxed, dist):
+                return dist
+            dist = relaxed
+
+    def find_edge(self, origin, dest):
+        """Returns the edge id from origin to dest (airport ids), or -1."""
+        lo, hi = int(self.edge_offsets[origin]), int(self.edge_offsets[origin + 1])
+        targets = self.views()[1]
+        e = bisect_left(targets, dest, lo, hi)
+        if e < hi and targets[e] == dest:
+            return e
+        return -1
+
+    def earliest_slot(self, edge, time):
+        """Slot of the earliest-arriving flight on `edge` departing at or after `time`, or -1."""
+        _, _, flight_offsets, departT, _, best = self.views()
+        hi = flight_offsets[edge + 1]
+        i = bisect_left(departT, time, flight_offsets[edge], hi)
+        return best[i] if i < hi else -1
+
+    def slot_origin(self, slot):
+        """Origin airport id of a flight slot."""
+        edge = int(np.searchsorted(self.flight_offsets, slot, side='right')) - 1
+        return int(np.searchsorted(self.edge_offsets, edge, side='right')) - 1
+
+    def slot_dest(self, slot):
+        edge = int(np.searchsorted(self.flight_offsets, slot, side='right')) - 1
+        return int(self.edge_targets[edge])
+
+    def edge_origins(self):
+        """Origin airport id of every edge, as one array."""
+        return np.repeat(np.arange(self.num_airports, dtype=np.int32), np.diff(self.edge_offsets))
+
+    def incoming_edges(self):
+        """
+        Reverse adjacency, built on first use: (edge origins, incoming) where
+        incoming[v] lists the ids of the edges that land at airport v.
+        """
+        if self._incoming is None:
+            incoming = [[] for _ in range(self.num_airports)]
+            for e, target in enumerate(self.edge_targets.tolist()):
+                incoming[target].append(e)
+            self._incoming = self.edge_origins().tolist(), incoming
+        return self._incoming
+
+    def slot_origins(self):
+        """Origin airport id of every flight slot, as one array."""
+        return np.repeat(self.edge_origins(), np.diff(self.flight_offsets))
+
+    def slot_dests(self):
+        """Destination airport id of every flight slot, as one array."""
+        return np.repeat(self.edge_targets, np.diff(self.flight_offsets))
+
+    def layout(self):
+        """
+        Drawing position (x, y) of every airport as a (num_airports, 2)
+        array: (longitude, latitude) for airports in airports.csv, the rest
+        placed by a seeded spring layout around them. Built on first use.
+        """
+        if self._layout is None:
+            from airports import load_airport_coords
+            coords = load_airport_coords()
+            pos = np.full((self.num_airports, 2), np.nan)
+            for i, code in enumerate(self.codes):
+                if code in coords:
+                    lat, lon = coords[code]
+                    pos[i] = lon, lat
+            missing = np.isnan(pos[:, 0])
+            if missing.any():
+                pos = _spring_layout(self.edge_origins(), self.edge_targets, pos, missing)
+            self._layout = pos
+        return self._layout
+
+    def expected_arrivals(self, delays, minutes_per_unit=1, update=None):
+        """
+        Arrival times with each slot's predicted delay (minutes) added, and
+        the matching per-edge suffix minimum, as an (arrivalT, best) pair
+        the search can use in place of the scheduled ones.
+
+        Negative predictions are clamped to 0 so a flight never arrives
+        before it departs.
+
+        update: Optional (previous expected pair, source, touched) when this
+            network came from apply_changes and the kept slots' delays are
+            unchanged; the previous best is patched instead of recomputed.
+        """
+        arrival = self.arrivalT + np.maximum(np.asarray(delays, dtype=np.float64), 0) / minutes_per_unit
+        if update is not None:
+            (_, previous_best), source, touched = update
+            return arrival, self.patched_best(previous_best, arrival, source, touched)
+        return arrival, _suffix_best(self.flight_offsets, arrival, self.flight_ids)
+
+    def find_slot(self, origin, dest, departT):
+        """
+        First slot from origin to dest (ids, codes or Vertex objects) departing
+        exactly at departT, or -1 (see find_slots for all of them).
+        """
+        try:
+            edge = self.find_edge(self.airport_id(origin), self.airport_id(dest))
+        except KeyError:
+            return -1
+        if edge < 0:
+            return -1
+        _, _, flight_offsets, departs, _, _ = self.views()
+        hi = flight_offsets[edge + 1]
+        i = bisect_left(departs, departT, flight_offsets[edge], hi)
+        return i if i < hi and departs[i] == departT else -1
+
+    def find_slots(self, origin, dest, departT):
+        """
+        Every slot from origin to dest (ids, codes or Vertex objects)
+        departing exactly at departT, as a range (empty if there is none);
+        several flights can share an edge and a departure time.
+        """
+        slot = self.find_slot(origin, dest, departT)
+        if slot < 0:
+            return range(0)
+        edge_end = int(self.flight_offsets[np.searchsorted(self.flight_offsets, slot, side='right')])
+        end = slot + int(np.searchsorted(self.departT[slot:edge_end], departT, side='right'))
+        return range(slot, end)
+
+    def slot_of(self, flight_id):
+        """
+        Slot of a flight id (an index into names), or -1 if it is not on the
+        timetable any more. The inverse table is built on first use.
+        """
+        if self._slots_by_id is None:
+            slots = np.full(len(self.names), -1, dtype=np.int32)
+            slots[self.flight_ids] = np.arange(len(self), dtype=np.int32)
+            self._slots_by_id = slots
+        return int(self._slots_by_id[flight_id]) if flight_id < len(self._slots_by_id) else -1
+
+    def vertex(self, airport):
+        """Vertex object for an airport id, created on first use."""
+        if self._vertices is None:
+            from flight import Vertex
+            self._vertices = [Vertex(code, []) for code in self.codes]
+        return self._vertices[airport]
+
+    def flight(self, slot):
+        """Flight object for a slot: the original one if available, else materialized."""
+        flight_id = int(self.flight_ids[slot])
+        if self.flights is not None:
+            return self.flights[flight_id]
+        from flight import Flight
+        return Flight(self.names[flight_id], self.vertex(self.slot_origin(slot)),
+                      self.vertex(self.slot_dest(slot)), int(self.arrivalT[slot]), int(self.departT[slot]))
+
+    def edges(self):
+        """Yields (origin code, dest code, flights on the edge, shortest block time) per edge."""
+        for a in range(self.num_airports):
+            for e in range(int(self.edge_offsets[a]), int(self.edge_offsets[a + 1])):
+                lo, hi = int(self.flight_offsets[e]), int(self.flight_offsets[e + 1])
+                block = int((self.arrivalT[lo:hi] - self.departT[lo:hi]).min())
+                yield self.codes[a], self.codes[int(self.edge_targets[e])], hi - lo, block
+
+    def nbytes(self):
+        """Bytes held by the CSR arrays."""
+        return sum(a.nbytes for a in (self.edge_offsets, self.edge_targets, self.flight_offsets,
+                                      self.departT, self.arrivalT, self.flight_ids, self.best))
+
+    def fingerprint(self):
+        """
+        Hex checksum of the airports and the timetable, the same for equal
+        networks across processes; a version key for cached query results.
+        Built on first use.
+        """
+        if self._fingerprint is None:
+            crc = zlib.crc32("\0".join(self.codes).encode("utf-8"))
+            for a in (self.edge_offsets, self.edge_targets, self.flight_offsets,
+                      self.departT, self.arrivalT, self.flight_ids):
+                crc = zlib.crc32(np.ascontiguousarray(a).tobytes(), crc)
+            self._fingerprint = f"{crc:08x}"
+        return self._fingerprint
+
+    # ---------------- Updates ----------------
+    def apply_changes(self, remove=(), add=()):
+        """
+        A copy of the network with the flight slots in `remove` cancelled and
+        the flights in `add` added, patched from this one instead of rebuilt:
+        the kept slots are still in order, so the new ones are spliced in at
+        their sorted positions and only the edges that gained or lost flights
+        get their `best` entries recomputed. This network is left untouched,
+        so searches running on it are not disturbed.
+
+        remove: slots to cancel
+        add: (origin code, dest code, departT, arrivalT, name) per new flight;
+            unknown airports are appended to codes
+
+        Kept flights keep their flight ids, so an id names the same departure
+        across updates; added flights get the next free ids.
+
+        Returns:
+            (network, source, touched): source[slot] is the slot of this
+            network each new slot came from (-1 for added flights), and
+            touched the ids of the edges that changed, for patched_best.
+        """
+        codes = list(self.codes)
+        index = dict(self.index)
+        for origin, dest, *_ in add:
+            for code in (origin, dest):
+                if code not in index:
+                    index[code] = len(codes)
+                    codes.append(code)
+        n_airports = len(codes)
+
+        keep = np.ones(len(self), dtype=bool)
+        keep[np.asarray(list(remove), dtype=np.int64)] = False
+        source = np.flatnonzero(keep).astype(np.int32)
+        origins, dests = self.slot_origins()[source], self.slot_dests()[source]
+        departT, arrivalT, flight_ids = self.departT[source], self.arrivalT[source], self.flight_ids[source]
+        names, flights, vertices = self.names, self.flights, self._vertices
+
+        if add:
+            new_origins = np.array([index[f[0]] for f in add], dtype=np.int32)
+            new_dests = np.array([index[f[1]] for f in add], dtype=np.int32)
+            new_departT = np.array([f[2] for f in add], dtype=np.int32)
+            new_arrivalT = np.array([f[3] for f in add], dtype=np.int32)
+            new_ids = np.arange(len(self.names), len(self.names) + len(add), dtype=np.int32)
+
+            # np.insert keeps the given order among equal positions, so sort the additions first
+            new_keys = _slot_keys(new_origins, new_dests, new_departT, n_airports)
+            order = np.argsort(new_keys, kind='stable')
+            at = np.searchsorted(_slot_keys(origins, dests, departT, n_airports), new_keys[order], side='right')
+            origins = np.insert(origins, at, new_origins[order])
+            dests = np.insert(dests, at, new_dests[order])
+            departT = np.insert(departT, at, new_departT[order])
+            arrivalT = np.insert(arrivalT, at, new_arrivalT[order])
+            flight_ids = np.insert(flight_ids, at, new_ids[order])
+            source = np.insert(source, at, -1)
+
+            names = _AppendedNames(names, [f[4] for f in add])
+            if flights is not None or vertices is not None:
+                from flight import Flight, Vertex
+                vertices = [self.vertex(i) for i in range(self.num_airports)]
+                vertices += [Vertex(code, []) for code in codes[self.num_airports:]]
+                if flights is not None:
+                    flights = list(flights) + [Flight(f[4], vertices[index[f[0]]], vertices[index[f[1]]], f[3], f[2])
+                                               for f in add]
+
+        edge_offsets, edge_targets, flight_offsets = _edges(origins, dests, n_airports)
+        network = Network(codes, edge_offsets, edge_targets, flight_offsets, departT, arrivalT,
+                          flight_ids, np.empty(len(departT), dtype=np.int32), names, flights)
+        network._vertices = vertices
+
+        # Edges whose flights changed: they gained an added flight or have fewer kept ones than before
+        old_keys = self.edge_origins().astype(np.int64) * n_airports + self.edge_targets
+        new_keys = network.edge_origins().astype(np.int64) * n_airports + edge_targets
+        counts = np.diff(flight_offsets)
+        kept = np.add.reduceat((source >= 0).astype(np.int64), flight_offsets[:-1]) if len(counts) else counts
+        pos = np.minimum(np.searchsorted(old_keys, new_keys), max(len(old_keys) - 1, 0))
+        old_counts = np.where(old_keys[pos] == new_keys, np.diff(self.flight_offsets)[pos], 0) if len(old_keys) else 0
+        touched = np.flatnonzero((kept < counts) | (kept != old_counts))
+
+        network.best = network.patched_best(self.best, arrivalT, source, touched)
+        return network, source, touched
+
+    def patched_best(self, old_best, arrivalT, source, touched):
+        """
+        `best` for this network and arrival times `arrivalT`, carried over from
+        old_best of the network it was updated from (see apply_changes):
+        untouched edges are renumbered, touched ones recomputed.
+        """
+        kept = source >= 0
+        renumber = np.full(len(old_best), -1, dtype=np.int32)
+        renumber[source[kept]] = np.flatnonzero(kept)
+        best = np.empty(len(self), dtype=np.int32)
+        best[kept] = renumber[np.asarray(old_best)[source[kept]]]
+
+        for e in touched.tolist():
+            lo, hi = int(self.flight_offsets[e]), int(self.flight_offsets[e + 1])
+            keys = list(zip(np.asarray(arrivalT[lo:hi]).tolist(), self.flight_ids[lo:hi].tolist()))
+            b = hi - 1
+            for i in range(hi - 1, lo - 1, -1):
+                if keys[i - lo] < keys[b - lo]:
+                    b = i
+                best[i] = b
+        return best
+
+
+def _edges(slot_origin, slot_dest, n_airports):
+    """
+    Edge arrays for slots already sorted by origin then dest: one edge per
+    distinct (origin, dest) run.
+
+    Returns:
+        (edge_offsets, edge_targets, flight_offsets)
+    """
+    n_flights = len(slot_origin)
+    if n_flights:
+        new_edge = np.empty(n_flights, dtype=bool)
+        new_edge[0] = True
+        new_edge[1:] = (slot_origin[1:] != slot_origin[:-1]) | (slot_dest[1:] != slot_dest[:-1])
+        edge_starts = np.flatnonzero(new_edge)
+    else:
+        edge_starts = np.empty(0, dtype=np.int64)
+    n_edges = len(edge_starts)
+
+    flight_offsets = np.empty(n_edges + 1, dtype=np.int32)
+    flight_offsets[:-1] = edge_starts
+    flight_offsets[-1] = n_flights
+    edge_targets = slot_dest[edge_starts].astype(np.int32)
+    edge_origins = slot_origin[edge_starts]
+    edge_offsets = np.zeros(n_airports + 1, dtype=np.int32)
+    np.cumsum(np.bincount(edge_origins, minlength=n_airports), out=edge_offsets[1:])
+    return edge_offsets, edge_targets, flight_offsets
+
+
+def _slot_keys(origins, dests, departT, n_airports):
+    """One int64 per slot that sorts like the slots: by origin, dest, then departure."""
+    edge = origins.astype(np.int64) * n_airports + dests
+    return (edge << 32) + departT.astype(np.int64)
+
+
+class _AppendedNames:
+    """Flight names of an updated network: the original names plus those of the added flights."""
+
+    def __init__(self, base, extra):
+        if isinstance(base, _AppendedNames):
+            base, extra = base.base, base.extra + extra
+        self.base = base
+        self.extra = list(extra)
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, i):
+        return self.base[i] if i < len(self.base) else self.extra[i - len(self.base)]
+
+    def tolist(self):
+        base = self.base.tolist() if hasattr(self.base, 'tolist') else list(self.base)
+        return base + self.extra
+
+
+def _spring_layout(origins, targets, pos, missing):
+    """
+    Places the `missing` rows of pos with networkx's spring layout around
+    the others, which stay fixed. The fixed positions are scaled into the
+    unit box the layout works in, and the result scaled back.
+    """
+    import networkx as nx
+
+    fixed = np.flatnonzero(~missing).tolist()
+    center, scale = np.zeros(2), 1.0
+    if fixed:
+        center = pos[fixed].mean(axis=0)
+        scale = float(np.abs(pos[fixed] - center).max()) or 1.0
+
+    G = nx.Graph()
+    G.add_nodes_from(range(len(pos)))
+    G.add_edges_from(zip(origins.tolist(), targets.tolist()))
+    initial = {i: (pos[i] - center) / scale for i in fixed}
+    placed = nx.spring_layout(G, pos=initial or None, fixed=fixed or None, seed=42)
+    return np.array([placed[i] for i in range(len(pos))], dtype=np.float64) * scale + center
+
+
+def _suffix_best(flight_offsets, arrivalT, order):
+    """
+    best[i] = slot with the smallest (arrivalT, input order) among slots
+    i..end of its edge, computed for every edge at once.
+
+    Each slot gets a key that sorts by edge first, so a reversed running
+    minimum never carries a value over from a later edge into an earlier one.
+    Arrivals are replaced by their rank, so float arrivals work too. `order`
+    must be unique but may have gaps (flight ids after apply_changes).
+    """
+    n = len(arrivalT)
+    if n == 0:
+        return np.empty(0, dtype=np.int32)
+    edge_of_slot = np.repeat(np.arange(len(flight_offsets) - 1, dtype=np.int64), np.diff(flight_offsets))
+    ranks, arr = np.unique(arrivalT, return_inverse=True)
+    span = len(ranks)
+    m = int(order.max()) + 1
+    key = (edge_of_slot * span + arr.astype(np.int64)) * m + order.astype(np.int64)
+    running = np.minimum.accumulate(key[::-1])[::-1]
+    best_order = running % m
+
+    slot_of_order = np.empty(m, dtype=np.int32)
+    slot_of_order[order] = np.arange(n, dtype=np.int32)
+    return slot_of_order[best_order]
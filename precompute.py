@@ -0,0 +1,176 @@
+"""
+All-pairs earliest-arrival tables.
+
+`precompute` runs a one-to-all search from every airport for a grid of
+start times (every hour of the week by default), one task per source
+airport spread over a ProcessPoolExecutor. The result is an ArrivalMatrix,
+stored next to the CSV in the same aligned binary layout as compiled.py
+and memory-mapped on load, so looking up a pair is one array index.
+
+File layout (little-endian):
+
+    b"SKYPAIR\\0"                 magic
+    uint32                        format version
+    uint32                        header length
+    header                        UTF-8 JSON: source stamp, codes, start times
+    padding to 64 bytes
+    float32 arrivals              [start time, source, destination]
+
+Run `python precompute.py [csv_path] [workers]` to (re)build the file.
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import compiled
+import csa
+import loader
+from timemodel import MINUTES_PER_HOUR, MINUTES_PER_WEEK
+
+MAGIC = b"SKYPAIR\0"
+FORMAT_VERSION = 1
+HOURLY = list(range(0, MINUTES_PER_WEEK, MINUTES_PER_HOUR))
+
+
+def get_matrix_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".skymatrix"
+
+
+class ArrivalMatrix:
+    """
+    Earliest arrival for every (start time, source, destination):
+    arrivals[k, s, d] leaving s at startTs[k] (inf if d is not reached).
+    """
+
+    def __init__(self, codes, startTs, arrivals, min_connection=0):
+        self.codes = list(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.startTs = list(startTs)
+        self.start_index = {t: k for k, t in enumerate(self.startTs)}
+        self.arrivals = arrivals
+        self.min_connection = min_connection
+
+    def _ids(self, s, startT):
+        return self.start_index[startT], self.index[getattr(s, 'name', s)]
+
+    def arrival(self, s, d, startT):
+        """
+        Earliest arrival at d leaving s at startT (codes or Vertex objects).
+        Raises KeyError if startT is not on the precomputed grid.
+        """
+        k, src = self._ids(s, startT)
+        return float(self.arrivals[k, src, self.index[getattr(d, 'name', d)]])
+
+    def one_to_all(self, s, startT):
+        """{code: earliest arrival} for every airport reached from s at startT."""
+        k, src = self._ids(s, startT)
+        row = self.arrivals[k, src].tolist()
+        return {code: arrival for code, arrival in zip(self.codes, row) if arrival != float('inf')}
+
+    def reachable(self, s, startT, deadline):
+        """{code: earliest arrival} for the airports reached from s by deadline."""
+        return {code: arrival for code, arrival in self.one_to_all(s, startT).items() if arrival <= deadline}
+
+
+# ---------------- Precomputation ----------------
+_worker = {}
+
+
+def _init_worker(network, startTs, min_connection):
+    _worker.update(network=network, startTs=np.asarray(startTs, dtype=np.float64), min_connection=min_connection)
+
+
+def _source_rows(s):
+    """Arrivals from airport s for every start time, in one batched scan."""
+    startTs = _worker['startTs']
+    T = csa.earliest_arrival_many(_worker['network'], np.full(len(startTs), s), startTs,
+                                  min_connection=_worker['min_connection'])
+    return s, T.astype(np.float32)
+
+
+def precompute(network, startTs=HOURLY, min_connection=0, workers=None):
+    """
+    network: Network to route on
+    startTs: Start times to precompute (minutes since Monday 00:00)
+    min_connection: Minimum connection time between flights
+    workers: Worker processes (default: one per CPU); 1 runs in-process
+
+    Returns:
+        ArrivalMatrix
+    """
+    arrivals = np.empty((len(startTs), network.num_airports, network.num_airports), dtype=np.float32)
+    sources = range(network.num_airports)
+    if workers == 1:
+        _init_worker(network, startTs, min_connection)
+        results = map(_source_rows, sources)
+        for s, rows in results:
+            arrivals[:, s] = rows
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(network, startTs, min_connection)) as pool:
+            for s, rows in pool.map(_source_rows, sources):
+                arrivals[:, s] = rows
+    return ArrivalMatrix(network.codes, startTs, arrivals, min_connection)
+
+
+# ---------------- Matrix file ----------------
+def write_matrix(matrix, path, csv_path):
+    """Writes `matrix` to `path`, stamped with the current size/mtime of csv_path."""
+    header = json.dumps({
+        'source': compiled._source_stamp(csv_path),
+        'codes': matrix.codes,
+        'startTs': matrix.startTs,
+        'min_connection': matrix.min_connection,
+        'shape': list(matrix.arrivals.shape),
+    }).encode("utf-8")
+    data_start = compiled._aligned(compiled._PREFIX.size + len(header))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compiled._PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.seek(data_start)
+        f.write(np.ascontiguousarray(matrix.arrivals, dtype='<f4').tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_matrix(path, csv_path=None):
+    """
+    Memory-maps a matrix file. With csv_path, returns None if the file is
+    missing, from another format version or older than the CSV.
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, version, header_len = compiled._PREFIX.unpack(f.read(compiled._PREFIX.size))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    if csv_path is not None and header['source'] != compiled._source_stamp(csv_path):
+        return None
+
+    offset = compiled._aligned(compiled._PREFIX.size + header_len)
+    arrivals = np.memmap(path, dtype='<f4', mode="r", offset=offset, shape=tuple(header['shape']))
+    return ArrivalMatrix(header['codes'], header['startTs'], arrivals, header['min_connection'])
+
+
+def get_arrival_matrix(csv_path=None):
+    """The precomputed matrix for the CSV, or None if it has not been built since the CSV changed."""
+    csv_path = csv_path or loader.get_csv_path()
+    return load_matrix(get_matrix_path(csv_path), csv_path)
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else loader.get_csv_path()
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    network, _ = compiled.load_network(csv_path)
+    started = time.perf_counter()
+    matrix = precompute(network, workers=workers)
+    write_matrix(matrix, get_matrix_path(csv_path), csv_path)
+    print(f"✅ Precomputed {len(matrix.startTs)} start times x {network.num_airports}^2 pairs "
+          f"in {time.perf_counter() - started:.1f} s to {get_matrix_path(csv_path)}")
@@ -0,0 +1,168 @@
+"""
+Delay prediction for flights.
+
+DelayPredictor wraps the pickled scikit-learn model. LinearDelayPredictor
+does the same for the LinearRegression that delay_predictor.py trains, using
+only NumPy and a small JSON export of the coefficients and encoder
+vocabularies, so callers don't need pandas or scikit-learn at all.
+
+Run `python predictor.py` to re-export delay_model.json from the pickles.
+"""
+import json
+import os
+
+import numpy as np
+
+from timemodel import DAYS, hour_of_day, weekday
+
+FEATURES = ['origin', 'dest', 'departT', 'day', 'weather']
+
+# Weather the Streamlit app predicts with (it passed the encoded value 0,
+# which is what this label encodes to)
+APP_WEATHER = "Clear"
+
+CATEGORICAL = ['origin', 'dest', 'day', 'weather']
+
+
+def get_model_json_path():
+    return os.path.join(os.path.dirname(__file__), "delay_model.json")
+
+
+class DelayPredictor:
+    """
+    Batched delay prediction: N flights in, N delays out, with a single
+    model.predict call. The label encoders are turned into dict lookups once,
+    and each batch only looks up its distinct labels.
+    """
+
+    def __init__(self, model, encoders):
+        self.model = model
+        self.vocabularies = {
+            feature: {label: code for code, label in enumerate(encoder.classes_.tolist())}
+            for feature, encoder in zip(CATEGORICAL, encoders)
+        }
+
+    def encode(self, feature, labels):
+        """
+        Encodes labels of a categorical feature as its LabelEncoder would;
+        labels it has never seen become -1.
+        """
+        labels = np.asarray(labels, dtype=str)
+        vocabulary = self.vocabularies[feature]
+        uniques, inverse = np.unique(labels, return_inverse=True)
+        codes = np.array([vocabulary.get(label, -1) for label in uniques.tolist()], dtype=np.int64)
+        return codes[inverse].reshape(labels.shape)
+
+    def predict(self, origins, dests, departT, day, weather):
+        """
+        origins, dests: airport codes per flight
+        departT: departure hour of day (0–23) per flight, as the model was trained on
+        day, weather: one label for every flight, or one label per flight
+
+        Returns:
+            array of predicted delays in minutes. Flights with a label the
+            encoders do not know get 0, like the per-flight predict_delay did.
+        """
+        n = len(origins)
+        X = np.empty((n, len(FEATURES)), dtype=np.int64)
+        X[:, 0] = self.encode('origin', origins)
+        X[:, 1] = self.encode('dest', dests)
+        X[:, 2] = np.asarray(departT, dtype=np.int64)
+        X[:, 3] = self.encode('day', np.broadcast_to(np.asarray(day, dtype=str), n))
+        X[:, 4] = self.encode('weather', np.broadcast_to(np.asarray(weather, dtype=str), n))
+
+        known = (X[:, [0, 1, 3, 4]] >= 0).all(axis=1)
+        delays = np.zeros(n)
+        if known.any():
+            delays[known] = self._predict_rows(X[known])
+        return delays
+
+    def _predict_rows(self, X):
+        import pandas as pd
+        return self.model.predict(pd.DataFrame(X, columns=FEATURES))
+
+    def predict_times(self, origins, dests, departT, day, weather):
+        """
+        Like predict, but departT is in minutes since Monday 00:00. A day of
+        None uses the weekday each flight departs on.
+        """
+        departT = np.asarray(departT, dtype=np.int64)
+        if day is None:
+            day = np.asarray(DAYS)[weekday(departT)]
+        return self.predict(origins, dests, hour_of_day(departT), day, weather)
+
+    def predict_flights(self, flights, day=None, weather=APP_WEATHER):
+        """Predicted delay for each Flight object in `flights`."""
+        return self.predict_times(
+            [f.origin.name for f in flights],
+            [f.dest.name for f in flights],
+            [f.departT for f in flights],
+            day, weather,
+        )
+
+    def predict_network(self, network, day=None, weather=APP_WEATHER, slots=None):
+        """
+        Predicted delay for every flight slot in a Network, so later lookups
+        are an array index: delays[slot]. With `slots`, only for those.
+        """
+        codes = np.asarray(network.codes, dtype=str)
+        origins, dests, departT = network.slot_origins(), network.slot_dests(), network.departT
+        if slots is not None:
+            origins, dests, departT = origins[slots], dests[slots], departT[slots]
+        return self.predict_times(codes[origins], codes[dests], departT, day, weather)
+
+
+class LinearDelayPredictor(DelayPredictor):
+    """
+    NumPy-only DelayPredictor for a linear model: delay = X @ coef + intercept,
+    the same arithmetic LinearRegression.predict does, so results are identical.
+    """
+
+    def __init__(self, coef, intercept, vocabularies):
+        self.model = None
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.vocabularies = vocabularies
+
+    @classmethod
+    def from_model(cls, model, encoders):
+        vocabularies = DelayPredictor(model, encoders).vocabularies
+        return cls(model.coef_, model.intercept_, vocabularies)
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or get_model_json_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data['features'] != FEATURES:
+            raise ValueError(f"Model was exported for features {data['features']}, expected {FEATURES}")
+        vocabularies = {
+            feature: {label: code for code, label in enumerate(data['vocabularies'][feature])}
+            for feature in CATEGORICAL
+        }
+        return cls(data['coef'], data['intercept'], vocabularies)
+
+    def save(self, path=None):
+        data = {
+            'features': FEATURES,
+            'coef': self.coef.tolist(),
+            'intercept': self.intercept,
+            'vocabularies': {
+                feature: sorted(vocabulary, key=vocabulary.get)
+                for feature, vocabulary in self.vocabularies.items()
+            },
+        }
+        with open(path or get_model_json_path(), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def _predict_rows(self, X):
+        return X.astype(np.float64) @ self.coef + self.intercept
+
+
+if __name__ == '__main__':
+    import joblib
+    from snapshot import get_encoders_path, get_model_path
+
+    model = joblib.load(get_model_path())
+    encoders = joblib.load(get_encoders_path())
+    LinearDelayPredictor.from_model(model, encoders).save()
+    print(f"✅ Exported model to {get_model_json_path()}")
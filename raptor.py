@@ -0,0 +1,178 @@
+"""
+Multi-criteria routing: RAPTOR-style rounds with Pareto label bags.
+
+Round k finds the itineraries with exactly k flights. Every airport keeps,
+per round, a bag of labels that are non-dominated in (arrival time, total
+predicted delay); fewer flights is the third criterion, so a label only
+survives if no earlier round already did as well. Labels live in flat
+parallel lists and bags hold label ids, so a whole search allocates a few
+lists of ints and floats.
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+import search
+from timemodel import MINUTES_PER_DAY
+
+MAX_LEGS = 5
+DELAY_STEP = 5  # delays are compared in steps of this many minutes, which keeps bags small
+
+
+def delay_criterion(network, delays):
+    """
+    Per-slot predicted delays (minutes) prepared for pareto_journeys:
+    clamped to >= 0 and rounded to DELAY_STEP, with the least delay of any
+    flight from each slot to the end of its edge. Build it once per set of
+    predictions, like Network.expected_arrivals.
+
+    Returns:
+        (delays, least_delays) memoryviews indexed by slot
+    """
+    delays = np.round(np.maximum(np.asarray(delays, dtype=np.float64), 0) / DELAY_STEP) * DELAY_STEP
+    return memoryview(delays), memoryview(_suffix_min(network.flight_offsets, delays))
+
+
+def pareto_journeys(network, s, d, startT, delays=None, min_connection=0,
+                    max_legs=MAX_LEGS, window=MINUTES_PER_DAY):
+    """
+    Every non-dominated itinerary from s to d in (arrival time, number of
+    flights, total predicted delay).
+
+    network: Network with the CSR timetable
+    s, d: Source and destination airport ids
+    startT: Start time at the source
+    delays: Optional delay_criterion(network, predicted delays), e.g.
+        NetworkSnapshot.delay_criterion; without it only arrival time and
+        number of flights count
+    min_connection: Minimum connection time (not applied at the source)
+    max_legs: Most flights in one itinerary
+    window: Only itineraries arriving within this many minutes of the
+        earliest possible arrival are considered
+
+    Returns:
+        list of (arrival, delay, slots), fewest flights first.
+    """
+    earliest = search.earliest_arrival(network, s, startT, d, None, min_connection)[0][d]
+    if s == d or earliest == float('inf'):
+        return []
+    beyond = earliest + window + 1  # first arrival past the window (times are whole minutes)
+    # Least time from each airport to d, to drop labels that cannot beat an itinerary already found
+    block = network.shortest_blocks().tolist()
+    remaining = network.time_to(d, min_connection).tolist()
+
+    edge_offsets, edge_targets, flight_offsets, departT, arrivalT, best = network.views()
+    if delays is not None:
+        delays, least_delay = delays
+
+    # Label storage: label i arrived at label_at[i] at label_arrival[i] with
+    # label_delay[i] accumulated, over flight label_slot[i] from label_parent[i]
+    label_at, label_arrival, label_delay = [s], [startT], [0.0]
+    label_slot, label_parent = [-1], [-1]
+    # Pareto front over all rounds per airport, by increasing delay (so
+    # decreasing arrival): what any new label there has to beat
+    front_delay = [[] for _ in range(network.num_airports)]
+    front_arrival = [[] for _ in range(network.num_airports)]
+    front_delay[s].append(0.0)
+    front_arrival[s].append(startT)
+
+    def bound(v, delay):
+        """Earliest arrival at v with at most `delay`; anything later there is dominated."""
+        k = bisect_right(front_delay[v], delay)
+        return front_arrival[v][k - 1] if k else beyond
+
+    def add(v, arrival, delay):
+        k = bisect_right(front_delay[v], delay)
+        end = k
+        while end < len(front_delay[v]) and front_arrival[v][end] >= arrival:
+            end += 1
+        front_delay[v][k:end] = [delay]
+        front_arrival[v][k:end] = [arrival]
+
+    journeys = []
+    marked = [0]
+    for legs in range(1, max_legs + 1):
+        bags = {}  # airport -> labels of this round
+        for parent in marked:
+            u = label_at[parent]
+            arrived, delay_so_far = label_arrival[parent], label_delay[parent]
+            if bound(d, delay_so_far) <= arrived + remaining[u]:
+                continue  # an itinerary found since does at least as well
+            ready = arrived if u == s else arrived + min_connection
+            stop = bound(d, delay_so_far)
+            for e in range(edge_offsets[u], edge_offsets[u + 1]):
+                v = edge_targets[e]
+                if v == s:
+                    continue
+                lo, hi = flight_offsets[e], flight_offsets[e + 1]
+                i = bisect_left(departT, ready, lo, hi)
+                # Departing at or after this, d is reached too late to beat what is known
+                latest = stop - block[e] - remaining[v]
+                if delays is None:
+                    # Single criterion on the edge: the earliest arrival is the only candidate
+                    candidates = (best[i],) if i < hi else ()
+                else:
+                    candidates = range(i, hi)
+                    stop_v = min(latest, bound(v, delay_so_far + least_delay[i])) if i < hi else latest
+                    found = []
+                for slot in candidates:
+                    if delays is None:
+                        delay = 0.0
+                    else:
+                        dep = departT[slot]
+                        if dep >= stop_v:
+                            break
+                        # Once a flight found here lands before this one leaves with no
+                        # more delay than any flight left could have, the rest is dominated
+                        least = delay_so_far + least_delay[slot]
+                        if any(a <= dep and x <= least for a, x in found):
+                            break
+                        delay = delay_so_far + delays[slot]
+                        found.append((arrivalT[slot], delay))
+                    arrival = arrivalT[slot]
+                    if bound(d, delay) <= arrival + remaining[v] or bound(v, delay) <= arrival:
+                        continue
+                    # New label; labels of this round it dominates leave the bag
+                    bag = bags.setdefault(v, [])
+                    bag[:] = [j for j in bag if not (arrival <= label_arrival[j] and delay <= label_delay[j])]
+                    bag.append(len(label_at))
+                    add(v, arrival, delay)
+                    label_at.append(v)
+                    label_arrival.append(arrival)
+                    label_delay.append(delay)
+                    label_slot.append(slot)
+                    label_parent.append(parent)
+
+        marked = []
+        for v, bag in bags.items():
+            if v == d:
+                for i in bag:
+                    journeys.append((label_arrival[i], label_delay[i], _slots(label_slot, label_parent, i)))
+            else:
+                marked.extend(bag)
+        if not marked:
+            break
+
+    return journeys
+
+
+def _slots(label_slot, label_parent, i):
+    path = []
+    while label_parent[i] >= 0:
+        path.append(label_slot[i])
+        i = label_parent[i]
+    path.reverse()
+    return path
+
+
+def _suffix_min(flight_offsets, values):
+    """values[i] replaced by the minimum of values[i:] within its edge."""
+    if len(values) == 0:
+        return values.copy()
+    # Walking backwards, shift each edge below all later ones so the running
+    # minimum restarts at every edge boundary
+    edge = np.repeat(np.arange(len(flight_offsets) - 1), np.diff(flight_offsets))
+    step = float(values.max() - values.min()) + 1
+    shift = (edge[-1] - edge) * step
+    return np.minimum.accumulate((values - shift)[::-1])[::-1] + shift
+
@@ -0,0 +1,216 @@
+"""
+Common interface over the earliest-arrival backends.
+
+    router = get_router(network, 'csa')
+    arrival, flights = router.route('DEL', 'BOM', to_minutes('Mon', 9))
+
+Every backend returns the same (arrival time, list of flights) result as
+FlightAgency, so they can be swapped freely.
+"""
+import numpy as np
+
+import alternatives
+import astar
+import csa
+import raptor
+import search
+from timemodel import MINUTES_PER_DAY
+
+BATCH_SIZE = 128  # queries per vectorized scan in CSARouter.route_many
+
+
+class Router:
+    """Earliest-arrival routing over a Network; subclasses provide the search."""
+
+    name = None
+
+    def __init__(self, network):
+        self.network = network
+
+    def earliest_arrival(self, s, startT, d=None, expected=None, min_connection=0):
+        """Returns (T, prev_slot) lists indexed by airport id, see search.earliest_arrival."""
+        raise NotImplementedError
+
+    def route(self, s, d, startT, expected=None, min_connection=0):
+        """
+        s: Source vertex, airport code or airport id
+        d: Destination vertex, airport code or airport id
+        startT: Start time in minutes since Monday 00:00
+        expected: Optional Network.expected_arrivals(delays)
+        min_connection: Minimum connection time between flights
+
+        Returns:
+            (earliest arrival time, list of flights taken as path)
+        """
+        arrival, slots = self.route_slots(s, d, startT, expected, min_connection)
+        return arrival, [self.network.flight(slot) for slot in slots]
+
+    def route_slots(self, s, d, startT, expected=None, min_connection=0):
+        """
+        Same as route(), with the slots of the flights taken instead of
+        Flight objects, so callers can tell apart flights that share an edge
+        and a departure time (e.g. to cache them by network.flight_ids).
+
+        Returns:
+            (earliest arrival time, list of slots taken as path)
+        """
+        try:
+            src, dst = self.network.airport_id(s), self.network.airport_id(d)
+        except KeyError:
+            # Airport without any flights
+            return float('inf'), []
+
+        T, prev_slot = self.earliest_arrival(src, startT, dst, expected, min_connection)
+        path = search.reconstruct_path(self.network, prev_slot, src, dst)
+        return (float('inf'), []) if path is None else (T[dst], path)
+
+    def one_to_all(self, s, startT, expected=None, min_connection=0):
+        """{code: earliest arrival} for every airport reachable from s leaving at startT."""
+        try:
+            src = self.network.airport_id(s)
+        except KeyError:
+            return {}
+        T, _ = self.earliest_arrival(src, startT, None, expected, min_connection)
+        return {code: arrival for code, arrival in zip(self.network.codes, T) if arrival != float('inf')}
+
+    def route_many(self, queries, expected=None, min_connection=0):
+        """Routes every (s, d, startT) query; returns a list of route() results."""
+        return [self.route(s, d, startT, expected, min_connection) for s, d, startT in queries]
+
+    def profile(self, s, d, startT, endT, expected=None, min_connection=0):
+        """
+        Every non-dominated journey from s to d leaving in [startT, endT)
+        (see csa.profile), found in one backward scan instead of a search
+        per start time. Any start time in the window maps to the first
+        journey leaving at or after it.
+
+        Returns:
+            list of (departure, arrival, flights), by departure time
+        """
+        try:
+            src, dst = self.network.airport_id(s), self.network.airport_id(d)
+        except KeyError:
+            return []
+        journeys = csa.profile(self.network, src, dst, startT, endT, expected, min_connection)
+        return [(departure, arrival, [self.network.flight(slot) for slot in path])
+                for departure, arrival, path in journeys]
+
+    def alternatives(self, s, d, startT, k=3, min_connection=0, window=alternatives.WINDOW, expected=None):
+        """
+        The k earliest-arriving distinct itineraries from s to d, best first
+        (see alternatives.k_earliest), from a single search; with `expected`
+        they are planned on, and arrive at, the delayed arrivals.
+
+        Returns:
+            list of (arrival, flights)
+        """
+        try:
+            src, dst = self.network.airport_id(s), self.network.airport_id(d)
+        except KeyError:
+            return []
+        itineraries = alternatives.k_earliest(self.network, src, dst, startT, k, min_connection, window, expected)
+        return [(arrival, [self.network.flight(slot) for slot in path]) for arrival, path in itineraries]
+
+    def pareto(self, s, d, startT, delays=None, min_connection=0, max_legs=raptor.MAX_LEGS,
+               window=MINUTES_PER_DAY):
+        """
+        Every itinerary from s to d that is best in some trade-off of arrival
+        time, number of flights and total predicted delay (see
+        raptor.pareto_journeys; `delays` is a raptor.delay_criterion).
+
+        Returns:
+            list of (arrival, total delay, flights), fewest flights first
+        """
+        try:
+            src, dst = self.network.airport_id(s), self.network.airport_id(d)
+        except KeyError:
+            return []
+        journeys = raptor.pareto_journeys(self.network, src, dst, startT, delays, min_connection, max_legs, window)
+        return [(arrival, delay, [self.network.flight(slot) for slot in path]) for arrival, delay, path in journeys]
+
+    def _result(self, arrival, path):
+        if path is None:
+            # No path found
+            return float('inf'), []
+        return arrival, [self.network.flight(slot) for slot in path]
+
+
+class DijkstraRouter(Router):
+    """Time-dependent Dijkstra (search.py)."""
+
+    name = 'dijkstra'
+
+    def earliest_arrival(self, s, startT, d=None, expected=None, min_connection=0):
+        return search.earliest_arrival(self.network, s, startT, d, expected, min_connection)
+
+
+class CSARouter(Router):
+    """Connection Scan Algorithm (csa.py); route_many scans batches of queries at once."""
+
+    name = 'csa'
+
+    def earliest_arrival(self, s, startT, d=None, expected=None, min_connection=0):
+        return csa.earliest_arrival(self.network, s, startT, d, expected, min_connection)
+
+    def route_many(self, queries, expected=None, min_connection=0):
+        results = [(float('inf'), [])] * len(queries)
+        resolved = []
+        for q, (s, d, startT) in enumerate(queries):
+            try:
+                resolved.append((startT, q, self.network.airport_id(s), self.network.airport_id(d)))
+            except KeyError:
+                pass
+        # Queries close in time share most of their scan window
+        resolved.sort()
+
+        for b in range(0, len(resolved), BATCH_SIZE):
+            batch = resolved[b:b + BATCH_SIZE]
+            startTs, _, sources, dests = (np.array(column) for column in zip(*batch))
+            T = csa.earliest_arrival_many(self.network, sources, startTs, dests, expected, min_connection)
+            for arrivals, (startT, q, src, dst) in zip(T.tolist(), batch):
+                path = csa.extract_path(self.network, arrivals, src, dst, startT, expected, min_connection)
+                results[q] = self._result(arrivals[dst], path)
+        return results
+
+
+class AStarRouter(Router):
+    """
+    Goal-directed A* (astar.py) for point-to-point queries; one-to-all
+    searches fall back to Dijkstra. The landmarks are built on first use, once
+    for the scheduled arrivals and once for each `expected` routed with.
+    Exact, but not faster than 'dijkstra' on these timetables (see astar.py);
+    it is not a speed option.
+    """
+
+    name = 'astar'
+
+    def __init__(self, network):
+        super().__init__(network)
+        self._landmarks = []
+
+    def landmarks(self, expected=None):
+        arrivalT = None if expected is None else expected[0]
+        for key, landmarks in self._landmarks:
+            if key is arrivalT:
+                return landmarks
+        landmarks = astar.Landmarks(self.network, arrivalT)
+        self._landmarks.append((arrivalT, landmarks))
+        return landmarks
+
+    def earliest_arrival(self, s, startT, d=None, expected=None, min_connection=0):
+        landmarks = self.landmarks(expected) if d is not None else None
+        return astar.earliest_arrival(self.network, s, startT, d, expected, min_connection, landmarks)
+
+
+ROUTERS = {router.name: router for router in (DijkstraRouter, CSARouter, AStarRouter)}
+
+
+def get_router(network, backend='dijkstra'):
+    """
+    Router for `backend` over `network`: 'dijkstra' (the default), 'csa'
+    (faster for batches of queries) or 'astar' (the same routes, no faster).
+    """
+    try:
+        return ROUTERS[backend](network)
+    except KeyError:
+        raise ValueError(f"Unknown routing backend {backend!r}, expected one of {sorted(ROUTERS)}") from None
@@ -0,0 +1,79 @@
+import heapq
+from bisect import bisect_left
+
+
+def earliest_arrival(network, s, startT, d=None, expected=None, min_connection=0, stats=None):
+    """
+    Time-dependent Dijkstra over a Network.
+
+    network: Network with the CSR timetable
+    s: Source airport id
+    startT: Start time at the source
+    d: Optional destination airport id; the search stops as soon as it is settled
+    expected: Optional (arrivalT, best) pair from Network.expected_arrivals;
+        arrivals then include predicted delays, so a connection the delay
+        would break is never taken
+    min_connection: Minimum time between arriving at an airport and
+        departing from it again (not applied at the source)
+    stats: Optional dict; stats['settled'] is set to the number of airports
+        the search settled (compare astar.earliest_arrival)
+
+    Returns:
+        (T, prev_slot) lists indexed by airport id: T[v] is the earliest
+        arrival time at v (inf if not reached) and prev_slot[v] the flight
+        slot used to get there (-1 if none).
+    """
+    edge_offsets, edge_targets, flight_offsets, departT, arrivalT, best = network.views()
+    if expected is not None:
+        arrivalT, best = (memoryview(a) for a in expected)
+    n = network.num_airports
+    T = [float('inf')] * n
+    prev_slot = [-1] * n
+    settled = bytearray(n)
+    T[s] = startT
+
+    # Entries are (time, airport id); ids are ints so ties never compare objects.
+    heap = [(startT, s)]
+
+    while heap:
+        time, v = heapq.heappop(heap)
+        if settled[v]:
+            continue  # stale entry, a better one was already popped
+        settled[v] = 1
+        if v == d:
+            break
+
+        ready = time if v == s else time + min_connection
+        for e in range(edge_offsets[v], edge_offsets[v + 1]):
+            w = edge_targets[e]
+            if settled[w]:
+                continue
+            # Flight on this edge departing after current time with earliest arrival
+            hi = flight_offsets[e + 1]
+            i = bisect_left(departT, ready, flight_offsets[e], hi)
+            if i == hi:
+                continue
+            slot = best[i]
+            arrival_time = arrivalT[slot]
+            if arrival_time < T[w]:
+                T[w] = arrival_time
+                prev_slot[w] = slot
+                heapq.heappush(heap, (arrival_time, w))
+
+    if stats is not None:
+        stats['settled'] = sum(settled)
+    return T, prev_slot
+
+
+def reconstruct_path(network, prev_slot, s, d):
+    """Walks prev_slot back from d to s. Returns the list of slots, or None if d was not reached."""
+    path = []
+    current = d
+    while current != s:
+        slot = prev_slot[current]
+        if slot < 0:
+            return None
+        path.append(slot)
+        current = network.slot_origin(slot)
+    path.reverse()
+    return path
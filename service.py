@@ -0,0 +1,299 @@
+"""
+Headless route-query service.
+
+Loads the network and delay predictions once and answers route requests
+in batches, either as JSON lines on stdin/stdout or over a local HTTP
+endpoint. Searches run on a pool of worker processes, each with its own
+snapshot; within a batch the queries go through CSARouter.route_many.
+
+Request (one JSON object per line, or a JSON object or list as the body
+of POST /route):
+
+    {"id": 1, "source": "DEL", "destination": "BOM", "start": "Mon 09:00",
+     "delay_aware": false, "min_connection": 0}
+
+`start` is a 'Tue 14:05' label or minutes since Monday 00:00; only
+source, destination and start are required. Each response echoes the id
+and gives the arrival, the flights with their predicted delays and the
+arrival including them, or an "error".
+
+    python service.py < queries.jsonl > routes.jsonl
+    python service.py --http 8080          # POST /route, GET /stats
+
+Throughput and p50/p99 latency go to stderr at the end of a stdin run,
+and are served at GET /stats.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from router import get_router
+from snapshot import get_snapshot
+from timemodel import format_time, parse_time
+
+BATCH_SIZE = 256
+LATENCY_WINDOW = 100000  # most recent request latencies kept for the percentiles
+
+
+# ---------------- Routing ----------------
+def route_requests(snapshot, router, requests):
+    """
+    Answers a batch of request dicts on one snapshot; requests with the
+    same options share one router.route_many call.
+
+    Returns:
+        list of response dicts, in request order
+    """
+    responses = [None] * len(requests)
+    groups = {}
+    for i, request in enumerate(requests):
+        if not isinstance(request, dict):
+            responses[i] = {'id': None, 'error': "Bad request: expected a JSON object"}
+            continue
+        try:
+            source, destination = request['source'], request['destination']
+            if not isinstance(source, str) or not isinstance(destination, str):
+                # Network.airport_id would take an int as an internal airport index
+                raise TypeError("source and destination must be airport codes")
+            query = (source, destination, parse_time(request['start']))
+            options = (bool(request.get('delay_aware', False)), int(request.get('min_connection', 0)))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            responses[i] = {'id': request.get('id'), 'error': f"Bad request: {e!r}"}
+            continue
+        groups.setdefault(options, []).append((i, query))
+
+    for (delay_aware, min_connection), batch in groups.items():
+        expected = snapshot.expected if delay_aware else None
+        results = router.route_many([query for _, query in batch], expected, min_connection)
+        for (i, (s, d, startT)), (arrival, path) in zip(batch, results):
+            responses[i] = _response(snapshot, requests[i], s, d, startT, arrival, path, delay_aware)
+    return responses
+
+
+def _response(snapshot, request, s, d, startT, arrival, path, delay_aware):
+    response = {'id': request.get('id'), 'source': s, 'destination': d, 'start': startT}
+    if not path:
+        response.update(arrival=None, flights=[], error="No valid path found")
+        return response
+
+    delays = [snapshot.flight_delay(f) for f in path]
+    # With delay_aware the search already planned on delayed arrivals
+    scheduled = path[-1].arrivalT
+    expected = arrival if delay_aware else arrival + sum(delays)
+    response.update(
+        arrival=scheduled,
+        arrival_time=format_time(scheduled),
+        expected_arrival=expected,
+        expected_arrival_time=format_time(expected),
+        total_delay=sum(delays),
+        flights=[{
+            'flight': f.name, 'origin': f.origin.name, 'dest': f.dest.name,
+            'departs': f.departT, 'arrives': f.arrivalT, 'delay': delay,
+        } for f, delay in zip(path, delays)],
+    )
+    return response
+
+
+# ---------------- Worker pool ----------------
+_worker = {}
+
+
+def _init_worker(paths):
+    # Loading reports on stdout (init_db), which is the JSONL output in stdin mode
+    with contextlib.redirect_stdout(sys.stderr):
+        snapshot = get_snapshot(*paths)
+    _worker.update(snapshot=snapshot, router=get_router(snapshot.network, 'csa'))
+
+
+def _route_batch(requests):
+    return route_requests(_worker['snapshot'], _worker['router'], requests)
+
+
+def make_pool(workers=None, paths=(None, None, None)):
+    """
+    Executor that runs _route_batch: worker processes that each load the
+    snapshot for `paths` (csv, model, encoders[, db]), or with workers=1 a
+    single thread in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(paths)
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(paths,))
+
+
+class ServiceStats:
+    """Request count, errors, throughput and latency percentiles since start."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, responses, received):
+        """Records a finished batch whose requests arrived at `received` (perf_counter)."""
+        latency = time.perf_counter() - received
+        self.requests += len(responses)
+        self.errors += sum(1 for r in responses if 'error' in r)
+        self.latencies.extend([latency] * len(responses))
+
+    def summary(self):
+        seconds = time.perf_counter() - self.started
+        latencies = np.asarray(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]).tolist() if len(latencies) else (0.0, 0.0)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'seconds': round(seconds, 3),
+            'throughput': round(self.requests / seconds, 1) if seconds else 0.0,
+            'p50_ms': round(p50, 2),
+            'p99_ms': round(p99, 2),
+        }
+
+
+# ---------------- JSONL front end ----------------
+def serve_jsonl(pool, infile, outfile, batch_size=BATCH_SIZE, in_flight=None):
+    """
+    Reads requests from infile one JSON object per line, routes them in
+    batches of batch_size on the pool (at most in_flight batches queued,
+    so memory stays bounded) and writes one response line per request to
+    outfile, in input order.
+
+    Returns:
+        ServiceStats
+    """
+    stats = ServiceStats()
+    in_flight = in_flight or 2 * (os.cpu_count() or 1)
+    pending = deque()
+
+    def finish(future, received):
+        responses = future.result()
+        stats.record(responses, received)
+        for response in responses:
+            outfile.write(json.dumps(response) + "\n")
+        outfile.flush()
+
+    def submit(lines):
+        requests = []
+        for line in lines:
+            try:
+                requests.append(json.loads(line))
+            except ValueError:
+                requests.append(None)  # answered with an error in its place
+        pending.append((pool.submit(_route_batch, requests), time.perf_counter()))
+        while len(pending) > in_flight:
+            finish(*pending.popleft())
+
+    batch = []
+    for line in infile:
+        if line.strip():
+            batch.append(line)
+        if len(batch) == batch_size:
+            submit(batch)
+            batch = []
+    if batch:
+        submit(batch)
+    while pending:
+        finish(*pending.popleft())
+    return stats
+
+
+# ---------------- HTTP front end ----------------
+async def serve_http(pool, host="127.0.0.1", port=8080, ready=None):
+    """
+    Minimal HTTP/1.1 server on asyncio: POST /route takes one request
+    object or a list of them and answers with the same shape; GET /stats
+    returns ServiceStats.summary(). Runs until cancelled.
+
+    ready: optional callback given the bound (host, port), e.g. for port 0
+    """
+    loop = asyncio.get_running_loop()
+    stats = ServiceStats()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                if method == "POST" and path == "/route":
+                    status, payload = await route(body)
+                elif method == "GET" and path == "/stats":
+                    status, payload = 200, stats.summary()
+                else:
+                    status, payload = 404, {'error': f"No route for {method} {path}"}
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1")
+                             + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # the server is shutting down; just close the connection
+        finally:
+            writer.close()
+
+    async def route(body):
+        received = time.perf_counter()
+        try:
+            requests = json.loads(body)
+        except ValueError as e:
+            return 400, {'error': f"Bad JSON: {e}"}
+        if not isinstance(requests, (dict, list)):
+            return 400, {'error': "Bad request: expected a JSON object or a list of them"}
+        single = isinstance(requests, dict)
+        responses = await loop.run_in_executor(pool, _route_batch, [requests] if single else requests)
+        stats.record(responses, received)
+        return 200, responses[0] if single else responses
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[:2])
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SkyPath route-query service")
+    parser.add_argument("--http", metavar="[HOST:]PORT", help="serve HTTP instead of stdin/stdout JSONL")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="requests per batch in JSONL mode")
+    parser.add_argument("--csv", default=None, help="flights CSV (default: Indian-Airlines-Dataset.csv)")
+    args = parser.parse_args()
+
+    with make_pool(args.workers, (args.csv, None, None)) as pool:
+        if args.http:
+            host, _, port = args.http.rpartition(":")
+            ready = lambda address: print(f"✅ Serving on http://{address[0]}:{address[1]}", file=sys.stderr)
+            try:
+                asyncio.run(serve_http(pool, host or "127.0.0.1", int(port), ready))
+            except KeyboardInterrupt:
+                pass
+        else:
+            summary = serve_jsonl(pool, sys.stdin, sys.stdout, args.batch).summary()
+            print(f"✅ {summary['requests']} requests ({summary['errors']} errors) in {summary['seconds']} s: "
+                  f"{summary['throughput']} req/s, p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms",
+                  file=sys.stderr)
@@ -0,0 +1,151 @@
+import copy
+import hashlib
+import os
+import threading
+
+import joblib
+import numpy as np
+
+import compiled
+import raptor
+from database import init_db
+from loader import get_csv_path
+from predictor import DelayPredictor
+
+
+def get_model_path():
+    return os.path.join(os.path.dirname(__file__), "delay_model.pkl")
+
+
+def get_encoders_path():
+    return os.path.join(os.path.dirname(__file__), "label_encoders.pkl")
+
+
+class NetworkSnapshot:
+    """
+    Everything a route query needs, loaded once: the flight network, its
+    build stats, the delay model and its label encoders, and the predicted
+    delay of every flight in the timetable (delays[slot]) along with the
+    delay-aware arrivals the search uses (expected) and the same delays
+    prepared for multi-criteria routing (delay_criterion).
+
+    `sources` maps each source file to the mtime it was loaded at, and
+    `version` changes whenever any of them does or the timetable is
+    updated in memory (see updated); `revision` counts those updates.
+    """
+
+    def __init__(self, network, load_stats, model, encoders, sources):
+        self.network = network
+        self.load_stats = load_stats
+        self.model = model
+        self.encoders = encoders
+        self.predictor = DelayPredictor(model, encoders)
+        self.delays = self.predictor.predict_network(network)
+        self.expected = network.expected_arrivals(self.delays)
+        self.delay_criterion = raptor.delay_criterion(network, self.delays)
+        self.sources = sources
+        # Stable across processes, so it can key results cached on disk
+        self.version = hashlib.sha1(repr(sorted(sources.items())).encode("utf-8")).hexdigest()[:16]
+        self.revision = 0
+
+    @property
+    def airports(self):
+        return self.network.codes
+
+    def flight_delay(self, flight):
+        """Precomputed delay of a flight on the timetable, 0 if it is not on it."""
+        slot = self.network.find_slot(flight.origin, flight.dest, flight.departT)
+        return float(self.delays[slot]) if slot >= 0 else 0.0
+
+    def updated(self, remove=(), add=()):
+        """
+        A new snapshot with the timetable changed as by Network.apply_changes:
+        the network is patched, only the added flights' delays are predicted
+        and the rest, with their delay-aware arrivals, are carried over.
+
+        Returns:
+            (snapshot, source, touched), the last two as from apply_changes
+        """
+        network, source, touched = self.network.apply_changes(remove, add)
+        added = np.flatnonzero(source < 0)
+        delays = np.asarray(self.delays, dtype=np.float64)[source]
+        if len(added):
+            delays[added] = self.predictor.predict_network(network, slots=added)
+
+        snapshot = copy.copy(self)
+        snapshot.network = network
+        snapshot.delays = delays
+        snapshot.expected = network.expected_arrivals(delays, update=(self.expected, source, touched))
+        snapshot.delay_criterion = raptor.delay_criterion(network, delays)
+        snapshot.version = hashlib.sha1(f"{self.version}:{network.fingerprint()}".encode("utf-8")).hexdigest()[:16]
+        snapshot.revision = self.revision + 1
+        return snapshot, source, touched
+
+
+_lock = threading.Lock()
+_snapshots = {}
+_db_ready = set()  # database files init_db has run on
+
+
+def _paths(csv_path, model_path, encoders_path):
+    return csv_path or get_csv_path(), model_path or get_model_path(), encoders_path or get_encoders_path()
+
+
+def _mtimes(paths):
+    return {path: os.path.getmtime(path) for path in paths}
+
+
+def get_snapshot(csv_path=None, model_path=None, encoders_path=None, db_path=None):
+    """
+    Returns the process-wide snapshot for these source files, building it on
+    first use and again only when one of the files' mtimes has changed.
+    The first build also sets up the tables of the database at db_path
+    (database.get_db_path() by default).
+
+    Streamlit reruns and concurrent sessions all get the same object, so it
+    must be treated as read-only.
+    """
+    paths = _paths(csv_path, model_path, encoders_path)
+    sources = _mtimes(paths)
+
+    snapshot = _snapshots.get(paths)
+    if snapshot is not None and snapshot.sources == sources:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshots.get(paths)
+        if snapshot is not None and snapshot.sources == sources:
+            return snapshot  # another thread rebuilt it while we waited
+
+        if db_path not in _db_ready:
+            init_db(db_path)
+            _db_ready.add(db_path)
+
+        network, load_stats = compiled.load_network(paths[0])
+        model = joblib.load(paths[1])
+        encoders = joblib.load(paths[2])
+        snapshot = NetworkSnapshot(network, load_stats, model, encoders, sources)
+        _snapshots[paths] = snapshot
+        return snapshot
+
+
+def update_snapshot(changes, csv_path=None, model_path=None, encoders_path=None, db_path=None):
+    """
+    Applies a timetable change to the current snapshot for these source files
+    and makes the result the one get_snapshot returns, until the files
+    change on disk. Queries already running keep the snapshot they started
+    with.
+
+    changes: function of the current snapshot's Network returning the
+        (remove, add) arguments of Network.apply_changes
+
+    Returns:
+        (previous snapshot, new snapshot, source), source as from apply_changes
+    """
+    get_snapshot(csv_path, model_path, encoders_path, db_path)  # loads or reloads the files
+    paths = _paths(csv_path, model_path, encoders_path)
+    with _lock:
+        previous = _snapshots[paths]
+        snapshot, source, _ = previous.updated(*changes(previous.network))
+        _snapshots[paths] = snapshot
+    return previous, snapshot, source
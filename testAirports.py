@@ -0,0 +1,25 @@
+import unittest
+import pandas as pd
+from airports import DEMO_COORDS, great_circle_km, load_airport_coords
+from loader import get_csv_path
+
+
+class TestAirports(unittest.TestCase):
+
+    def test_coordinates_cover_dataset(self):
+        df = pd.read_csv(get_csv_path())
+        coords = load_airport_coords()
+        self.assertIs(load_airport_coords(), coords)
+        self.assertFalse((set(df['source']) | set(df['dest'])) - set(coords))
+        self.assertLessEqual(set(DEMO_COORDS), set(coords))
+        for lat, lon in coords.values():
+            self.assertTrue(-90 <= lat <= 90 and -180 <= lon <= 180)
+
+    def test_great_circle(self):
+        coords = load_airport_coords()
+        self.assertAlmostEqual(float(great_circle_km(*coords["DEL"], *coords["BOM"])), 1137, delta=5)
+        self.assertEqual(float(great_circle_km(*coords["DEL"], *coords["DEL"])), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
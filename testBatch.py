@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import batch
+import database
+from router import get_router
+from snapshot import get_snapshot
+from timemodel import format_time, to_minutes
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = (None, None, None, os.path.join(self.tmp, "flight_data.db"))  # not the repo's database
+
+    def tearDown(self):
+        database.close_connections()
+        shutil.rmtree(self.tmp)
+
+    def test_matches_router(self):
+        codes = ["DEL", "BOM", "BLR", "CCU", "XXX"]
+        queries = pd.DataFrame([(s, d, format_time(to_minutes(day, hour)))
+                                for s in codes for d in codes for day, hour in ((0, 6), (2, 15))],
+                               columns=['source', 'destination', 'start'])
+        query_path, out_path = os.path.join(self.tmp, "queries.csv"), os.path.join(self.tmp, "routes.csv")
+        queries.to_csv(query_path, index=False)
+
+        self.assertEqual(batch.run_batch(query_path, out_path, workers=1, chunk_rows=7, paths=self.paths,
+                                         progress=None), len(queries))
+        routes = pd.read_csv(out_path, keep_default_na=False)
+        self.assertEqual(routes[['source', 'destination', 'start']].values.tolist(), queries.values.tolist())
+
+        snapshot = get_snapshot(*self.paths)
+        router = get_router(snapshot.network)
+        for row in routes.itertuples():
+            arrival, path = router.route(row.source, row.destination, to_minutes(row.start[:3], int(row.start[4:6])))
+            if row.source == row.destination or not path:
+                self.assertEqual((row.arrival, row.legs, row.flights), ("", 0, ""))
+                continue
+            delay = sum(snapshot.flight_delay(f) for f in path)
+            self.assertEqual(float(row.arrival), arrival)
+            self.assertAlmostEqual(float(row.expected_arrival), arrival + delay)
+            self.assertEqual(row.legs, len(path))
+            self.assertEqual(row.flights, " > ".join(f.name for f in path))
+
+    def test_invalid_start(self):
+        query_path, out_path = os.path.join(self.tmp, "queries.csv"), os.path.join(self.tmp, "routes.csv")
+        with open(query_path, "w") as f:
+            f.write("source,destination,start\nDEL,BOM,\nDEL,BOM,someday\nDEL,BOM,Mon 06:00\n")
+
+        self.assertEqual(batch.run_batch(query_path, out_path, workers=1, paths=self.paths, progress=None), 3)
+        routes = pd.read_csv(out_path, keep_default_na=False)
+        self.assertEqual(routes[['arrival', 'legs', 'flights']].values.tolist()[:2], [["", 0, ""], ["", 0, ""]])
+        self.assertGreater(routes['legs'][2], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
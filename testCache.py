@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from cache import QueryCache, cached_route
+from flight import Flight, Vertex
+from network import Network
+from router import get_router
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_lru_and_ttl(self):
+        clock = FakeClock()
+        cache = QueryCache(max_entries=2, ttl=60, clock=clock)
+        cache.put(('a',), 1)
+        cache.put(('b',), 2)
+        self.assertEqual(cache.get(('a',)), 1)  # 'b' is now least recently used
+        cache.put(('c',), 3)
+        self.assertIsNone(cache.get(('b',)))
+        self.assertEqual(cache.get(('c',)), 3)
+
+        clock.now += 61
+        self.assertIsNone(cache.get(('a',)))
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_disk_tier_survives_restart(self):
+        clock = FakeClock()
+        QueryCache(db_path=self.db_path, ttl=60, clock=clock).put(('route', 'v1', 'A', 'B', 5), {'arrival': 9.0})
+
+        restarted = QueryCache(db_path=self.db_path, ttl=60, clock=clock)
+        self.assertEqual(restarted.get(('route', 'v1', 'A', 'B', 5)), {'arrival': 9.0})
+        self.assertEqual(restarted.stats()['disk_hits'], 1)
+        self.assertIsNone(restarted.get(('route', 'v2', 'A', 'B', 5)))  # other timetable version
+
+        clock.now += 61
+        self.assertIsNone(QueryCache(db_path=self.db_path, ttl=60, clock=clock).get(('route', 'v1', 'A', 'B', 5)))
+
+    def test_cached_route(self):
+        a, b, c = Vertex("A", []), Vertex("B", []), Vertex("C", [])
+        flights = [Flight('1', a, b, 4, 1), Flight('2', b, c, 7, 5), Flight('3', a, c, 12, 3)]
+        network = Network.from_flights(flights)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            arrival, slots = get_router(network).route_slots('A', 'C', 0)
+            return arrival, slots, [10.0] * len(slots)
+
+        cache = QueryCache(db_path=self.db_path)
+        first = cached_route(cache, network, network.fingerprint(), 'A', 'C', 0, compute)
+        self.assertEqual(first, (7, [flights[0], flights[1]], [10.0, 10.0]))
+
+        # Same query from a fresh process: answered from disk, same Flight objects
+        restarted = QueryCache(db_path=self.db_path)
+        self.assertEqual(cached_route(restarted, network, network.fingerprint(), 'A', 'C', 0, compute), first)
+        self.assertEqual(len(calls), 1)
+
+        # A changed timetable has a new fingerprint, so the old result is not reused
+        changed = Network.from_flights(flights[:2])
+        self.assertNotEqual(changed.fingerprint(), network.fingerprint())
+        self.assertEqual(Network.from_flights(flights).fingerprint(), network.fingerprint())
+
+    def test_cached_route_same_departure(self):
+        # Two A-B flights leave at the same minute; only the faster one makes the connection
+        a, b, c = Vertex("A", []), Vertex("B", []), Vertex("C", [])
+        flights = [Flight('slow', a, b, 9, 1), Flight('fast', a, b, 4, 1), Flight('2', b, c, 7, 5)]
+        network = Network.from_flights(flights)
+
+        def compute():
+            arrival, slots = get_router(network).route_slots('A', 'C', 0)
+            return arrival, slots, [0.0] * len(slots)
+
+        cache = QueryCache()
+        expected = (7, [flights[1], flights[2]], [0.0, 0.0])
+        self.assertEqual(cached_route(cache, network, network.fingerprint(), 'A', 'C', 0, compute), expected)
+        self.assertEqual(cached_route(cache, network, network.fingerprint(), 'A', 'C', 0, compute), expected)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
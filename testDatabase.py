@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import database
+
+
+class TestDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "flight_data.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            database.init_db(self.db_path)
+
+    def tearDown(self):
+        database.get_trip_writer(self.db_path).close()
+        database.close_connections()
+        shutil.rmtree(self.tmp)
+
+    def test_schema_and_users(self):
+        with database.connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM trips WHERE user_id = 1").fetchall()
+            self.assertIn("idx_trips_user_id", str(plan))
+            with database.connection(self.db_path) as busy:
+                self.assertIsNot(busy, conn)  # borrowed ones are not shared
+
+        # Returned to the pool and reused by any thread, e.g. Streamlit's thread per rerun
+        other = []
+
+        def borrow():
+            with database.connection(self.db_path) as conn:
+                other.append(conn)
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        thread.join()
+        self.assertIn(other[0], (conn, busy))
+
+        database.add_user("asha", "pw", self.db_path)
+        with self.assertRaises(sqlite3.IntegrityError):
+            database.add_user("asha", "other", self.db_path)
+        self.assertIsNotNone(database.find_user("asha", "pw", self.db_path))
+        self.assertIsNone(database.find_user("asha", "wrong", self.db_path))
+
+    def test_batched_writes_and_pages(self):
+        for i in range(45):
+            database.save_trip(i % 2, "DEL", "BOM", i, "DEL → BOM", "Mon 10:00", i, db_path=self.db_path)
+        writer = database.get_trip_writer(self.db_path)
+
+        # get_trips waits for queued trips; pages run newest first until the cursor is None
+        starts, cursor, pages = [], None, 0
+        while True:
+            trips, cursor = database.get_trips(0, page_size=10, before_id=cursor, db_path=self.db_path)
+            starts.extend(t[2] for t in trips)
+            pages += 1
+            if cursor is None:
+                break
+        self.assertEqual(starts, list(range(44, -1, -2)))
+        self.assertEqual(pages, 3)
+        self.assertEqual(writer.written, 45)
+        self.assertLess(writer.batches, 45)  # grouped into transactions
+        self.assertEqual(database.get_trips(5, db_path=self.db_path), ([], None))
+
+    def test_migrates_hour_start_times(self):
+        # Trips saved before the minute time model hold the start hour
+        legacy = os.path.join(self.tmp, "legacy.db")
+        conn = sqlite3.connect(legacy)
+        conn.execute("""CREATE TABLE trips (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, start TEXT,
+                        end TEXT, start_time INTEGER, itinerary TEXT, arrival_time TEXT, delay_minutes INTEGER)""")
+        conn.executemany("INSERT INTO trips (user_id, start_time) VALUES (1, ?)", [(2,), (0,), (23,)])
+        conn.commit()
+        conn.close()
+
+        for _ in range(2):  # once only
+            with contextlib.redirect_stdout(io.StringIO()):
+                database.init_db(legacy)
+        trips, _ = database.get_trips(1, db_path=legacy)
+        self.assertEqual([t[2] for t in trips], [23 * 60, 0, 2 * 60])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from flight import Flight, Vertex, Graph, FlightAgency
+from timetable import Timetable
 
 class TestFlight(unittest.TestCase):
 
@@ -35,6 +36,26 @@ class TestFlight(unittest.TestCase):
         # To E
         self.assertEqual( FlightAgency(self.flights, self.graph, self.airportA, self.airportE, 1), 8 )
         self.assertEqual( FlightAgency(self.flights, self.graph, self.airportB, self.airportE, 1), 8 )
+    def test_timetable_earliest_flight(self):
+        timetable = Timetable(self.flights)
+        for flight in self.flights:
+            for t in range(0, 14):
+                candidates = [
+                    f for f in self.flights
+                    if f.origin == flight.origin and f.dest == flight.dest and f.departT >= t
+                ]
+                expected = min(candidates, key=lambda f: f.arrivalT) if candidates else None
+                self.assertIs(timetable.earliest_flight(flight.origin, flight.dest, t), expected)
+
+    def test_flightagency_accepts_timetable(self):
+        timetable = Timetable(self.flights)
+        for start in (self.airportA, self.airportB, self.airportC):
+            for dest in (self.airportB, self.airportD, self.airportE):
+                for t in (1, 3, 5):
+                    self.assertEqual(
+                        FlightAgency(timetable, self.graph, start, dest, t),
+                        FlightAgency(self.flights, self.graph, start, dest, t),
+                    )
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
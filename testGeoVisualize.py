@@ -0,0 +1,29 @@
+import os
+import unittest
+import geo_visualize
+from flight import Flight, Vertex
+
+
+class TestGeoVisualize(unittest.TestCase):
+
+    def test_route_rendered_in_memory_over_cached_base(self):
+        delhi, mumbai, goa = Vertex("DEL", []), Vertex("BOM", []), Vertex("GOI", [])
+        path = [Flight("AI 1", delhi, mumbai, 200, 60), Flight("AI 2", mumbai, goa, 400, 300)]
+        files = set(os.listdir("."))
+
+        html = geo_visualize.plot_geo_path(path)
+        m, base_html = geo_visualize.base_map()
+        self.assertIs(geo_visualize.base_map()[0], m)
+        self.assertTrue(html.startswith(base_html.rpartition("</html>")[0]))
+        self.assertIn(f".addTo({m.get_name()})", html)
+        self.assertIn("L.polyline", html)
+        self.assertIn("[28.5562, 77.1], [19.0887, 72.8679], [15.3808, 73.8314]", html)
+        self.assertNotIn("L.polyline", base_html)  # the cached base is never drawn on
+
+        other = geo_visualize.plot_geo_path(path[1:])
+        self.assertEqual(other.count("L.polyline"), 1)
+        self.assertEqual(set(os.listdir(".")), files)
+
+
+if __name__ == "__main__":
+    unittest.main()
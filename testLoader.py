@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import loader
+
+
+class TestLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def assertNoDuplicateDepartures(self, network):
+        keys = list(zip(network.slot_origins().tolist(), network.slot_dests().tolist(), network.departT.tolist(),
+                        np.asarray(network.names, dtype=object)[network.flight_ids].tolist()))
+        self.assertEqual(len(set(keys)), len(keys))
+
+    def test_no_duplicate_departures(self):
+        network, _ = loader.load_network()
+        self.assertNoDuplicateDepartures(network)
+
+    def test_duplicate_rows_merged(self):
+        csv_path = os.path.join(self.tmp, "flights.csv")
+        with open(csv_path, "w") as f:
+            f.write("fltno,dest,source,freq,route\n"
+                    "AI 1,BOM,DEL,3,DEL-BOM\n"
+                    "AI 1,BOM,DEL,3,DEL-BOM\n"   # repeated verbatim
+                    "AI 2,BLR,DEL,4,DEL-BLR\n"
+                    "AI 2,BLR,DEL,3,DEL-BLR\n")  # the rest of the week
+        network, stats = loader.load_network(csv_path)
+        self.assertNoDuplicateDepartures(network)
+        self.assertEqual(stats['rows'], 4)
+        self.assertEqual(len(network), 3 + 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
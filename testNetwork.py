@@ -0,0 +1,428 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import astar
+import compiled
+import loader
+import precompute
+import raptor
+import search
+from flight import Flight, Vertex, FlightAgency
+from network import Network
+from router import get_router
+from timemodel import MINUTES_PER_DAY, MINUTES_PER_WEEK, to_minutes
+
+
+def brute_force_arrival(flights, s, d, startT):
+    # Bellman-Ford style relaxation over every flight until nothing changes
+    T = {s: startT}
+    changed = True
+    while changed:
+        changed = False
+        for f in flights:
+            if f.origin.name in T and f.departT >= T[f.origin.name]:
+                if f.arrivalT < T.get(f.dest.name, float('inf')):
+                    T[f.dest.name] = f.arrivalT
+                    changed = True
+    return T.get(d, float('inf'))
+
+
+def brute_force_pareto(flights, delays, s, d, startT, min_connection, max_legs, latest):
+    # Every itinerary of up to max_legs flights, then the (arrival, flights, delay) Pareto set
+    found = set()
+
+    def extend(at, ready, legs, delay):
+        for f in flights:
+            if f.origin.name == at and f.departT >= ready:
+                total = delay + delays[f.name]
+                if f.dest.name == d and f.arrivalT <= latest:
+                    found.add((f.arrivalT, legs + 1, total))
+                elif legs + 1 < max_legs:
+                    extend(f.dest.name, f.arrivalT + min_connection, legs + 1, total)
+
+    extend(s, startT, 0, 0)
+    return {a for a in found if not any(b != a and all(x <= y for x, y in zip(b, a)) for b in found)}
+
+
+def brute_force_itineraries(flights, s, d, startT, min_connection):
+    # Arrival of every itinerary that never visits an airport twice
+    arrivals = []
+
+    def extend(at, ready, seen):
+        for f in flights:
+            if f.origin.name == at and f.departT >= ready and f.dest.name not in seen:
+                if f.dest.name == d:
+                    arrivals.append(f.arrivalT)
+                else:
+                    extend(f.dest.name, f.arrivalT + min_connection, seen | {f.dest.name})
+
+    extend(s, startT, {s})
+    return sorted(arrivals)
+
+
+def random_flights(seed, n_airports=8, n_flights=60):
+    rng = random.Random(seed)
+    vertices = [Vertex(chr(ord('A') + i), []) for i in range(n_airports)]
+    flights = []
+    for i in range(n_flights):
+        origin, dest = rng.sample(vertices, 2)
+        dep = rng.randint(0, 20)
+        flights.append(Flight(f"FN-{i}", origin, dest, dep + rng.randint(1, 4), dep))
+    return vertices, flights
+
+
+class TestNetwork(unittest.TestCase):
+
+    def test_csr_layout(self):
+        a, b, c = Vertex("A", []), Vertex("B", []), Vertex("C", [])
+        flights = [
+            Flight('1', a, b, 9, 8),
+            Flight('2', a, b, 4, 1),
+            Flight('3', b, c, 7, 5),
+            Flight('4', a, c, 12, 3),
+        ]
+        network = Network.from_flights(flights)
+
+        self.assertEqual(network.codes, ["A", "B", "C"])
+        self.assertEqual(network.edge_offsets.tolist(), [0, 2, 3, 3])
+        self.assertEqual(network.edge_targets.tolist(), [1, 2, 2])
+        self.assertEqual(network.flight_offsets.tolist(), [0, 2, 3, 4])
+        self.assertEqual(network.departT.tolist(), [1, 8, 3, 5])
+        self.assertEqual(network.flight_ids.tolist(), [1, 0, 3, 2])
+
+        edge = network.find_edge(0, 1)
+        self.assertIs(network.flight(network.earliest_slot(edge, 0)), flights[1])
+        self.assertIs(network.flight(network.earliest_slot(edge, 2)), flights[0])
+        self.assertEqual(network.earliest_slot(edge, 9), -1)
+        self.assertEqual(network.find_edge(2, 0), -1)
+
+    def test_matches_brute_force(self):
+        for seed in range(20):
+            vertices, flights = random_flights(seed)
+            network = Network.from_flights(flights)
+            for s in vertices:
+                for d in vertices:
+                    for t in (0, 5, 10):
+                        arrival, path = FlightAgency(network, None, s, d, t)
+                        self.assertEqual(arrival, brute_force_arrival(flights, s.name, d.name, t))
+                        if path:
+                            self.assertEqual(path[0].origin, s)
+                            self.assertEqual(path[-1].dest, d)
+                            self.assertGreaterEqual(path[0].departT, t)
+                            for prev, nxt in zip(path, path[1:]):
+                                self.assertEqual(prev.dest, nxt.origin)
+                                self.assertGreaterEqual(nxt.departT, prev.arrivalT)
+
+    def test_backends_agree(self):
+        for seed in range(10):
+            vertices, flights = random_flights(seed)
+            network = Network.from_flights(flights)
+            rng = random.Random(seed)
+            expected = network.expected_arrivals([rng.choice([0, 0, 3]) for _ in range(len(network))])
+            queries = [(s, d, t) for s in vertices for d in vertices for t in (0, 5, 10)]
+            dijkstra, csa = get_router(network, 'dijkstra'), get_router(network, 'csa')
+
+            for options in ({}, {'min_connection': 2}, {'expected': expected, 'min_connection': 1}):
+                batch = csa.route_many(queries, **options)
+                for (s, d, t), (arrival, path) in zip(queries, batch):
+                    reference = dijkstra.route(s, d, t, **options)[0]
+                    if not options:
+                        self.assertEqual(reference, brute_force_arrival(flights, s.name, d.name, t))
+                    self.assertEqual(csa.route(s, d, t, **options)[0], reference)
+                    self.assertEqual(arrival, reference)
+                    if path:
+                        self.assertEqual(path[0].origin, s)
+                        self.assertEqual(path[-1].dest, d)
+                        self.assertGreaterEqual(path[0].departT, t)
+                        for prev, nxt in zip(path, path[1:]):
+                            self.assertEqual(prev.dest, nxt.origin)
+                            self.assertGreaterEqual(nxt.departT, prev.arrivalT + options.get('min_connection', 0))
+
+        with self.assertRaises(ValueError):
+            get_router(network, 'bellman-ford')
+
+    def test_profile_query(self):
+        for seed in range(10):
+            vertices, flights = random_flights(seed)
+            network = Network.from_flights(flights)
+            router = get_router(network)
+            for s in vertices:
+                for d in vertices:
+                    if s is d:
+                        continue
+                    for min_connection in (0, 2):
+                        journeys = router.profile(s, d, 2, 12, min_connection=min_connection)
+                        departures = [departure for departure, _, _ in journeys]
+                        self.assertEqual(departures, sorted(set(departures)))
+                        for departure, arrival, path in journeys:
+                            self.assertTrue(2 <= departure < 12)
+                            self.assertEqual(path[0].departT, departure)
+                            self.assertEqual(path[-1].dest, d)
+                            self.assertEqual(router.route(s, d, departure, min_connection=min_connection)[0], arrival)
+                        # Any start time maps to the first journey leaving at or after it
+                        after_window = router.route(s, d, 12, min_connection=min_connection)[0]
+                        for t in range(2, 12):
+                            best = min([arrival for departure, arrival, _ in journeys if departure >= t] + [after_window])
+                            self.assertEqual(router.route(s, d, t, min_connection=min_connection)[0], best)
+
+    def test_pareto_journeys(self):
+        for seed in range(6):
+            vertices, flights = random_flights(seed, n_flights=40)
+            network = Network.from_flights(flights)
+            router = get_router(network)
+            rng = random.Random(seed)
+            delays = {f.name: rng.choice([0, 5, 10, 20]) for f in flights}
+            slot_delays = [delays[network.flight(slot).name] for slot in range(len(network))]
+            criterion = raptor.delay_criterion(network, slot_delays)
+
+            for s in vertices:
+                for d in vertices:
+                    if s is d:
+                        continue
+                    earliest = router.route(s, d, 3, min_connection=1)[0]
+                    expected = brute_force_pareto(flights, delays, s.name, d.name, 3, 1, 4, earliest + 10)
+                    journeys = router.pareto(s, d, 3, criterion, min_connection=1, max_legs=4, window=10)
+                    self.assertEqual({(a, len(path), delay) for a, delay, path in journeys}, expected)
+                    # Without delays: the earliest arrival for each number of flights
+                    no_delays = dict.fromkeys(delays, 0)
+                    self.assertEqual({(a, len(path), delay) for a, delay, path in router.pareto(s, d, 3, None, 1, 4, 10)},
+                                     brute_force_pareto(flights, no_delays, s.name, d.name, 3, 1, 4, earliest + 10))
+                    for arrival, delay, path in journeys:
+                        self.assertEqual(path[0].origin, s)
+                        self.assertEqual(path[-1].dest, d)
+                        self.assertEqual(path[-1].arrivalT, arrival)
+                        self.assertEqual(sum(delays[f.name] for f in path), delay)
+
+    def test_k_alternatives(self):
+        for seed in range(10):
+            vertices, flights = random_flights(seed)
+            network = Network.from_flights(flights)
+            router = get_router(network)
+            for s in vertices:
+                for d in vertices:
+                    if s is d:
+                        continue
+                    for min_connection in (0, 1):
+                        itineraries = router.alternatives(s, d, 3, 8, min_connection, window=100)
+                        expected = brute_force_itineraries(flights, s.name, d.name, 3, min_connection)[:8]
+                        self.assertEqual([arrival for arrival, _ in itineraries], expected)
+                        self.assertEqual(len({tuple(f.name for f in path) for _, path in itineraries}), len(itineraries))
+                        for arrival, path in itineraries:
+                            self.assertEqual(path[0].origin, s)
+                            self.assertEqual(path[-1].dest, d)
+                            self.assertEqual(path[-1].arrivalT, arrival)
+                            self.assertGreaterEqual(path[0].departT, 3)
+                            for prev, nxt in zip(path, path[1:]):
+                                self.assertEqual(prev.dest, nxt.origin)
+                                self.assertGreaterEqual(nxt.departT, prev.arrivalT + min_connection)
+
+    def test_k_alternatives_distinct_flights(self):
+        # Every flight twice on the timetable: copies must not come back as other options
+        for seed in range(5):
+            vertices, flights = random_flights(seed)
+            copies = [Flight(f.name, f.origin, f.dest, f.arrivalT, f.departT) for f in flights]
+            network = Network.from_flights(flights + copies)
+            router = get_router(network)
+            single = get_router(Network.from_flights(flights))
+            delays = [random.Random(seed).choice([0, 0, 3]) for _ in range(len(network))]
+            expected = network.expected_arrivals(delays)
+            for s in vertices:
+                for d in vertices:
+                    if s is d:
+                        continue
+                    itineraries = router.alternatives(s, d, 3, 8, window=100)
+                    sequences = [tuple((f.name, f.departT, f.arrivalT) for f in path) for _, path in itineraries]
+                    self.assertEqual(len(set(sequences)), len(sequences))
+                    self.assertEqual(str(itineraries), str(single.alternatives(s, d, 3, 8, window=100)))
+
+                    # Delay-aware: the best alternative is the delay-aware route
+                    delayed = router.alternatives(s, d, 3, 4, 1, window=100, expected=expected)
+                    arrival, path = router.route(s, d, 3, expected, 1)
+                    self.assertEqual(delayed[0][0] if delayed else float('inf'), arrival)
+
+    def test_from_arrays_materializes_flights(self):
+        network = Network.from_arrays(["DEL", "BOM"], ["BOM", "BLR"], [2, 5], [4, 7], ["AI 1", "AI 2"])
+        arrival, path = FlightAgency(network, None, "DEL", "BLR", 0)
+        self.assertEqual(arrival, 7)
+        self.assertEqual([f.name for f in path], ["AI 1", "AI 2"])
+        self.assertEqual(path[0].origin.name, "DEL")
+        self.assertEqual(path[1].dest.name, "BLR")
+
+    def test_delay_aware_routing(self):
+        a, b, c = Vertex("A", []), Vertex("B", []), Vertex("C", [])
+        flights = [
+            Flight('1', a, b, to_minutes("Mon", 2), to_minutes("Mon", 1)),
+            Flight('2', b, c, to_minutes("Mon", 4), to_minutes("Mon", 3)),
+            Flight('3', b, c, to_minutes("Mon", 6), to_minutes("Mon", 5)),
+        ]
+        network = Network.from_flights(flights)
+        self.assertEqual(FlightAgency(network, None, a, c, 0)[0], to_minutes("Mon", 4))
+
+        # A 90 minute delay on flight 1 breaks the connection to flight 2
+        delays = [0.0] * len(network)
+        delays[network.find_slot(a, b, to_minutes("Mon", 1))] = 90
+        expected = network.expected_arrivals(delays)
+        arrival, path = FlightAgency(network, None, a, c, 0, expected)
+        self.assertEqual(arrival, to_minutes("Mon", 6))
+        self.assertEqual([f.name for f in path], ['1', '3'])
+
+        # Minimum connection time without delays
+        self.assertEqual(FlightAgency(network, None, a, c, 0, min_connection=60)[0], to_minutes("Mon", 4))
+        self.assertEqual(FlightAgency(network, None, a, c, 0, min_connection=61)[0], to_minutes("Mon", 6))
+        # ... never applied at the source
+        self.assertEqual(FlightAgency(network, None, a, b, 60, min_connection=120)[0], to_minutes("Mon", 2))
+
+    def test_week_expanded_timetable(self):
+        rows, departT, arrivalT = loader.synthetic_schedule(["AI 1", "AI 2", "AI 3"], [7, 3, 1])
+        self.assertEqual(sorted(rows.tolist()), [0] * 7 + [1] * 3 + [2])
+        self.assertTrue((arrivalT > departT).all())
+        self.assertTrue((departT < MINUTES_PER_WEEK).all())
+        # One departure per operating day, always at the same time of day
+        for row, freq in enumerate([7, 3, 1]):
+            days = departT[rows == row] // MINUTES_PER_DAY
+            self.assertEqual(len(set(days.tolist())), freq)
+            self.assertEqual(len(set((departT[rows == row] % MINUTES_PER_DAY).tolist())), 1)
+
+        # Two weeks: every departure repeats one week later
+        rows2, departT2, _ = loader.synthetic_schedule(["AI 1", "AI 2", "AI 3"], [7, 3, 1], days=14)
+        self.assertEqual(sorted(departT2.tolist()), sorted(departT.tolist() + (departT + MINUTES_PER_WEEK).tolist()))
+
+    def test_compiled_roundtrip(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(tmp, "flights.csv")
+            shutil.copy(loader.get_csv_path(), csv_path)
+            compiled_path = compiled.get_compiled_path(csv_path)
+
+            built, stats = compiled.load_network(csv_path)
+            self.assertFalse(stats['compiled'])
+            self.assertFalse(compiled.is_stale(compiled_path, csv_path))
+
+            mapped, stats = compiled.load_network(csv_path)
+            self.assertTrue(stats['compiled'])
+            self.assertEqual(mapped.codes, built.codes)
+            for name in ('edge_offsets', 'edge_targets', 'flight_offsets', 'departT', 'arrivalT', 'flight_ids', 'best'):
+                self.assertEqual(getattr(mapped, name).tolist(), getattr(built, name).tolist())
+            self.assertEqual(mapped.names[5], built.names[5])
+            self.assertEqual(FlightAgency(mapped, None, "DEL", "IXZ", 0)[0], FlightAgency(built, None, "DEL", "IXZ", 0)[0])
+            del mapped
+
+            # Touching the CSV makes the compiled file stale
+            mtime = os.path.getmtime(csv_path)
+            os.utime(csv_path, (mtime + 10, mtime + 10))
+            self.assertTrue(compiled.is_stale(compiled_path, csv_path))
+            self.assertFalse(compiled.load_network(csv_path)[1]['compiled'])
+        finally:
+            shutil.rmtree(tmp)
+
+
+    def test_all_pairs_precompute(self):
+        vertices, flights = random_flights(3)
+        network = Network.from_flights(flights)
+        router = get_router(network)
+        startTs = [0, 5, 10]
+
+        tmp = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(tmp, "flights.csv")
+            with open(csv_path, "w") as f:
+                f.write("fltno,source,dest,freq\n")
+            path = precompute.get_matrix_path(csv_path)
+            precompute.write_matrix(precompute.precompute(network, startTs, min_connection=1, workers=2), path, csv_path)
+            matrix = precompute.load_matrix(path, csv_path)
+
+            for s in vertices:
+                for t in startTs:
+                    self.assertEqual(matrix.one_to_all(s, t), router.one_to_all(s, t, min_connection=1))
+                    for d in vertices:
+                        self.assertEqual(matrix.arrival(s.name, d.name, t), router.route(s, d, t, min_connection=1)[0])
+            self.assertEqual(set(matrix.reachable("A", 0, 8).values()) - set(range(9)), set())
+            with self.assertRaises(KeyError):
+                matrix.arrival("A", "B", 3)
+            del matrix
+
+            # Touching the CSV makes the matrix stale
+            mtime = os.path.getmtime(csv_path)
+            os.utime(csv_path, (mtime + 10, mtime + 10))
+            self.assertIsNone(precompute.load_matrix(path, csv_path))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_incremental_updates(self):
+        for seed in range(20):
+            vertices, flights = random_flights(seed)
+            network = Network.from_flights(flights)
+            rng = random.Random(seed)
+            delays = [rng.choice([0, 0, 3]) for _ in range(len(network))]
+            expected = network.expected_arrivals(delays)
+
+            remove = rng.sample(range(len(network)), 8)
+            add = []
+            for i in range(6):
+                origin, dest = rng.sample([v.name for v in vertices] + ["Z"], 2)
+                dep = rng.randint(0, 20)
+                add.append((origin, dest, dep, dep + rng.randint(1, 4), f"NEW-{i}"))
+            updated, source, touched = network.apply_changes(remove, add)
+
+            # Same timetable as building from scratch
+            removed = {id(network.flight(slot)) for slot in remove}
+            kept = [f for f in flights if id(f) not in removed]
+            rebuilt = Network.from_flights(kept + [updated.flight(updated.slot_of(len(flights) + i)) for i in range(len(add))])
+            self.assertEqual(updated.codes[:network.num_airports], network.codes)  # new airports go last
+            self.assertEqual(sorted((updated.flight(i).name, updated.flight(i).departT) for i in range(len(updated))),
+                             sorted((rebuilt.flight(i).name, rebuilt.flight(i).departT) for i in range(len(rebuilt))))
+            for s in rebuilt.codes:
+                for d in rebuilt.codes:
+                    for t in (0, 10):
+                        self.assertEqual(FlightAgency(updated, None, s, d, t)[0], FlightAgency(rebuilt, None, s, d, t)[0])
+
+            # Patched best and expected arrivals match recomputing them
+            new_delays = [delays[i] if i >= 0 else 2 for i in source.tolist()]
+            patched = updated.expected_arrivals(new_delays, update=(expected, source, touched))
+            fresh = updated.expected_arrivals(new_delays)
+            self.assertEqual(patched[1].tolist(), fresh[1].tolist())
+            updated.best = None
+            self.assertEqual(updated.patched_best(network.best, updated.arrivalT, source, touched).tolist(),
+                             updated.expected_arrivals([0] * len(updated))[1].tolist())
+            for slot in range(len(updated)):
+                self.assertEqual(updated.slot_of(int(updated.flight_ids[slot])), slot)
+            self.assertEqual(network.slot_of(int(network.flight_ids[remove[0]])), remove[0])  # original untouched
+
+    def test_astar_matches_dijkstra(self):
+        for seed in range(10):
+            vertices, flights = random_flights(seed)
+            network = Network.from_flights(flights)
+            rng = random.Random(seed)
+            expected = network.expected_arrivals([rng.choice([0, 0, 3]) for _ in range(len(network))])
+            router = get_router(network, 'astar')
+            for options in ({}, {'min_connection': 2}, {'expected': expected, 'min_connection': 1}):
+                for s in vertices:
+                    for d in vertices:
+                        for t in (0, 5, 10):
+                            arrival, path = router.route(s, d, t, **options)
+                            self.assertEqual(arrival, get_router(network).route(s, d, t, **options)[0])
+                            if not options:
+                                self.assertEqual(arrival, brute_force_arrival(flights, s.name, d.name, t))
+                            if path:
+                                self.assertEqual((path[0].origin, path[-1].dest), (s, d))
+            self.assertEqual(len(router._landmarks), 2)  # scheduled and expected arrivals, built once each
+
+        # Fewer airports settled than Dijkstra on the real network, same arrivals
+        network, _ = loader.load_network()
+        landmarks = astar.Landmarks(network)
+        rng = random.Random(7)
+        pruned = plain = 0
+        for _ in range(50):
+            s, d = rng.sample(range(network.num_airports), 2)
+            t = rng.randint(0, 6 * MINUTES_PER_DAY)
+            a_stats, d_stats = {}, {}
+            T, _ = astar.earliest_arrival(network, s, t, d, None, 30, landmarks, a_stats)
+            self.assertEqual(T[d], search.earliest_arrival(network, s, t, d, None, 30, d_stats)[0][d])
+            pruned += a_stats['settled']
+            plain += d_stats['settled']
+        self.assertLess(pruned, plain)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import itertools
+import os
+import tempfile
+import unittest
+import joblib
+import numpy as np
+import pandas as pd
+from predictor import DelayPredictor, LinearDelayPredictor
+from snapshot import get_encoders_path, get_model_path
+
+
+class TestPredictor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = joblib.load(get_model_path())
+        cls.encoders = joblib.load(get_encoders_path())
+        # Known labels plus ones the encoders have never seen (E as origin, DEL, Sun)
+        cls.rows = list(itertools.product("ABCE", ["B", "E", "DEL"], [2, 13], ["Mon", "Sun"], ["Clear", "Fog"]))
+
+    def predict_one(self, origin, dest, departT, day, weather):
+        # The per-flight path main.py and app.py used before batching
+        le_origin, le_dest, le_day, le_weather = self.encoders
+        try:
+            features = pd.DataFrame([{
+                'origin': le_origin.transform([origin])[0],
+                'dest': le_dest.transform([dest])[0],
+                'departT': departT,
+                'day': le_day.transform([day])[0],
+                'weather': le_weather.transform([weather])[0]
+            }])
+            return self.model.predict(features)[0]
+        except ValueError:
+            return 0
+
+    def test_batch_matches_per_flight(self):
+        predictor = DelayPredictor(self.model, self.encoders)
+        delays = predictor.predict(*zip(*self.rows))
+        self.assertEqual(len(delays), len(self.rows))
+        for row, delay in zip(self.rows, delays):
+            self.assertAlmostEqual(delay, self.predict_one(*row), places=9)
+
+    def test_scalar_day_and_weather(self):
+        predictor = DelayPredictor(self.model, self.encoders)
+        delays = predictor.predict(["A", "B"], ["C", "D"], [2, 12], "Tue", "Rain")
+        self.assertAlmostEqual(delays[0], self.predict_one("A", "C", 2, "Tue", "Rain"), places=9)
+        self.assertAlmostEqual(delays[1], self.predict_one("B", "D", 12, "Tue", "Rain"), places=9)
+
+    def test_linear_export_identical_to_pickle(self):
+        reference = DelayPredictor(self.model, self.encoders).predict(*zip(*self.rows))
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            LinearDelayPredictor.from_model(self.model, self.encoders).save(path)
+            lite = LinearDelayPredictor.load(path)
+        finally:
+            os.remove(path)
+        np.testing.assert_array_equal(lite.predict(*zip(*self.rows)), reference)
+
+    def test_shipped_export_in_sync(self):
+        shipped = LinearDelayPredictor.load()
+        self.assertEqual(shipped.coef.tolist(), self.model.coef_.tolist())
+        self.assertEqual(shipped.intercept, self.model.intercept_)
+        self.assertEqual(shipped.vocabularies, DelayPredictor(self.model, self.encoders).vocabularies)
+
+
+if __name__ == "__main__":
+    unittest.main()
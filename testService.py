@@ -0,0 +1,111 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import database
+import service
+from router import get_router
+from snapshot import get_snapshot
+from timemodel import format_time, to_minutes
+
+
+class TestService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        db_path = os.path.join(cls.tmp, "flight_data.db")  # not the repo's database
+        cls.pool = service.make_pool(workers=1, paths=(None, None, None, db_path))
+        cls.snapshot = get_snapshot(db_path=db_path)
+        cls.router = get_router(cls.snapshot.network)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        database.close_connections()
+        shutil.rmtree(cls.tmp)
+
+    def requests(self):
+        codes = ["DEL", "BOM", "BLR", "CCU", "MAA"]
+        return [{'id': i, 'source': s, 'destination': d, 'start': format_time(to_minutes(i % 7, 6 + i % 12)),
+                 'delay_aware': i % 3 == 0, 'min_connection': 30 if i % 3 == 0 else 0}
+                for i, (s, d) in enumerate((s, d) for s in codes for d in codes if s != d)]
+
+    def test_routes_match_router(self):
+        requests = self.requests()
+        responses = service.route_requests(self.snapshot, get_router(self.snapshot.network, 'csa'), requests)
+        for request, response in zip(requests, responses):
+            options = (self.snapshot.expected, 30) if request['delay_aware'] else ()
+            arrival, path = self.router.route(request['source'], request['destination'],
+                                              to_minutes(request['id'] % 7, 6 + request['id'] % 12), *options)
+            self.assertEqual(response['id'], request['id'])
+            self.assertEqual([f['flight'] for f in response['flights']], [f.name for f in path])
+            if path:
+                self.assertEqual(response['expected_arrival'],
+                                 arrival if request['delay_aware'] else arrival + response['total_delay'])
+
+    def test_jsonl(self):
+        malformed = [{'id': 'x', 'source': 'DEL'},
+                     {'id': 'list', 'source': ["DEL"], 'destination': "BOM", 'start': 0},
+                     {'id': 'int', 'source': 5000, 'destination': "BOM", 'start': 0},
+                     {'id': 'index', 'source': "DEL", 'destination': 3, 'start': 0},
+                     {'id': 'time', 'source': "DEL", 'destination': "BOM", 'start': "Mon 25:99"}]
+        lines = [json.dumps(r) for r in self.requests()] + ["not json"] + [json.dumps(r) for r in malformed]
+        out = io.StringIO()
+        stats = service.serve_jsonl(self.pool, io.StringIO("\n".join(lines) + "\n"), out, batch_size=7)
+        responses = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r['id'] for r in responses],
+                         [r['id'] for r in self.requests()] + [None] + [r['id'] for r in malformed])
+        for response in responses[-6:]:
+            self.assertTrue(response['error'].startswith("Bad request"))
+        self.assertNotIn('error', responses[0])
+        summary = stats.summary()
+        self.assertEqual(summary['requests'], len(lines))
+        self.assertGreaterEqual(summary['p99_ms'], summary['p50_ms'])
+
+    def test_http(self):
+        async def run():
+            bound = asyncio.get_running_loop().create_future()
+            server = asyncio.ensure_future(service.serve_http(self.pool, port=0, ready=bound.set_result))
+            host, port = await bound
+            reader, writer = await asyncio.open_connection(host, port)
+
+            async def call(method, path, payload=None, body=b""):
+                body = json.dumps(payload).encode() if payload is not None else body
+                writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                status = (await reader.readline()).split()[1]
+                length = 0
+                while (line := await reader.readline()) != b"\r\n":
+                    if line.lower().startswith(b"content-length"):
+                        length = int(line.split(b":")[1])
+                return int(status), json.loads(await reader.readexactly(length))
+
+            results = [await call("POST", "/route", self.requests()[0]),
+                       await call("POST", "/route", self.requests()[:3]),  # same connection, kept alive
+                       await call("GET", "/stats"),
+                       await call("GET", "/nowhere"),
+                       # valid JSON but not requests: answered, and the connection stays usable
+                       *[await call("POST", "/route", body=body) for body in (b"5", b"null", b"true", b'"DEL"')],
+                       await call("POST", "/route", self.requests()[1])]
+            writer.close()
+            await writer.wait_closed()
+            server.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await server
+            return results
+
+        single, batch, stats, missing, *invalid, after = asyncio.run(run())
+        self.assertEqual((single[0], single[1]['id']), (200, 0))
+        self.assertEqual([r['id'] for r in batch[1]], [0, 1, 2])
+        self.assertEqual(stats[1]['requests'], 4)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual([status for status, _ in invalid], [400] * 4)
+        self.assertEqual((after[0], after[1]['id']), (200, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+import unittest
+import database
+import snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = []
+        for source in (snapshot.get_csv_path(), snapshot.get_model_path(), snapshot.get_encoders_path()):
+            path = os.path.join(self.tmp, os.path.basename(source))
+            shutil.copy(source, path)
+            self.paths.append(path)
+        self.paths.append(os.path.join(self.tmp, "flight_data.db"))  # not the repo's database
+
+    def tearDown(self):
+        database.close_connections()
+        shutil.rmtree(self.tmp)
+
+    def test_reused_until_source_changes(self):
+        first = snapshot.get_snapshot(*self.paths)
+        self.assertIs(snapshot.get_snapshot(*self.paths), first)
+
+        # Bump the CSV mtime: the next call rebuilds
+        mtime = os.path.getmtime(self.paths[0])
+        os.utime(self.paths[0], (mtime + 10, mtime + 10))
+        second = snapshot.get_snapshot(*self.paths)
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.version, first.version)
+        self.assertIs(snapshot.get_snapshot(*self.paths), second)
+        self.assertEqual(second.airports, first.airports)
+
+
+if __name__ == "__main__":
+    unittest.main()
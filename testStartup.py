@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.bench_startup import check_startup
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_cli_starts_without_heavy_imports(self):
+        # The time budget is checked by `python -m benchmarks.bench_startup`, not
+        # here, where a loaded machine would make it flaky
+        _, heavy, _ = check_startup('main', runs=1)
+        self.assertEqual(heavy, [])
+
+    def test_model_loaded_on_first_prediction(self):
+        import main
+        from flight import Flight, Vertex
+        self.assertIsNone(main._predictor)
+        flight = Flight("FN-101", Vertex("A", []), Vertex("B", []), 360, 120)
+        self.assertIsInstance(main.predict_delay(flight), float)
+        self.assertIsNotNone(main._predictor)
+
+    def test_route_version_follows_delay_model(self):
+        import main
+        import predictor
+        from network import Network
+        network = Network.from_arrays(["DEL"], ["BOM"], [360], [480], ["FN-1"])
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, "delay_model.json")
+            shutil.copy(predictor.get_model_json_path(), model_path)
+            with mock.patch.object(predictor, 'get_model_json_path', return_value=model_path):
+                before = main.route_version(network)
+                self.assertEqual(main.route_version(network), before)
+                os.utime(model_path, (0, 0))  # a re-exported model
+                self.assertNotEqual(main.route_version(network), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
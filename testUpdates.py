@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+import database
+import snapshot
+import updates
+from cache import QueryCache, cached_route
+from router import get_router
+from timemodel import to_minutes
+
+
+class TestUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = {}
+        for name, source in (('csv_path', snapshot.get_csv_path()), ('model_path', snapshot.get_model_path()),
+                             ('encoders_path', snapshot.get_encoders_path())):
+            self.paths[name] = os.path.join(self.tmp, os.path.basename(source))
+            shutil.copy(source, self.paths[name])
+        self.paths['db_path'] = os.path.join(self.tmp, "flight_data.db")  # not the repo's database
+        self.cache = QueryCache()
+
+    def tearDown(self):
+        database.close_connections()
+        shutil.rmtree(self.tmp)
+
+    def route(self, s, d, startT):
+        current = snapshot.get_snapshot(**self.paths)
+        network = current.network
+
+        def compute():
+            arrival, slots = get_router(network).route_slots(s, d, startT)
+            return arrival, slots, [current.flight_delay(network.flight(slot)) for slot in slots]
+        return cached_route(self.cache, network, current.version, s, d, startT, compute)
+
+    def test_updates_patch_snapshot_and_cache(self):
+        first = snapshot.get_snapshot(**self.paths)
+        startT = to_minutes("Mon", 6)
+        arrival, path, _ = self.route("DEL", "BOM", startT)
+        other = self.route("BLR", "CCU", startT)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+        # Cancelling a flight of the DEL-BOM route only drops that route
+        flight = path[0]
+        second = updates.cancel_flight(flight.origin.name, flight.dest.name, flight.departT, self.cache, **self.paths)
+        self.assertIs(snapshot.get_snapshot(**self.paths), second)
+        self.assertEqual((second.revision, len(second.network)), (1, len(first.network) - 1))
+        self.assertNotEqual(second.version, first.version)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(str(self.route("BLR", "CCU", startT)), str(other))  # materialized again from the new network
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertGreaterEqual(self.route("DEL", "BOM", startT)[0], arrival)
+        self.assertEqual(len(first.network), len(first.delays))  # the old snapshot is untouched
+
+        # A new direct flight beats every cached route it could
+        third = updates.add_flight("DEL", "BOM", startT, startT + 60, "NEW-1", self.cache, **self.paths)
+        self.assertEqual(self.route("DEL", "BOM", startT)[0], startT + 60)
+        self.assertEqual(self.route("DEL", "BOM", startT)[1][0].name, "NEW-1")
+        self.assertEqual(len(third.delays), len(third.network))
+
+        # Retiming it moves the flight; closing an airport removes its flights
+        updates.retime_flight("DEL", "BOM", startT, startT + 30, startT + 100, self.cache, **self.paths)
+        self.assertEqual(self.route("DEL", "BOM", startT)[0], startT + 100)
+        closed = updates.close_airport("BOM", self.cache, **self.paths)
+        self.assertEqual(self.route("DEL", "BOM", startT)[0], float('inf'))
+        self.assertEqual(closed.revision, 4)
+        with self.assertRaises(KeyError):
+            updates.cancel_flight("DEL", "BOM", startT + 30, self.cache, **self.paths)
+
+        # Every update matches a delay prediction and search from scratch
+        fresh = snapshot.NetworkSnapshot(closed.network, closed.load_stats, closed.model, closed.encoders, closed.sources)
+        self.assertEqual(closed.delays.tolist(), fresh.delays.tolist())
+        self.assertEqual(closed.expected[1].tolist(), fresh.expected[1].tolist())
+
+    def test_updates_cover_duplicate_departures(self):
+        startT = to_minutes("Mon", 3)
+        for name in ("DUP-1", "DUP-1", "DUP-2"):
+            updates.add_flight("DEL", "BOM", startT, startT + 30, name, self.cache, **self.paths)
+        self.assertEqual(self.route("DEL", "BOM", startT)[0], startT + 30)
+
+        # Retiming by flight number moves both copies of DUP-1 and leaves DUP-2
+        updates.retime_flight("DEL", "BOM", startT, startT + 10, startT + 20, self.cache, name="DUP-1", **self.paths)
+        network = snapshot.get_snapshot(**self.paths).network
+        self.assertEqual(len(network.find_slots("DEL", "BOM", startT + 10)), 2)
+        self.assertEqual(self.route("DEL", "BOM", startT)[1][0].name, "DUP-1")
+
+        # Cancelling without a flight number cancels every flight leaving then
+        updates.cancel_flight("DEL", "BOM", startT + 10, self.cache, **self.paths)
+        updates.cancel_flight("DEL", "BOM", startT, self.cache, **self.paths)
+        arrival, path, _ = self.route("DEL", "BOM", startT)
+        self.assertGreater(arrival, startT + 30)
+        self.assertNotIn(path[0].name, ("DUP-1", "DUP-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
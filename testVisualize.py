@@ -0,0 +1,49 @@
+import unittest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from graph import Graph
+from loader import load_network
+from network import Network
+from visualize import visualize_graph
+
+
+class TestVisualize(unittest.TestCase):
+
+    def tearDown(self):
+        plt.close("all")
+
+    def test_layout_built_once_and_geographic(self):
+        network, _ = load_network()
+        layout = network.layout()
+        self.assertIs(network.layout(), layout)
+        self.assertEqual(tuple(layout[network.index["DEL"]]), (77.1, 28.5562))  # (lon, lat)
+
+        # Airports without coordinates are placed near the known ones
+        mixed = Network.from_arrays(["XXA", "DEL"], ["DEL", "BOM"], [0, 0], [60, 120], ["a", "b"])
+        xy = mixed.layout()
+        self.assertFalse(np.isnan(xy).any())
+        self.assertLess(np.abs(xy[mixed.index["XXA"]] - xy[mixed.index["DEL"]]).max(), 20)
+
+    def test_path_neighbourhood(self):
+        network, _ = load_network()
+        path = [("DIB", "DEL"), ("DEL", "GOI")]
+        ax = visualize_graph(network, path, hops=0, show=False)
+        self.assertEqual(len(ax.collections[1].get_offsets()), 3)  # only the path's airports
+        self.assertEqual(len(ax.collections[0].get_segments()), 4)  # DIB<->DEL, DEL<->GOI routes, once each way
+        full = visualize_graph(network, path, show=False)
+        self.assertEqual(len(full.collections[0].get_segments()), network.num_edges)
+        self.assertEqual(len([t for t in full.texts if t.get_text()]), 3)  # too many airports: only the path is labelled
+
+    def test_simple_graph(self):
+        g = Graph()
+        for origin, dest, cost in [("A", "B", 6), ("A", "C", 8), ("B", "D", 13), ("D", "E", 14)]:
+            g.add_edge(origin, dest, cost)
+        ax = visualize_graph(g, [("A", "B"), ("B", "D")], show=False)
+        labels = sorted(t.get_text() for t in ax.texts if t.get_text())
+        self.assertEqual(labels, ["13", "14", "6", "8", "A", "B", "C", "D", "E"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Time model for the scheduler.
+
+All times are integer minutes since Monday 00:00 of the timetable week.
+A flight that leaves at 23:30 on Monday and lands at 01:10 departs at
+1410 and arrives at 1510; nothing wraps at midnight, so overnight and
+multi-day itineraries compare like any other time.
+"""
+MINUTES_PER_HOUR = 60
+MINUTES_PER_DAY = 24 * MINUTES_PER_HOUR
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MINUTES_PER_WEEK = len(DAYS) * MINUTES_PER_DAY
+
+
+def to_minutes(day, hour, minute=0):
+    """Minutes since Monday 00:00 for a day index (0 = Mon) or name, hour and minute."""
+    if isinstance(day, str):
+        day = DAYS.index(day)
+    return day * MINUTES_PER_DAY + hour * MINUTES_PER_HOUR + minute
+
+
+def hour_of_day(minutes):
+    """Hour of day (0–23); works on scalars and arrays."""
+    return (minutes % MINUTES_PER_DAY) // MINUTES_PER_HOUR
+
+
+def weekday(minutes):
+    """Weekday index (0 = Mon); works on scalars and arrays."""
+    return (minutes // MINUTES_PER_DAY) % len(DAYS)
+
+
+def format_time(minutes):
+    """'Tue 14:05' style label, with '+1w' style suffix past the first week."""
+    if minutes == float('inf'):
+        return "—"
+    minutes = int(round(minutes))
+    week, rest = divmod(minutes, MINUTES_PER_WEEK)
+    day, rest = divmod(rest, MINUTES_PER_DAY)
+    label = f"{DAYS[day]} {rest // MINUTES_PER_HOUR:02d}:{rest % MINUTES_PER_HOUR:02d}"
+    return label + (f" +{week}w" if week else "")
+
+
+def parse_time(value):
+    """
+    Minutes since Monday 00:00 from a 'Tue 14:05' label (as format_time
+    writes them, without a week suffix) or a number of minutes.
+    """
+    if isinstance(value, (int, float)):
+        return value
+    day, clock = value.split()
+    hour, minute = (int(part) for part in clock.split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < MINUTES_PER_HOUR):
+        raise ValueError(f"Invalid time of day {clock!r}")
+    return to_minutes(day, hour, minute)
+
+
+def format_duration(minutes):
+    minutes = int(round(minutes))
+    return f"{minutes // MINUTES_PER_HOUR}h {minutes % MINUTES_PER_HOUR:02d}m"
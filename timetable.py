@@ -0,0 +1,39 @@
+from network import Network
+
+
+class Timetable:
+    """
+    Departure-sorted index over a list of flights, built once and reused by
+    every search.
+
+    The flights are interned into a Network: grouped by (origin, dest),
+    sorted by departT, with a suffix minimum over arrivalT. "The flight with
+    the earliest arrival among those departing at or after T" is then a
+    bisect plus one array lookup instead of a scan over every flight.
+    """
+
+    def __init__(self, flights):
+        self.network = Network.from_flights(flights)
+        self.flights = self.network.flights
+
+    def __len__(self):
+        return len(self.flights)
+
+    def __iter__(self):
+        return iter(self.flights)
+
+    def earliest_flight(self, origin, dest, time):
+        """
+        Returns the flight from origin to dest that departs at or after `time`
+        and arrives earliest, or None if there is no such flight.
+        """
+        index = self.network.index
+        if origin.name not in index or dest.name not in index:
+            return None
+        edge = self.network.find_edge(index[origin.name], index[dest.name])
+        if edge < 0:
+            return None
+        slot = self.network.earliest_slot(edge, time)
+        if slot < 0:
+            return None
+        return self.network.flight(slot)
@@ -0,0 +1,107 @@
+"""
+Live timetable updates.
+
+Flights are added, cancelled or retimed and airports closed on the snapshot
+every query is served from, without reloading the CSV: the network is
+patched (Network.apply_changes), only new flights get delay predictions,
+and the snapshot's revision and version move on. Cached routes the change
+cannot affect are carried over to the new version; the rest are dropped.
+
+    from updates import cancel_flight, retime_flight
+    cancel_flight('DEL', 'BOM', to_minutes('Mon', 9, 5))              # every flight leaving then
+    cancel_flight('DEL', 'BOM', to_minutes('Mon', 9, 5), name='AI 805')  # only that one
+    retime_flight('BLR', 'DEL', to_minutes('Tue', 7), to_minutes('Tue', 8), to_minutes('Tue', 10, 40))
+
+Updates last for the life of the process; edit the CSV to keep them.
+`sources` are the csv_path / model_path / encoders_path / db_path of get_snapshot.
+"""
+import numpy as np
+
+from cache import carry_over_routes, get_query_cache
+from snapshot import update_snapshot
+
+
+def add_flight(origin, dest, departT, arrivalT, name, cache=None, **sources):
+    """
+    Adds a flight; airports not on the timetable yet are added with it.
+
+    Returns:
+        the updated snapshot
+    """
+    if arrivalT < departT:
+        raise ValueError(f"Flight {name} would arrive before it departs")
+    return apply_changes(lambda network: ((), [(origin, dest, departT, arrivalT, name)]), cache, **sources)
+
+
+def cancel_flight(origin, dest, departT, cache=None, name=None, **sources):
+    """
+    Cancels the flights from origin to dest departing at departT: every one
+    of them, or only those with flight number `name`.
+
+    Returns:
+        the updated snapshot; KeyError if there is no such flight
+    """
+    def changes(network):
+        return _find_slots(network, origin, dest, departT, name), ()
+    return apply_changes(changes, cache, **sources)
+
+
+def retime_flight(origin, dest, departT, new_departT, new_arrivalT, cache=None, name=None, **sources):
+    """
+    Moves the flights from origin to dest departing at departT (every one
+    of them, or only those with flight number `name`) to new times.
+
+    Returns:
+        the updated snapshot; KeyError if there is no such flight
+    """
+    if new_arrivalT < new_departT:
+        raise ValueError("A flight cannot arrive before it departs")
+
+    def changes(network):
+        slots = _find_slots(network, origin, dest, departT, name)
+        return slots, [(origin, dest, new_departT, new_arrivalT, network.names[int(network.flight_ids[slot])])
+                       for slot in slots]
+    return apply_changes(changes, cache, **sources)
+
+
+def close_airport(airport, cache=None, **sources):
+    """
+    Cancels every flight into or out of an airport.
+
+    Returns:
+        the updated snapshot
+    """
+    def changes(network):
+        a = network.airport_id(airport)
+        return np.flatnonzero((network.slot_origins() == a) | (network.slot_dests() == a)), ()
+    return apply_changes(changes, cache, **sources)
+
+
+def apply_changes(changes, cache=None, **sources):
+    """
+    Applies changes(network) -> (remove slots, add flights), see
+    Network.apply_changes, to the served snapshot and carries the cached
+    routes over (to the process-wide query cache if cache is None).
+
+    Returns:
+        the updated snapshot
+    """
+    previous, snapshot, source = update_snapshot(changes, **sources)
+    kept = np.zeros(len(previous.network), dtype=bool)
+    kept[source[source >= 0]] = True
+    removed = previous.network.flight_ids[~kept].tolist()
+    added = source < 0
+    added = list(zip(snapshot.network.departT[added].tolist(), snapshot.network.arrivalT[added].tolist()))
+
+    carry_over_routes(cache if cache is not None else get_query_cache(), previous.version, snapshot.version,
+                      removed, added)
+    return snapshot
+
+
+def _find_slots(network, origin, dest, departT, name=None):
+    slots = [slot for slot in network.find_slots(origin, dest, departT)
+             if name is None or network.names[int(network.flight_ids[slot])] == name]
+    if not slots:
+        flight = f"flight {name}" if name is not None else "flight"
+        raise KeyError(f"No {flight} from {origin} to {dest} departing at {departT}")
+    return slots
@@ -1,46 +1,93 @@
-import networkx as nx
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from network import Network
 
-def visualize_graph(graph, path_edges=None):
+LABEL_EDGES = 40      # edge weights are labelled only when this few routes are drawn
+LABEL_AIRPORTS = 30   # beyond this many airports only the path's are labelled
+
+def visualize_graph(graph, path_edges=None, hops=None, ax=None, show=True):
     """
-    Visualizes a directed weighted graph using NetworkX.
-    `graph` should have .adjacency as a dictionary like:
+    Visualizes a directed weighted graph.
+    `graph` is either a Network (edges weighted by their shortest block
+    time) or has .adjacency as a dictionary like:
         { "A": [("B", 6), ("C", 8)], ... }
 
     `path_edges` is a list of tuples like [("A", "B"), ("B", "D")]
     representing the shortest/selected path to highlight.
+
+    Airports are placed by Network.layout() (geographic where known), which
+    is built once per network, and the parallel flights of a route are drawn
+    as one line, wider the more flights it has. With `hops`, only the
+    airports on the path and those within `hops` routes of them are drawn,
+    which keeps the full network readable and fast.
+
+    ax: matplotlib Axes to draw on (default: a new figure)
+    show: call plt.show() when done
+
+    Returns:
+        the Axes
     """
-    G = nx.DiGraph()
+    network = graph if isinstance(graph, Network) else _as_network(graph.adjacency)
+    pos = network.layout()
+    origins, targets = network.edge_origins(), network.edge_targets
+    flights = np.diff(network.flight_offsets)
+    path = [(network.index[a], network.index[b]) for a, b in path_edges or []]
 
-    # Add all edges
-    for node in graph.adjacency:
-        for neighbor, weight in graph.adjacency[node]:
-            G.add_edge(node, neighbor, weight=weight)
+    # Airports to draw: everything, or the path and its k-hop neighbourhood either way
+    shown = np.ones(network.num_airports, dtype=bool)
+    if hops is not None and path:
+        shown[:] = False
+        shown[[v for edge in path for v in edge]] = True
+        for _ in range(hops):
+            reached = shown.copy()
+            reached[targets[shown[origins]]] = True
+            reached[origins[shown[targets]]] = True
+            shown = reached
+    edges = np.flatnonzero(shown[origins] & shown[targets])
 
-    pos = nx.spring_layout(G, seed=42)  # Consistent layout
+    if ax is None:
+        _, ax = plt.subplots(figsize=(10, 10))
 
-    # Draw base edges (gray)
-    nx.draw_networkx_edges(G, pos, edge_color='lightgray', arrows=True)
+    # Routes, one line per airport pair (gray)
+    segments = np.stack([pos[origins[edges]], pos[targets[edges]]], axis=1)
+    widths = 0.5 + 2.5 * flights[edges] / max(int(flights[edges].max()), 1) if len(edges) else []
+    ax.add_collection(LineCollection(segments, colors='lightgray', linewidths=widths, zorder=1))
 
     # Highlight path edges if provided
-    if path_edges:
-        nx.draw_networkx_edges(
-            G, pos,
-            edgelist=path_edges,
-            edge_color='green',
-            width=2.5,
-            arrows=True
-        )
+    for a, b in path:
+        ax.annotate("", xy=pos[b], xytext=pos[a], zorder=3,
+                    arrowprops=dict(arrowstyle='-|>', color='green', lw=2.5, shrinkA=8, shrinkB=8))
 
     # Draw nodes and labels
-    nx.draw_networkx_nodes(G, pos, node_color='skyblue', node_size=1800)
-    nx.draw_networkx_labels(G, pos, font_size=14, font_color='black')
+    airports = np.flatnonzero(shown)
+    ax.scatter(pos[airports, 0], pos[airports, 1], s=300 if len(airports) <= 20 else 60,
+               c='skyblue', edgecolors='steelblue', zorder=2)
+    labelled = airports.tolist() if len(airports) <= LABEL_AIRPORTS else sorted({v for edge in path for v in edge})
+    for v in labelled:
+        ax.text(pos[v, 0], pos[v, 1], network.codes[v], fontsize=14 if len(airports) <= 20 else 8,
+                ha='center', va='center', zorder=4)
 
     # Draw edge weights
-    edge_labels = nx.get_edge_attributes(G, 'weight')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
+    if len(edges) <= LABEL_EDGES:
+        blocks = network.shortest_blocks()
+        for e in edges.tolist():
+            x, y = (pos[origins[e]] + pos[targets[e]]) / 2
+            ax.text(x, y, f"{blocks[e]:g}", fontsize=9, ha='center', va='center', zorder=4,
+                    bbox=dict(boxstyle='round,pad=0.1', fc='white', ec='none', alpha=0.8))
+
+    ax.set_axis_off()
+    ax.set_aspect('equal', adjustable='datalim')
+    ax.figure.suptitle("✈️ Airport Route Graph", fontsize=16)
+    ax.autoscale_view()
+    if show:
+        plt.show()
+    return ax
+
 
-    plt.title("✈️ Airport Route Graph", fontsize=16)
-    plt.axis('off')
-    plt.tight_layout()
-    plt.show()
+def _as_network(adjacency):
+    """Network with one flight per adjacency entry, whose block time is its weight."""
+    rows = [(node, neighbor, weight) for node in adjacency for neighbor, weight in adjacency[node]]
+    origins, dests, weights = zip(*rows)
+    return Network.from_arrays(origins, dests, np.zeros(len(rows)), np.asarray(weights),
+                               [f"{a}-{b}" for a, b in zip(origins, dests)])